@@ -0,0 +1,464 @@
+import re
+import tracemalloc
+from collections import Counter
+from timeit import Timer
+
+from networkx import DiGraph
+from networkx.algorithms.tree import SpanningTreeIterator
+
+from rooted_triplet_distance import (
+    GeneralTree,
+    GeneralTreeReconstruction,
+    GeneralTriplet,
+    LevelOneNetwork,
+    MultifurcatingTree,
+    pairwise_distances,
+    parse_triplets,
+    triplet_cache,
+)
+from rooted_triplet_distance.__triplet_array import _format_triplet, _split_triplet
+from network_generators import (
+    create_random_general_tree,
+    create_random_level_1_network,
+    create_random_multifurcating_tree,
+)
+
+# The sequence of regular expressions that the triplet constructor tried on every triplet string before the
+# single-pass parser.
+_legacy_re_patterns = (
+    re.compile(r"(.*)\|(.*),(.*)"),
+    re.compile(r"(.*)\|(.*)\|(.*)"),
+    re.compile(r"(.*)/(.*)\|(.*)"),
+    re.compile(r"(.*)/(.*)/(.*)"),
+    re.compile(r"(.*)/(.*)\\(.*)"),
+    re.compile(r"(.*)\|(.*)\\(.*)"),
+    re.compile(r"(.*),(.*)\|(.*)"),
+    re.compile(r"(.*)\\(.*)\\(.*)"),
+)
+
+
+def _legacy_parse(triplet: str):
+    """
+    Performs the string processing of the old triplet constructor: the sequential regular expression attempts, the
+    second match to find the nodes and the split into the parts of the triplet.
+    """
+    for re_pattern in _legacy_re_patterns:
+        if re_pattern.fullmatch(triplet):
+            nodes = re_pattern.fullmatch(triplet).groups()
+            parts = {tuple(part.split(",")) if "," in part else part for part in re.split(r"[/\\|]", triplet)}
+            return nodes, parts
+    raise ValueError(f"Invalid triplet: {triplet}")
+
+
+def benchmark_triplet_parsing(numb_labels: int = 60, repeat: int = 5) -> dict[str, float]:
+    """
+    Measures the throughput (triplets per second) of the different ways of parsing the triplet strings of a random
+    general tree.
+    :param numb_labels: The number of nodes of the random general tree.
+    :param repeat: The number of repetitions of every measurement, of which the fastest is used.
+    :return: A dictionary with the throughput of every parser.
+    """
+    tree_dict, labels = create_random_general_tree(numb_labels)
+    strings = [str(triplet) for triplet in GeneralTree(tree_dict, list(labels)).triplets]
+    parsers = {
+        "legacy regex parsing": lambda: [_legacy_parse(triplet) for triplet in strings],
+        "single-pass split": lambda: [_split_triplet(triplet) for triplet in strings],
+        "GeneralTriplet": lambda: [GeneralTriplet(triplet) for triplet in strings],
+        "parse_triplets (objects)": lambda: parse_triplets(strings, encoded=False),
+        "parse_triplets (encoded)": lambda: parse_triplets(strings),
+    }
+    return {name: len(strings) / min(Timer(parser).repeat(repeat, 1)) for name, parser in parsers.items()}
+
+
+def benchmark_triplet_comparison(numb_labels: int = 60, repeat: int = 5) -> dict[str, float]:
+    """
+    Measures the time (seconds) of hashing and comparing the triplets of two random general trees.
+    :param numb_labels: The number of nodes of the random general trees.
+    :param repeat: The number of repetitions of every measurement, of which the fastest is used.
+    :return: A dictionary with the time of every operation.
+    """
+    tree_dict1, labels = create_random_general_tree(numb_labels)
+    tree_dict2, _ = create_random_general_tree(numb_labels)
+    triplets1 = GeneralTree(tree_dict1, list(labels)).triplets
+    triplets2 = GeneralTree(tree_dict2, list(labels)).triplets
+    strings2 = [str(triplet) for triplet in triplets2]
+    operations = {
+        "set symmetric difference": lambda: set(triplets1).symmetric_difference(triplets2),
+        "compare to triplets": lambda: [triplet1 == triplet2 for triplet1, triplet2 in zip(triplets1, triplets2)],
+        "compare to strings": lambda: [triplet1 == triplet2 for triplet1, triplet2 in zip(triplets1, strings2)],
+    }
+    return {name: min(Timer(operation).repeat(repeat, 1)) for name, operation in operations.items()}
+
+
+def benchmark_triplet_interning(numb_labels: int = 40, repeat: int = 5) -> dict[str, float]:
+    """
+    Measures the time (seconds) of reconstructing a random general tree from its triplet strings, with a cold and a warm
+    triplet cache, and returns the hit rate of the warm runs.
+    :param numb_labels: The number of nodes of the random general tree.
+    :param repeat: The number of repetitions of the warm measurement, of which the fastest is used.
+    :return: A dictionary with the reconstruction times and the hit rate of the triplet cache.
+    """
+    tree_dict, labels = create_random_general_tree(numb_labels)
+    labels = list(labels)
+    strings = [str(triplet) for triplet in GeneralTree(tree_dict, labels).triplets]
+    triplet_cache.clear()
+    cold = min(Timer(lambda: GeneralTreeReconstruction(labels, strings).reconstruct()).repeat(1, 1))
+    triplet_cache.clear()
+    GeneralTreeReconstruction(labels, strings)
+    warm = min(Timer(lambda: GeneralTreeReconstruction(labels, strings).reconstruct()).repeat(repeat, 1))
+    info = triplet_cache.info()
+    return {"cold cache": cold, "warm cache": warm, "hit rate": info.hits / (info.hits + info.misses)}
+
+
+def benchmark_triplet_memory(numb_labels: int = 200) -> float:
+    """
+    Measures the memory footprint of the GeneralTriplet instances of a random general tree with tracemalloc.
+    :param numb_labels: The number of nodes of the random general tree.
+    :return: The number of bytes allocated per triplet, including its slot in the list holding the triplets.
+    """
+    tree_dict, labels = create_random_general_tree(numb_labels)
+    strings = [_format_triplet(*triplet) for triplet in GeneralTree(tree_dict, list(labels))._enumerate_triplets()]
+    tracemalloc.start()
+    triplets = [GeneralTriplet(triplet) for triplet in strings]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(triplets)
+
+
+def benchmark_triplet_enumeration(numb_labels: tuple[int, ...] = (100, 200, 400)) -> dict[str, float]:
+    """
+    Measures the time (seconds) of enumerating all triplets of random general and multifurcating trees of increasing
+    size.
+    :param numb_labels: The numbers of nodes of the random trees.
+    :return: A dictionary with the enumeration time for every kind and number of nodes.
+    """
+    times = {}
+    for numb in numb_labels:
+        tree_dict, labels = create_random_general_tree(numb)
+        tree = GeneralTree(tree_dict, list(labels))
+        times[f"general {numb}"] = min(Timer(lambda: sum(1 for _ in tree._enumerate_triplets())).repeat(1, 1))
+        tree_dict, labels = create_random_multifurcating_tree(numb, 4)
+        tree = MultifurcatingTree(tree_dict, list(labels))
+        times[f"multifurcating {numb}"] = min(Timer(lambda: sum(1 for _ in tree._enumerate_triplets())).repeat(1, 1))
+    return times
+
+
+def benchmark_triplet_streaming(numb_labels: int = 200, chunk_size: int = 1 << 16) -> dict[str, tuple[float, float]]:
+    """
+    Measures the time (seconds) and the peak memory (bytes) of counting the triplets of a random general tree from the
+    materialized list of triplets and from the streamed encoded batches.
+    :param numb_labels: The number of nodes of the random general tree.
+    :param chunk_size: The number of triplets per encoded batch.
+    :return: A dictionary with the time and peak memory of every way of counting.
+    """
+    tree_dict, labels = create_random_general_tree(numb_labels)
+    methods = {
+        "materialized list": lambda: len(GeneralTree(tree_dict, list(labels)).triplets),
+        "streamed batches": lambda: sum(
+            len(batch) for batch in GeneralTree(tree_dict, list(labels)).iter_triplets(chunk_size=chunk_size)
+        ),
+    }
+    results = {}
+    for name, method in methods.items():
+        tracemalloc.start()
+        time = min(Timer(method).repeat(1, 1))
+        results[name] = (time, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return results
+
+
+def benchmark_triplet_counting(numb_labels: int = 200, repeat: int = 5) -> dict[str, float]:
+    """
+    Measures the time (seconds) of counting the triplets of every type of a random general tree by enumerating them and
+    in closed form.
+    :param numb_labels: The number of nodes of the random general tree.
+    :param repeat: The number of repetitions of the closed form count, of which the fastest is used.
+    :return: A dictionary with the time of every way of counting.
+    """
+    tree_dict, labels = create_random_general_tree(numb_labels)
+    tree = GeneralTree(tree_dict, list(labels))
+    return {
+        "count by enumeration": min(Timer(lambda: Counter(t for t, _ in tree._enumerate_triplets())).repeat(1, 1)),
+        "closed form count": min(Timer(tree.triplet_type_counts).repeat(repeat, 1)),
+    }
+
+
+def _legacy_spanning_tree_dicts(network: LevelOneNetwork) -> list[dict]:
+    """
+    Creates the tree dictionaries of the spanning trees of a network the way the network did before the switchings
+    were enumerated directly: by filtering the undirected spanning trees of the network on rooted spanning trees.
+    """
+    tree_dicts = []
+    network_edges = network._tree.edges()
+    root = [v for v in network._tree.nodes if network._tree.in_degree(v) == 0][0]
+
+    def __create_tree_dictionary(adjacency, root):
+        tree_dict = {root: dict(adjacency[root])}
+        for v in tree_dict[root]:
+            tree_dict[root][v] = __create_tree_dictionary(adjacency, v)[v]
+        return tree_dict
+
+    for t in SpanningTreeIterator(network._tree.to_undirected()):
+        undirected_edges = set(t.edges())
+        actual_edges = [e for e in network_edges if e in undirected_edges or tuple(reversed(e)) in undirected_edges]
+        tree = DiGraph(actual_edges)
+        if len(tree.nodes) == len(network._tree.nodes) and len([v for v in tree.nodes if tree.in_degree(v) == 0]) == 1:
+            tree_dicts.append(__create_tree_dictionary(dict(tree.adj), root))
+    return tree_dicts
+
+
+def benchmark_spanning_trees(numb_labels: int = 30, numb_cycles: tuple[int, ...] = (4, 6, 8)) -> dict[str, float]:
+    """
+    Measures the time (seconds) of creating the tree dictionaries of all spanning trees of random level one networks
+    with an increasing number of cycles, by filtering undirected spanning trees and by enumerating the switchings.
+    :param numb_labels: The number of leaves of the random networks.
+    :param numb_cycles: The numbers of cycles of the random networks.
+    :return: A dictionary with the time of both methods for every number of cycles.
+    """
+    times = {}
+    for numb in numb_cycles:
+        network = LevelOneNetwork(*create_random_level_1_network(numb_labels, numb))
+        switchings = lambda: [network._switching_tree_dict(switching) for switching in network._switchings()]
+        times[f"{numb} cycles, undirected"] = min(Timer(lambda: _legacy_spanning_tree_dicts(network)).repeat(1, 1))
+        times[f"{numb} cycles, switchings"] = min(Timer(switchings).repeat(1, 1))
+    return times
+
+
+def benchmark_network_triplets(numb_labels: int = 30, numb_cycles: tuple[int, ...] = (4, 6, 8)) -> dict[str, float]:
+    """
+    Measures the time (seconds) of finding the triplets of random level one networks with an increasing number of
+    cycles, from the union of the triplets of all spanning trees and per relevant cycle.
+    :param numb_labels: The number of leaves of the random networks.
+    :param numb_cycles: The numbers of cycles of the random networks.
+    :return: A dictionary with the time of both methods for every number of cycles.
+    """
+    times = {}
+    for numb in numb_cycles:
+        tree_dict, labels = create_random_level_1_network(numb_labels, numb)
+        union = lambda: set().union(*(tree.triplets for tree in LevelOneNetwork(tree_dict, labels).spanning_trees))
+        times[f"{numb} cycles, spanning trees"] = min(Timer(union).repeat(1, 1))
+        times[f"{numb} cycles, per cycle"] = min(
+            Timer(lambda: LevelOneNetwork(tree_dict, labels).triplets).repeat(1, 1)
+        )
+    return times
+
+
+def benchmark_spanning_tree_memory(numb_labels: int = 30, numb_cycles: int = 6) -> dict[str, float]:
+    """
+    Measures the memory (bytes) allocated for the spanning trees of a random level one network, stored as a GeneralTree
+    per switching and as views of the network.
+    :param numb_labels: The number of leaves of the random network.
+    :param numb_cycles: The number of cycles of the random network.
+    :return: A dictionary with the memory of both ways of storing the spanning trees.
+    """
+    tree_dict, labels = create_random_level_1_network(numb_labels, numb_cycles)
+    methods = {
+        "general trees": lambda network: [
+            GeneralTree(network._switching_tree_dict(switching), labels) for switching in network._switchings()
+        ],
+        "views": lambda network: network.spanning_trees,
+    }
+    results = {}
+    for name, method in methods.items():
+        network = LevelOneNetwork(tree_dict, labels)
+        network._reticulations
+        tracemalloc.start()
+        spanning_trees = method(network)
+        results[name] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del spanning_trees
+    return results
+
+
+def benchmark_multifurcating_distance(numb_labels: tuple[int, ...] = (100, 200, 2000, 10000)) -> dict[str, float]:
+    """
+    Measures the time (seconds) of calculating the triplet distance between two random multifurcating trees of
+    increasing size, by comparing their triplet sets (up to 200 nodes) and by counting their common triplets.
+    :param numb_labels: The numbers of nodes of the random trees.
+    :return: A dictionary with the time of both methods for every number of nodes.
+    """
+    times = {}
+    for numb in numb_labels:
+        tree1 = MultifurcatingTree(*create_random_multifurcating_tree(numb, 4))
+        tree2 = MultifurcatingTree(*create_random_multifurcating_tree(numb, 4))
+        if numb <= 200:
+            times[f"{numb} nodes, enumerate"] = min(
+                Timer(lambda: tree1.triplet_distance(tree2, "enumerate")).repeat(1, 1)
+            )
+        times[f"{numb} nodes, fast"] = min(Timer(lambda: tree1.triplet_distance(tree2)).repeat(1, 1))
+    return times
+
+
+def benchmark_general_distance(numb_labels: tuple[int, ...] = (100, 200, 2000)) -> dict[str, float]:
+    """
+    Measures the time (seconds) of calculating the triplet distance between two random general trees of increasing size,
+    by comparing their triplet sets (up to 200 nodes) and by counting their common triplets.
+    :param numb_labels: The numbers of nodes of the random trees.
+    :return: A dictionary with the time of both methods for every number of nodes.
+    """
+    times = {}
+    for numb in numb_labels:
+        tree1 = GeneralTree(*create_random_general_tree(numb))
+        tree2 = GeneralTree(*create_random_general_tree(numb))
+        if numb <= 200:
+            times[f"{numb} nodes, enumerate"] = min(
+                Timer(lambda: tree1.triplet_distance(tree2, "enumerate")).repeat(1, 1)
+            )
+        times[f"{numb} nodes, fast"] = min(Timer(lambda: tree1.triplet_distance(tree2)).repeat(1, 1))
+    return times
+
+
+def benchmark_pairwise_distances(numb_graphs: int = 30, numb_labels: int = 60) -> dict[str, float]:
+    """
+    Measures the time (seconds) of calculating the triplet distance matrix of random general trees, by subtracting every
+    pair of trees and with pairwise_distances in one and in four processes.
+    :param numb_graphs: The number of random trees.
+    :param numb_labels: The number of nodes of the random trees.
+    :return: A dictionary with the time of every method.
+    """
+    labels = sorted(str(node) for node in range(numb_labels))
+
+    def create_trees() -> list[GeneralTree]:
+        return [GeneralTree(create_random_general_tree(numb_labels)[0], labels) for _ in range(numb_graphs)]
+
+    def subtract(trees: list[GeneralTree]):
+        return [[tree - other for other in trees[position + 1 :]] for position, tree in enumerate(trees)]
+
+    times = {}
+    trees = create_trees()
+    times["pairs"] = min(Timer(lambda: subtract(trees)).repeat(1, 1))
+    trees = create_trees()
+    times["pairwise, 1 job"] = min(Timer(lambda: pairwise_distances(trees)).repeat(1, 1))
+    trees = create_trees()
+    times["pairwise, 4 jobs"] = min(Timer(lambda: pairwise_distances(trees, n_jobs=4)).repeat(1, 1))
+    return times
+
+
+def benchmark_approximate_distance(
+    numb_labels: tuple[int, ...] = (200, 2000, 10000), samples: int = 10000
+) -> dict[str, tuple[float, float]]:
+    """
+    Measures the time (seconds) and the absolute error of estimating the triplet distance between two random general
+    trees of increasing size from sampled triples, compared with counting their common triplets (up to 2000 nodes).
+    :param numb_labels: The numbers of nodes of the random trees.
+    :param samples: The number of sampled triples.
+    :return: A dictionary with the time and the error of the estimate, and the time of the exact distance, for every
+        number of nodes.
+    """
+    results = {}
+    for numb in numb_labels:
+        tree1 = GeneralTree(*create_random_general_tree(numb))
+        tree2 = GeneralTree(*create_random_general_tree(numb))
+        estimate = None
+
+        def approximate():
+            nonlocal estimate
+            estimate = tree1.approximate_triplet_distance(tree2, samples=samples, seed=0)
+
+        time = min(Timer(approximate).repeat(1, 1))
+        if numb <= 2000:
+            exact = None
+
+            def fast():
+                nonlocal exact
+                exact = tree1.triplet_distance(tree2)
+
+            results[f"{numb} nodes, fast"] = (min(Timer(fast).repeat(1, 1)), 0.0)
+            results[f"{numb} nodes, sampled"] = (time, abs(estimate.distance - exact))
+        else:
+            results[f"{numb} nodes, sampled"] = (time, estimate.half_width)
+    return results
+
+
+def benchmark_spr_neighbourhood(numb_labels: int = 150, numb_moves: int = 20) -> dict[str, float]:
+    """
+    Measures the time (seconds) of calculating the triplet distance between a random general tree and the trees after
+    SPR moves of a leaf to the first edges of the tree, by constructing every moved tree and comparing the triplets of
+    both trees, and from the triplets that every move adds and removes.
+    :param numb_labels: The number of nodes of the random tree.
+    :param numb_moves: The number of SPR moves.
+    :return: A dictionary with the time of both methods.
+    """
+    tree = GeneralTree(*create_random_general_tree(numb_labels))
+    node = next(node for node in tree._tree.nodes if tree._tree.out_degree(node) == 0)
+    moves = [edge for edge in tree._tree.edges if node not in edge and not tree.is_ancestor(node, edge[0])][:numb_moves]
+
+    def rebuild():
+        for insert_edge in moves:
+            tree_dict, _ = tree.perform_spr_move(node, insert_edge=insert_edge)
+            GeneralTree(tree_dict, tree.labels) - tree
+
+    def delta():
+        numb_triplets = sum(tree.triplet_type_counts().values())
+        for insert_edge in moves:
+            added, removed = tree.spr_triplet_delta(node, insert_edge=insert_edge)
+            (len(added) + len(removed)) / (numb_triplets + len(added))
+
+    return {"rebuild": min(Timer(rebuild).repeat(1, 1)), "delta": min(Timer(delta).repeat(1, 1))}
+
+
+def benchmark_common_labels(numb_labels: int = 400, numb_common: int = 100) -> dict[str, float]:
+    """
+    Measures the time (seconds) of calculating the triplet distance between two random multifurcating trees on their
+    common labels, by filtering the triplets of both trees to the common labels and by restricting both trees to the
+    common labels first.
+    :param numb_labels: The number of labels of every tree.
+    :param numb_common: The number of labels that both trees have.
+    :return: A dictionary with the time of both methods.
+    """
+    tree_dict1, labels1 = create_random_multifurcating_tree(numb_labels, 4)
+    tree_dict2, labels2 = create_random_multifurcating_tree(numb_labels, 4)
+    common = set(sorted(labels1)[:numb_common])
+    labels2 = [label if label in common else f"_{label}" for label in labels2]
+    tree_dict2 = _relabel_tree_dict(tree_dict2, common)
+
+    def filtered():
+        tree1, tree2 = MultifurcatingTree(tree_dict1, labels1), MultifurcatingTree(tree_dict2, labels2)
+        triplets1 = {triplet for triplet in tree1.triplets if triplet.labels <= common}
+        triplets2 = {triplet for triplet in tree2.triplets if triplet.labels <= common}
+        numb_shared = len(triplets1 & triplets2)
+        (len(triplets1) + len(triplets2) - 2 * numb_shared) / (len(triplets1) + len(triplets2) - numb_shared)
+
+    def restricted():
+        tree1, tree2 = MultifurcatingTree(tree_dict1, labels1), MultifurcatingTree(tree_dict2, labels2)
+        tree1.triplet_distance(tree2, common_labels=True)
+
+    return {"filter triplets": min(Timer(filtered).repeat(1, 1)), "restrict": min(Timer(restricted).repeat(3, 1))}
+
+
+def _relabel_tree_dict(tree_dict: dict, keep: set) -> dict:
+    return {node if node in keep else f"_{node}": _relabel_tree_dict(children, keep) for node, children in tree_dict.items()}
+
+
+if __name__ == "__main__":
+    for name, throughput in benchmark_triplet_parsing().items():
+        print(f"{name:<30}{throughput:>15,.0f} triplets/s")
+    for name, time in benchmark_triplet_comparison().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, value in benchmark_triplet_interning().items():
+        print(f"{name:<30}{value:>15.4f}")
+    print(f"{'bytes per triplet':<30}{benchmark_triplet_memory():>15.1f}")
+    for name, time in benchmark_triplet_enumeration().items():
+        print(f"{f'enumerate {name} nodes':<30}{time:>15.4f} s")
+    for name, (time, peak) in benchmark_triplet_streaming().items():
+        print(f"{name:<30}{time:>15.4f} s{peak / 2**20:>12.1f} MiB")
+    for name, time in benchmark_triplet_counting().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, time in benchmark_spanning_trees().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, time in benchmark_network_triplets().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, size in benchmark_spanning_tree_memory().items():
+        print(f"{f'spanning trees as {name}':<30}{size / 2**10:>15.1f} KiB")
+    for name, time in benchmark_multifurcating_distance().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, time in benchmark_general_distance().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, time in benchmark_pairwise_distances().items():
+        print(f"{name:<30}{time:>15.4f} s")
+    for name, (time, error) in benchmark_approximate_distance().items():
+        print(f"{name:<30}{time:>15.4f} s{error:>12.4f}")
+    for name, time in benchmark_spr_neighbourhood().items():
+        print(f"{f'SPR moves, {name}':<30}{time:>15.4f} s")
+    for name, time in benchmark_common_labels().items():
+        print(f"{f'common labels, {name}':<30}{time:>15.4f} s")
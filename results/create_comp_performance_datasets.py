@@ -101,8 +101,8 @@ def create_multifurcating_tree_dataframe(file: TextIOWrapper, numb_trees: int, m
         row_data["numb_cycles"] = 0
         row_data["max_cycle_size"] = 0
         row_data["max_depth"] = len(dag_longest_path(multi_tree._tree))
-        row_data["numb_multi_triplets"] = len(multi_tree.triplets)
-        row_data["numb_gen_triplets"] = len(gen_tree.triplets)
+        row_data["numb_multi_triplets"] = sum(multi_tree.triplet_type_counts().values())
+        row_data["numb_gen_triplets"] = sum(gen_tree.triplet_type_counts().values())
         row_data["time_multi_alg"] = get_timing_multi_alg(multi_tree)
         row_data["time_gen_alg"] = get_timing_gen_alg(gen_tree)
         row_data["time_network_alg"] = get_timing_network_alg(network)
@@ -142,7 +142,7 @@ def create_general_tree_dataframe(file: TextIOWrapper, numb_trees: int, min_labe
         row_data["max_cycle_size"] = 0
         row_data["max_depth"] = len(dag_longest_path(gen_tree._tree))
         row_data["numb_multi_triplets"] = np.nan
-        row_data["numb_gen_triplets"] = len(gen_tree.triplets)
+        row_data["numb_gen_triplets"] = sum(gen_tree.triplet_type_counts().values())
         row_data["time_multi_alg"] = np.nan
         row_data["time_gen_alg"] = get_timing_gen_alg(gen_tree)
         row_data["time_network_alg"] = get_timing_network_alg(network)
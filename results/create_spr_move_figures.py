@@ -50,8 +50,18 @@ def create_catepillar_tree(r: int, h: int, fully_labelled=False) -> Tree:
     return Tree(tree_dict, labels)
 
 
+def spr_triplet_distance(tree: Tree, numb_triplets: int, node, insert_edge: tuple) -> float:
+    """
+    Calculate the triplet distance between a tree and the tree after an SPR move from the triplets that the move adds
+    and removes, without constructing the new tree.
+    """
+    added, removed = tree.spr_triplet_delta(node, insert_edge=insert_edge)
+    return (len(added) + len(removed)) / (numb_triplets + len(added))
+
+
 def plot_spr_moves_to_root(tree: Tree, save_name: str, numb_skips: int = 0) -> None:
     plt.figure()
+    numb_triplets = sum(tree.triplet_type_counts().values())
     node = dag_longest_path(tree._tree)[-1]
     while tree._tree.in_degree(node) > 0:
         points = []
@@ -59,12 +69,12 @@ def plot_spr_moves_to_root(tree: Tree, save_name: str, numb_skips: int = 0) -> N
         parent = list(tree._tree.predecessors(node))[0]
         while len(list(tree._tree.predecessors(parent))) >= 1:
             insert_edge = (list(tree._tree.predecessors(parent))[0], parent)
-            new_dict, distance = tree.perform_spr_move(node, insert_edge=insert_edge)
-            new_tree = Tree(new_dict, tree.labels)
+            _, distance = tree.perform_spr_move(node, insert_edge=insert_edge)
+            triplet_distance = spr_triplet_distance(tree, numb_triplets, node, insert_edge)
             parent = insert_edge[0]
-            if new_tree - tree == 0:
+            if triplet_distance == 0:
                 continue
-            points.append((distance, new_tree - tree))
+            points.append((distance, triplet_distance))
         node = sample(list(tree._tree.predecessors(node)), 1)[0]
         for _ in range(numb_skips):
             if tree._tree.in_degree(node) > 0:
@@ -85,19 +95,20 @@ def plot_all_spr_moves(tree: Tree, save_name: str) -> None:
     Create figures comparing the SPR distance and triplet distance after performing SPR moves.
     """
     plt.figure()
+    numb_triplets = sum(tree.triplet_type_counts().values())
     node = dag_longest_path(tree._tree)[-1]
     while tree._tree.in_degree(node) > 0:
         points = []
         size_of_subtree = len(descendants(tree._tree, node).union({node}).intersection(tree.labels))
         for insert_edge in tree._tree.edges():
             try:
-                new_dict, distance = tree.perform_spr_move(node, insert_edge=insert_edge)
+                _, distance = tree.perform_spr_move(node, insert_edge=insert_edge)
             except ValueError:
                 continue
-            new_tree = Tree(new_dict, tree.labels)
-            if new_tree - tree == 0:
+            triplet_distance = spr_triplet_distance(tree, numb_triplets, node, insert_edge)
+            if triplet_distance == 0:
                 continue
-            points.append((distance, new_tree - tree))
+            points.append((distance, triplet_distance))
         node = sample(list(tree._tree.predecessors(node)), 1)[0]
         if tree._tree.in_degree(node) > 0:
             node = sample(list(tree._tree.predecessors(node)), 1)[0]
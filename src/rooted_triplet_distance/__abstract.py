@@ -1,35 +1,36 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-import re
-from itertools import permutations
+from itertools import islice, permutations
+import sys
+from typing import Callable, Iterator
 
 
 import networkx as nx
 from matplotlib import pyplot as plt
 from networkx import DiGraph, draw_networkx, is_isomorphic
 from networkx.algorithms.components import biconnected_components
-from networkx.algorithms.dag import descendants
+from networkx.algorithms.dag import descendants, topological_sort
 from networkx.algorithms.shortest_paths.generic import shortest_path
 from networkx.drawing import bfs_layout
 from networkx.relabel import convert_node_labels_to_integers
 from multiset import Multiset
+import numpy as np
 from numpy import sign
 
-_re_patern_to_triplet_types = {
-    re.compile(r"(.*)\|(.*),(.*)"): r"1|2,3",
-    re.compile(r"(.*)\|(.*)\|(.*)"): r"1|2|3",
-    re.compile(r"(.*)/(.*)\|(.*)"): r"1/2|3",
-    re.compile(r"(.*)/(.*)/(.*)"): r"1/2/3",
-    re.compile(r"(.*)/(.*)\\(.*)"): r"1/2\3",
-    re.compile(r"(.*)\|(.*)\\(.*)"): r"1|2\3",
-    re.compile(r"(.*),(.*)\|(.*)"): r"1,2|3",
-    re.compile(r"(.*)\\(.*)\\(.*)"): r"1\2\3",
-}
-
-_triplet_types_to_re_pattern = {
-    triplet_type: re_pattern for re_pattern, triplet_type in _re_patern_to_triplet_types.items()
-}
+from .__tree_index import TreeIndex
+from .__triplet_array import (
+    LabelIndex,
+    TripletArray,
+    _canonical_row,
+    _format_triplet,
+    _rechunk,
+    _split_triplet,
+    _triplet_key,
+    _unique_keys,
+)
+from .__triplet_cache import triplet_cache
+from .__triplet_sampling import TripletDistanceEstimate, _estimate_triplet_distance
 
 _triplet_to_tuples = {
     r"1|2,3": lambda x, y, z: (None, (x, (None, tuple(sorted((y, z)))))),
@@ -63,25 +64,119 @@ def _get_tree_dict(tree: DiGraph) -> dict:
     return tree_dict
 
 
+def _restricted_graph(tree: DiGraph, labels: set) -> DiGraph:
+    """
+    Restricts a directed acyclic graph to the ancestors of a set of labels and removes the unlabelled nodes with one
+    parent and one child, connecting their parent to their child, as well as the unlabelled roots with one child. If
+    the parent is already connected to the child, the edges are merged, which can make the parent or the child
+    removable as well.
+    :param tree: The directed acyclic graph.
+    :param labels: The labelled nodes to keep.
+    :return: A new DiGraph with the restricted graph.
+    """
+    order = list(topological_sort(tree))
+    kept = set()
+    for node in reversed(order):
+        if node in labels or any(child in kept for child in tree.successors(node)):
+            kept.add(node)
+    restricted = tree.subgraph(node for node in order if node in kept).copy()
+    stack = [node for node in reversed(order) if node in kept and node not in labels]
+    while stack:
+        node = stack.pop()
+        if node not in restricted or node in labels or restricted.out_degree(node) != 1:
+            continue
+        parents = list(restricted.predecessors(node))
+        if len(parents) > 1:
+            continue
+        child = next(iter(restricted.successors(node)))
+        restricted.remove_node(node)
+        if parents:
+            restricted.add_edge(parents[0], child)
+            stack.append(parents[0])
+        stack.append(child)
+    return restricted
+
+
+class _cached_property:
+    """
+    A property of a graph that is computed when it is first requested and cached until the graph is invalidated. The
+    value is stored in the cache of the graph together with the version of the graph it was computed for, so that all
+    cached properties of a graph are invalidated at once by incrementing its version.
+    """
+
+    def __init__(self, method: Callable):
+        self.__method = method
+        self.__name = method.__name__
+        self.__doc__ = method.__doc__
+
+    def __set_name__(self, owner, name: str):
+        self.__name = name
+
+    def __get__(self, graph, owner=None):
+        if graph is None:
+            return self
+        version = graph._cache_version
+        cached = graph._cache.get(self.__name)
+        if cached is None or cached[0] != version:
+            cached = (version, self.__method(graph))
+            graph._cache[self.__name] = cached
+        return cached[1]
+
+
 @dataclass
 class AbstractTriplet(ABC):
-    def __init__(self, triplet: str):
-        self.__slots__ = ("_string", "_tree_relation", "type", "labels", "parts")
-        self.labels = None
-        self.parts = None
-        self._string = str(triplet)
-        self._tree_relation = self.__define_relations()
-
-    def __define_relations(self) -> dict:
-        for template in _re_patern_to_triplet_types.keys():
-            match = template.fullmatch(self._string)
-            if match:
-                self.type = _re_patern_to_triplet_types[template]
-                nodes = match.groups()
-                relation_function = _triplet_to_tuples[self.type]
-                return relation_function(*nodes)
-        else:
-            raise ValueError(f"Invalid triplet: {self._string}")
+    """
+    An immutable triplet. Only the string, nodes, type and canonical key of the triplet are stored; everything derived
+    from them is computed when it is requested.
+    """
+
+    __slots__ = ("_string", "_nodes", "type", "_key", "_hash")
+
+    def __init__(self, triplet: str | "AbstractTriplet"):
+        if isinstance(triplet, AbstractTriplet):
+            for slot in AbstractTriplet.__slots__:
+                object.__setattr__(self, slot, getattr(triplet, slot))
+            return
+        string = str(triplet)
+        triplet_type, nodes = _split_triplet(string)
+        nodes = (sys.intern(nodes[0]), sys.intern(nodes[1]), sys.intern(nodes[2]))
+        key = _canonical_row(triplet_type, nodes)
+        object.__setattr__(self, "_string", string)
+        object.__setattr__(self, "_nodes", nodes)
+        object.__setattr__(self, "type", triplet_type)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_hash", hash(key))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"'{self.__class__.__name__}' object is immutable")
+
+    def __reduce__(self):
+        return self.__class__, (self._string,)
+
+    @property
+    def labels(self) -> set[str]:
+        """
+        Returns the labels of the triplet.
+        :return: A new set containing the labels of the triplet.
+        """
+        return set(self._nodes)
+
+    @property
+    def _tree_relation(self) -> tuple:
+        return _triplet_to_tuples[self.type](*self._nodes)
+
+    @classmethod
+    def intern(cls, triplet: str | "AbstractTriplet"):
+        """
+        Returns the instance of the triplet shared through the triplet cache, so that equal triplets are only parsed
+        and stored once.
+        :param triplet: A string representation of the triplet or an instance of AbstractTriplet.
+        :return: The shared instance of the class that is equal to the triplet.
+        """
+        return triplet_cache.get(cls, triplet)
 
     def __str__(self):
         return self._string
@@ -97,7 +192,7 @@ class AbstractTriplet(ABC):
         return iter(self.labels)
 
     def __hash__(self):
-        return hash(self._tree_relation)
+        return self._hash
 
     def __eq__(self, other: str | "AbstractTriplet") -> bool:
         """
@@ -105,37 +200,182 @@ class AbstractTriplet(ABC):
         :param other: An instance of AbstractTriplet or a string representation of a triplet.
         :return: True if the triplets are equal, False otherwise.
         """
-        if not isinstance(other, (AbstractTriplet, str)):
-            raise TypeError(
-                f"unsupported operand type(s) for ==: '{self.__class__.__name__}' and '{other.__class__.__name__}'"
-            )
-        other = AbstractTriplet(other)
-        return self._tree_relation == other._tree_relation
+        if isinstance(other, AbstractTriplet):
+            return self._hash == other._hash and self._key == other._key
+        if isinstance(other, str):
+            return self._key == _triplet_key(other)
+        raise TypeError(
+            f"unsupported operand type(s) for ==: '{self.__class__.__name__}' and '{other.__class__.__name__}'"
+        )
 
 
 class AbstractGraph(ABC):
+    _triplet_class: type[AbstractTriplet]
+
+    # The number of triplets per batch when the triplet array of a graph is built from its encoded batches.
+    _triplet_array_chunk_size = 1 << 18
+
     def __init__(self, tree: dict, labels: list[str] = None):
         self._tree_dict = tree
         self._labels = labels
-        self._triplets = []
+        self._version = 0
+        self._cache = {}
         self._tree = self._construct_tree(tree)
 
     @property
-    def triplets(self):
-        if self._triplets == []:
-            self._triplets = self._find_triplets()
-        return self._triplets
+    def version(self) -> int:
+        """
+        Returns the version of the graph, which is incremented every time the graph is invalidated.
+        :return: The number of times the graph was invalidated.
+        """
+        return self._version
 
     @property
+    def _cache_version(self):
+        """
+        Returns the version the cached properties of the graph are valid for.
+        :return: The version of the graph.
+        """
+        return self._version
+
+    def invalidate(self):
+        """
+        Marks the graph as modified, e.g. after edges of its directed graph were added or removed, so that its triplets,
+        index, clusters and every other structure derived from the graph are computed again when they are requested.
+        """
+        self._version += 1
+        self._cache.clear()
+
+    def _is_cached(self, name: str) -> bool:
+        """
+        Checks whether a cached property of the graph is computed for the current version of the graph.
+        :param name: The name of the cached property.
+        :return: True if the property is cached, False otherwise.
+        """
+        cached = self._cache.get(name)
+        return cached is not None and cached[0] == self._cache_version
+
+    @_cached_property
+    def triplets(self):
+        return self._find_triplets()
+
+    @_cached_property
+    def triplet_array(self) -> TripletArray:
+        """
+        Returns the triplets of the graph as an integer-encoded TripletArray.
+        :return: A TripletArray containing the distinct triplets of the graph.
+        """
+        if self._is_cached("triplets"):
+            return TripletArray.from_triplets(self.triplets).unique()
+        label_index = LabelIndex()
+        keys = [
+            _unique_keys(batch.keys)
+            for batch in self.iter_triplets(chunk_size=self._triplet_array_chunk_size, label_index=label_index)
+        ]
+        keys = _unique_keys(np.concatenate(keys)) if keys else np.empty(0, dtype=np.int64)
+        return TripletArray.from_keys(keys, label_index)
+
+    def iter_triplets(self, chunk_size: int = None, label_index: LabelIndex = None) -> Iterator:
+        """
+        Iterates over the triplets of the graph without storing them, so that the triplets of large graphs can be
+        counted, exported or compared in bounded memory.
+        :param chunk_size: [Optional] If given, the triplets are yielded in encoded batches of chunk_size triplets
+            (the last batch may be smaller) instead of one by one. Default is None.
+        :param label_index: [Optional] The LabelIndex the batches are encoded with. If None, a new LabelIndex is shared
+            by all batches of the iteration.
+        :return: An iterator of triplet instances, or of TripletArray batches if chunk_size is given.
+        """
+        if chunk_size is None:
+            return (self._triplet_class(_format_triplet(*triplet)) for triplet in self._enumerate_triplets())
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive, got {chunk_size}.")
+        return self._iter_triplet_batches(chunk_size, LabelIndex() if label_index is None else label_index)
+
+    def _iter_triplet_batches(self, chunk_size: int, label_index: LabelIndex) -> Iterator[TripletArray]:
+        """
+        Yields the triplets of the graph as TripletArrays of chunk_size triplets, except for the last batch.
+        :param chunk_size: The number of triplets per batch.
+        :param label_index: The LabelIndex the batches are encoded with.
+        :return: An iterator of TripletArray batches.
+        """
+        triplets = self._enumerate_triplets()
+        while True:
+            batch = TripletArray.from_tuples(islice(triplets, chunk_size), label_index)
+            if len(batch) == 0:
+                return
+            yield batch
+
+    @_cached_property
     def labels(self):
-        if self._labels is None:
-            self._labels = list(self._tree.nodes)
-        return self._labels
+        return list(self._tree.nodes) if self._labels is None else self._labels
+
+    def _labelled_nodes(self) -> list:
+        """
+        Returns the labelled nodes of the graph, in the order of the nodes of the graph.
+        :return: A list of the nodes of the graph that are in the labels.
+        """
+        labels = set(self.labels)
+        return [node for node in self._tree.nodes if node in labels]
+
+    def restrict(self, labels) -> "AbstractGraph":
+        """
+        Returns the graph induced by a subset of the labels: the nodes that are ancestors of the labels, without the
+        unlabelled nodes with one parent and one child and the unlabelled nodes above the lowest common ancestor of the
+        labels. The triplets of the restricted graph are exactly the triplets of the graph on the given labels. The
+        graph is restricted in time linear in its number of nodes and edges.
+        :param labels: The labels to keep. Labels that are not labelled nodes of the graph are ignored.
+        :return: A new graph of the same class with the labelled nodes of the graph that are in labels as its labels.
+        """
+        labels = set(labels)
+        labels = [node for node in self._labelled_nodes() if node in labels]
+        tree = _restricted_graph(self._tree, set(labels))
+        return self.__class__({node: {child: {} for child in tree.successors(node)} for node in tree.nodes}, labels)
+
+    def _restrict_to_common_labels(self, other: "AbstractGraph") -> tuple["AbstractGraph", "AbstractGraph"]:
+        """
+        Restricts the graph and another graph to the labelled nodes they have in common.
+        :param other: The other graph.
+        :return: The restricted graph and the restricted other graph.
+        """
+        labels = set(self._labelled_nodes()).intersection(other._labelled_nodes())
+        return self.restrict(labels), other.restrict(labels)
+
+    def is_ancestor(self, ancestor, node) -> bool:
+        """
+        Checks whether a node is a proper ancestor of another node, i.e. whether there is a directed path from ancestor
+        to node.
+        :param ancestor: The possible ancestor.
+        :param node: The possible descendant.
+        :return: True if node is a descendant of ancestor, False otherwise.
+        """
+        return node in self._descendants(ancestor)
+
+    def _descendants(self, node) -> set:
+        """
+        Returns the descendants of a node, which are computed once per node and graph.
+        :param node: The node for which to find the descendants.
+        :return: A set of descendants of the node.
+        """
+        if node not in self._descendant_sets:
+            self._descendant_sets[node] = descendants(self._tree, node)
+        return self._descendant_sets[node]
+
+    @_cached_property
+    def _descendant_sets(self) -> dict:
+        """
+        Returns the descendants of the nodes of the graph that were requested so far.
+        :return: A dictionary mapping nodes onto their sets of descendants.
+        """
+        return {}
 
     @abstractmethod
     def _find_triplets(self) -> list[AbstractTriplet]:
         ...
 
+    @abstractmethod
+    def _enumerate_triplets(self) -> Iterator[tuple[str, tuple]]:
+        ...
+
     def _construct_tree(self, tree_dict, layer=0):
         tree = DiGraph()
         for node, children in tree_dict.items():
@@ -160,6 +400,24 @@ class AbstractGraph(ABC):
         :param insert_edge: A tuple representing the edge in between which the subtree should be added (optional).
         :return: The network after performing the SPR move and the distance between its original and new parent node.
         """
+        tree, distance = self._spr_moved_graph(node, new_parent_node, insert_edge, allow_breaking_cycles)
+        return _get_tree_dict(tree), distance
+
+    def _spr_moved_graph(
+        self,
+        node: str,
+        new_parent_node: str | None,
+        insert_edge: tuple[str, str] | None,
+        allow_breaking_cycles: bool,
+    ) -> tuple[DiGraph, int]:
+        """
+        Performs an SPR move on a copy of the graph, as described in perform_spr_move.
+        :param node: The node for which to find SPR moves.
+        :param new_parent_node: The new parent node for the SPR move, or None.
+        :param insert_edge: A tuple representing the edge in between which the subtree should be added, or None.
+        :param allow_breaking_cycles: Whether a node with more than one parent may be moved.
+        :return: The graph after performing the SPR move and the distance between its original and new parent node.
+        """
         if new_parent_node is None and insert_edge is None:
             raise ValueError("Either new_parent_node or insert_edge must be provided.")
         if new_parent_node is not None and insert_edge is not None:
@@ -168,7 +426,7 @@ class AbstractGraph(ABC):
             raise ValueError(f"Node {node} not found in the tree.")
         if any(
             node in cycle
-            and not cycle.issubset(descendants(self._tree, node).union({node}))
+            and not all(member == node or self.is_ancestor(node, member) for member in cycle)
             and not self._tree.in_degree(node) == 2
             for cycle in biconnected_components(self._tree.to_undirected())
             if len(cycle) > 2
@@ -186,7 +444,7 @@ class AbstractGraph(ABC):
                 raise ValueError("New parent node cannot be the same as the node.")
             if new_parent_node in [edge[0] for edge in parent_edges]:
                 raise ValueError(f"New parent node {new_parent_node} is already a parent of the node {node}.")
-            if new_parent_node in descendants(self._tree, node):
+            if self.is_ancestor(node, new_parent_node):
                 raise ValueError(f"New parent node {new_parent_node} is a descendant of the node {node}.")
             distance = min(
                 len(shortest_path(self._tree.to_undirected(), parent_node, new_parent_node))
@@ -197,7 +455,7 @@ class AbstractGraph(ABC):
                 raise ValueError(f"Insert edge {insert_edge} not found in the tree.")
             if any(parent_edge == insert_edge for parent_edge in parent_edges):
                 raise ValueError(f"Insert edge {insert_edge} is the same as the parent edge.")
-            if insert_edge[0] in descendants(self._tree, node) or insert_edge[1] in descendants(self._tree, node):
+            if self.is_ancestor(node, insert_edge[0]) or self.is_ancestor(node, insert_edge[1]):
                 raise ValueError(f"Insert edge {insert_edge} is a descendant of the node {node}.")
             distance = min(
                 len(shortest_path(self._tree.to_undirected(), parent_node, insert_edge[1]))
@@ -213,7 +471,7 @@ class AbstractGraph(ABC):
             tree.add_edge("SPR_TEMP", node)
         elif new_parent_node is not None:
             tree.add_edge(new_parent_node, node)
-        return _get_tree_dict(tree), distance
+        return tree, distance
 
     def visualize(self, show=True, save=False, save_name=None, title: str = None):
         pos = bfs_layout(self._tree, list(self._tree_dict.keys())[0], align="horizontal", scale=-1)
@@ -245,63 +503,152 @@ class AbstractGraph(ABC):
     def __sub__(self, other: "AbstractGraph") -> float:
         if not isinstance(other, AbstractGraph):
             raise TypeError(f"Cannot subtract {type(other)} from {type(self)}")
-        triplets1 = set(self.triplets)
-        triplets2 = set(other.triplets)
+        triplets1 = self.triplet_array
+        triplets2 = other.triplet_array
         sym_diff = triplets1.symmetric_difference(triplets2)
         return len(sym_diff) / len(triplets1.union(triplets2))
 
-    def robinson_foulds_distance(self, other: "AbstractGraph") -> float:
+    def triplet_distance(self, other: "AbstractGraph", common_labels: bool = False) -> float:
+        """
+        Calculates the triplet distance to another graph, which is the number of triplets in only one of the graphs
+        divided by the number of triplets in either graph, the same value as graph1 - graph2.
+        :param other: The other graph to compare with.
+        :param common_labels: [Optional] If True, both graphs are restricted to their common labels first, so that only
+            the triplets on these labels are compared. Default is False.
+        :return: The triplet distance.
+        """
+        if not isinstance(other, AbstractGraph):
+            raise TypeError(f"Cannot calculate triplet distance with {type(other)}")
+        if common_labels:
+            graph, other = self._restrict_to_common_labels(other)
+            return graph - other
+        return self - other
+
+    def approximate_triplet_distance(
+        self,
+        other: "AbstractGraph",
+        samples: int = 10000,
+        seed: int | None = None,
+        confidence: float = 0.95,
+        tolerance: float | None = None,
+        max_samples: int = 1000000,
+        common_labels: bool = False,
+    ) -> TripletDistanceEstimate:
+        """
+        Estimates the triplet distance to another graph from random triples of labels, which are classified in both
+        graphs without enumerating their triplets. The cost depends on the number of samples instead of the number of
+        triples.
+        :param other: The other graph to compare with.
+        :param samples: [Optional] The number of triples to sample, or the number of triples sampled per round if
+            tolerance is given. Default is 10000.
+        :param seed: [Optional] The seed of the random number generator. Default is None.
+        :param confidence: [Optional] The confidence level of the interval. Default is 0.95.
+        :param tolerance: [Optional] If given, triples are sampled in rounds until half of the width of the confidence
+            interval is at most tolerance, or until max_samples triples are sampled. Default is None.
+        :param max_samples: [Optional] The maximum number of sampled triples if tolerance is given. Default is 1000000.
+        :param common_labels: [Optional] If True, only triples of labels that both graphs have are sampled, which
+            estimates the triplet distance between the graphs restricted to their common labels. Default is False.
+        :return: A TripletDistanceEstimate with the estimated distance, its confidence interval and the number of
+            sampled triples.
+        """
+        if not isinstance(other, AbstractGraph):
+            raise TypeError(f"Cannot calculate triplet distance with {type(other)}")
+        return _estimate_triplet_distance(self, other, samples, seed, confidence, tolerance, max_samples, common_labels)
+
+    @abstractmethod
+    def _sample_triplet_keys(
+        self, labels: list, triples: np.ndarray, label_index: LabelIndex
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the triplets of the graph on sampled triples of labels. Triples with a label that is not a node of the
+        graph have no triplets.
+        :param labels: The labels the triples refer to.
+        :param triples: An array of shape (k, 3) with the positions in labels of the labels of every triple.
+        :param label_index: The LabelIndex the triplets are encoded with, in which all labels are interned.
+        :return: A tuple (rows, keys) with the key of every distinct triplet on every triple and the row in triples of
+            the triple it lies on.
+        """
+        ...
+
+    def robinson_foulds_distance(self, other: "AbstractGraph", common_labels: bool = False) -> float:
         """
         Calculate the normalized Robinson-Foulds distance between two trees.
         :param other: The other tree to compare with.
+        :param common_labels: [Optional] If True, both graphs are restricted to their common labels first. Default is
+            False.
         :return: The Robinson-Foulds distance.
         """
         if not isinstance(other, AbstractGraph):
             raise TypeError(f"Cannot calculate Robinson-Foulds distance with {type(other)}")
-        cluster_set = {
-            frozenset(descendants(self._tree, node).union({node}).intersection(self.labels))
-            for node in self._tree.nodes
-        }
-        other_cluster_set = {
-            frozenset(descendants(other._tree, node).union({node}).intersection(other.labels))
-            for node in other._tree.nodes
-        }
+        if common_labels:
+            graph, other = self._restrict_to_common_labels(other)
+            return graph.robinson_foulds_distance(other)
+        cluster_set = self.__clusters
+        other_cluster_set = other.__clusters
         sym_diff = cluster_set.symmetric_difference(other_cluster_set)
         return len(sym_diff) / len(cluster_set.union(other_cluster_set))
 
-    def tripartition_distance(self, other: "AbstractGraph") -> float:
+    @_cached_property
+    def __clusters(self) -> set[frozenset]:
+        """
+        Returns the clusters of the graph, the labelled nodes at or below every node.
+        :return: A set of frozensets, one for every distinct cluster.
+        """
+        labels = set(self.labels)
+        return {frozenset(self._descendants(node).union({node}).intersection(labels)) for node in self._tree.nodes}
+
+    def tripartition_distance(self, other: "AbstractGraph", common_labels: bool = False) -> float:
         """
         Calculate the tripartition distance between two trees.
         :param other: The other tree to compare with.
+        :param common_labels: [Optional] If True, both graphs are restricted to their common labels first. Default is
+            False.
         :return: The tripartition distance.
         """
         if not isinstance(other, AbstractGraph):
             raise TypeError(f"Cannot calculate tripartition distance with {type(other)}")
+        if common_labels:
+            graph, other = self._restrict_to_common_labels(other)
+            return graph.tripartition_distance(other)
+
+        tripartitions = self.__tripartitions
+        other_tripartitions = other.__tripartitions
+        sym_diff = tripartitions.symmetric_difference(other_tripartitions)
+        return len(sym_diff) / len(tripartitions.union(other_tripartitions))
+
+    @_cached_property
+    def __tripartitions(self) -> set[tuple[frozenset, frozenset]]:
+        """
+        Returns the tripartitions of the graph, which split the labelled nodes at or below every node into the nodes of
+        which every path from the root passes through the node and the other nodes.
+        :return: A set of (strict descendants, other descendants) tuples, one for every distinct tripartition.
+        """
 
-        def _get_tripartition_for_node(graph: "AbstractGraph", node, root_node) -> tuple[frozenset, frozenset]:
+        def _get_tripartition_for_node(node, root_node) -> tuple[frozenset, frozenset]:
             strict_descendants = set()
-            node_descendants = descendants(graph._tree, node).union({node}).intersection(graph.labels)
+            node_descendants = descendants(self._tree, node).union({node}).intersection(self.labels)
             for descendant in node_descendants:
-                if all(node in path for path in nx.all_simple_paths(graph._tree, root_node, descendant)):
+                if all(node in path for path in nx.all_simple_paths(self._tree, root_node, descendant)):
                     strict_descendants.add(descendant)
             return (frozenset(strict_descendants), frozenset(node_descendants - strict_descendants))
 
         root = [n for n in self._tree.nodes if self._tree.in_degree(n) == 0][0]
-        other_root = [n for n in other._tree.nodes if other._tree.in_degree(n) == 0][0]
-        tripartitions = {_get_tripartition_for_node(self, node, root) for node in self._tree.nodes}
-        other_tripartitions = {_get_tripartition_for_node(other, node, other_root) for node in other._tree.nodes}
-        sym_diff = tripartitions.symmetric_difference(other_tripartitions)
-        return len(sym_diff) / len(tripartitions.union(other_tripartitions))
+        return {_get_tripartition_for_node(node, root) for node in self._tree.nodes}
 
-    def mu_distance(self, other: "AbstractGraph") -> float:
+    def mu_distance(self, other: "AbstractGraph", common_labels: bool = False) -> float:
         """
         Calculate the Mu distance between two trees.
         :param other: The other tree to compare with.
+        :param common_labels: [Optional] If True, both graphs are restricted to their common labels first. Default is
+            False.
         :return: The Mu distance.
         """
         if not isinstance(other, AbstractGraph):
             raise TypeError(f"Cannot calculate Mu distance with {type(other)}")
-        if self.labels != other.labels:
+        if common_labels:
+            graph, other = self._restrict_to_common_labels(other)
+            return graph.mu_distance(other)
+        if set(self.labels) != set(other.labels):
             raise ValueError("Labels of the trees must be the same for Mu distance calculation.")
         mu_set = Multiset(
             [
@@ -318,15 +665,20 @@ class AbstractGraph(ABC):
         sym_diff = mu_set.symmetric_difference(other_mu_set)
         return len(sym_diff) / len(mu_set.union(other_mu_set))
 
-    def average_sign_distance(self, other: "AbstractGraph") -> float:
+    def average_sign_distance(self, other: "AbstractGraph", common_labels: bool = False) -> float:
         """
         Calculate the average signed distance between two trees.
         :param other: The other tree to compare with.
+        :param common_labels: [Optional] If True, both graphs are restricted to their common labels first. Default is
+            False.
         :return: The average signed distance.
         """
         if not isinstance(other, AbstractGraph):
             raise TypeError(f"Cannot calculate average signed distance with {type(other)}")
-        if self.labels != other.labels:
+        if common_labels:
+            graph, other = self._restrict_to_common_labels(other)
+            return graph.average_sign_distance(other)
+        if set(self.labels) != set(other.labels):
             raise ValueError("Labels of the trees must be the same for average signed distance calculation.")
         undirected_self = self._tree.to_undirected()
         undirected_other = other._tree.to_undirected()
@@ -342,6 +694,232 @@ class AbstractGraph(ABC):
         return total_distance / count if count > 0 else 0.0
 
 
+def _mixed_triples(inside: np.ndarray, outside: np.ndarray) -> Iterator[np.ndarray]:
+    """
+    Yields all triples of nodes with at least one node in each of two disjoint groups, in batches of the triples of
+    which the first node is the same node of the first group.
+    :param inside: The nodes of the first group.
+    :param outside: The nodes of the second group.
+    :return: An iterator of arrays of shape (k, 3), with the nodes of the first group first in every triple.
+    """
+    outside1, outside2 = np.triu_indices(len(outside), 1)
+    outside1, outside2 = outside[outside1], outside[outside2]
+    for position, node in enumerate(inside):
+        others = inside[position + 1 :]
+        yield np.concatenate(
+            (
+                np.stack((np.full(len(outside1), node), outside1, outside2), axis=1),
+                np.stack(
+                    (
+                        np.full(len(others) * len(outside), node),
+                        np.repeat(others, len(outside)),
+                        np.tile(outside, len(others)),
+                    ),
+                    axis=1,
+                ),
+            )
+        )
+
+
+class AbstractTree(AbstractGraph):
+    """
+    A graph that is a rooted tree. Its ancestry is answered by a TreeIndex and its triplets are enumerated by classifying
+    batches of triples of labelled nodes at once.
+    """
+
+    # The triplet types that the type indices returned by _classify_triples refer to.
+    _classification_types: tuple[str, ...]
+    # Counts the triplets of every type that two trees have in common from their indices and common labelled nodes.
+    _count_shared_triplets: Callable[[TreeIndex, TreeIndex, list], dict[str, int]]
+
+    @_cached_property
+    def index(self) -> TreeIndex:
+        """
+        Returns the ancestor and lowest common ancestor index of the tree, which is computed once per version of the
+        tree.
+        :return: The TreeIndex of the tree.
+        """
+        return TreeIndex(self._tree)
+
+    def is_ancestor(self, ancestor, node) -> bool:
+        """
+        Checks whether a node is a proper ancestor of another node in constant time.
+        :param ancestor: The possible ancestor.
+        :param node: The possible descendant.
+        :return: True if ancestor lies on the path from the root to node and differs from node, False otherwise.
+        """
+        return self.index.is_ancestor(ancestor, node)
+
+    def _descendants(self, node) -> set:
+        """
+        Returns the descendants of a node, read from the pre-order of the tree index.
+        :param node: The node for which to find the descendants.
+        :return: A set of descendants of the node.
+        """
+        return self.index.descendants(node)
+
+    def _find_triplets(self) -> list[AbstractTriplet]:
+        return list(self.iter_triplets())
+
+    def triplet_distance(self, other: "AbstractTree", method: str = "fast", common_labels: bool = False) -> float:
+        """
+        Calculates the triplet distance to another tree, which is the number of triplets in only one of the trees divided
+        by the number of triplets in either tree, the same value as tree1 - tree2.
+        :param other: The other tree to compare with, which has the same kind of triplets.
+        :param method: [Optional] "fast" to count the common triplets from the indices of both trees in time quadratic in
+            the number of nodes, or "enumerate" to compare the triplet sets of both trees. Default is "fast".
+        :param common_labels: [Optional] If True, both trees are restricted to their common labels first, so that only
+            the triplets on these labels are compared. Default is False.
+        :return: The triplet distance.
+        """
+        if not isinstance(other, AbstractTree) or other._classification_types != self._classification_types:
+            raise TypeError(f"Cannot calculate triplet distance between {type(self)} and {type(other)}")
+        if method not in ("fast", "enumerate"):
+            raise ValueError(f"Unknown method {method!r}, expected 'fast' or 'enumerate'.")
+        if common_labels:
+            tree, other = self._restrict_to_common_labels(other)
+            return tree.triplet_distance(other, method)
+        if method == "enumerate":
+            return self - other
+        other_labels = set(other._labelled_nodes())
+        labels = [node for node in self._labelled_nodes() if node in other_labels]
+        numb_shared = sum(self._count_shared_triplets(self.index, other.index, labels).values())
+        numb_triplets = sum(self.triplet_type_counts().values()) + sum(other.triplet_type_counts().values())
+        return (numb_triplets - 2 * numb_shared) / (numb_triplets - numb_shared)
+
+    def _enumerate_triplets(self) -> Iterator[tuple[str, tuple]]:
+        """
+        Enumerates all triplets in the tree by classifying every combination of three labelled nodes with constant time
+        ancestor and lowest common ancestor queries.
+        :return: An iterator of (type, nodes) tuples, e.g. ("1,2|3", ("A", "B", "C")) for the triplet "A,B|C".
+        """
+        nodes = self._labelled_nodes()
+        node_array = np.empty(len(nodes), dtype=object)
+        node_array[:] = nodes
+        for types, orders in self._classify_triples(self.index, nodes):
+            for triplet_type, triplet_nodes in zip(types.tolist(), node_array[orders].tolist()):
+                yield self._classification_types[triplet_type], tuple(triplet_nodes)
+
+    def _iter_triplet_batches(self, chunk_size: int, label_index: LabelIndex) -> Iterator[TripletArray]:
+        """
+        Yields the triplets of the tree as TripletArrays of chunk_size triplets, encoded directly from the classified
+        batches of triples without creating a tuple or string per triplet.
+        :param chunk_size: The number of triplets per batch.
+        :param label_index: The LabelIndex the batches are encoded with.
+        :return: An iterator of TripletArray batches.
+        """
+        nodes = self._labelled_nodes()
+        label_ids = np.array([label_index.intern(node) for node in nodes], dtype=np.int64)
+        for types, orders in _rechunk(self._classify_triples(self.index, nodes), chunk_size):
+            yield TripletArray.from_label_ids(self._classification_types, types, label_ids[orders], label_index)
+
+    def _sample_triplet_keys(
+        self, labels: list, triples: np.ndarray, label_index: LabelIndex
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the triplets of the tree on sampled triples of labels with constant time ancestor and lowest common
+        ancestor queries per triple.
+        :param labels: The labels the triples refer to.
+        :param triples: An array of shape (k, 3) with the positions in labels of the labels of every triple.
+        :param label_index: The LabelIndex the triplets are encoded with, in which all labels are interned.
+        :return: A tuple (rows, keys) with the key of every triplet on every triple and the row in triples of the triple
+            it lies on.
+        """
+        index = self.index
+        nodes = set(self._labelled_nodes())
+        positions = np.full(len(labels), -1, dtype=np.int64)
+        present = np.array([label in nodes for label in labels], dtype=bool)
+        positions[present] = index.positions(label for label in labels if label in nodes)
+        label_ids = np.array([label_index.intern(label) for label in labels], dtype=np.int64)
+        rows = np.flatnonzero((positions[triples] >= 0).all(axis=1))
+        triples = triples[rows]
+        triplet_rows, keys = self.__triple_keys(index, positions[triples], label_ids[triples], label_index)
+        return rows[triplet_rows], keys
+
+    def __triple_keys(
+        self, index: TreeIndex, positions: np.ndarray, label_ids: np.ndarray, label_index: LabelIndex
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Classifies triples of labelled nodes and encodes their triplets.
+        :param index: The TreeIndex the triples are classified in.
+        :param positions: An array of shape (k, 3) with the positions in the index of the nodes of every triple.
+        :param label_ids: An array of shape (k, 3) with the label integers of the nodes of every triple.
+        :param label_index: The LabelIndex the label integers refer to.
+        :return: A tuple (rows, keys) with the key of every triplet and the row of the triple it lies on.
+        """
+        types, orders = self._classify_sampled_triples(index, positions)
+        keys = TripletArray.from_label_ids(
+            self._classification_types, types, label_ids.ravel()[orders], label_index
+        ).keys
+        return orders[:, 0] // 3, keys
+
+    def spr_triplet_delta(
+        self, node, new_parent_node=None, insert_edge: tuple | None = None
+    ) -> tuple[TripletArray, TripletArray]:
+        """
+        Finds the triplets that an SPR move adds to and removes from the tree, without constructing the moved tree or
+        enumerating its triplets. Only triples with labelled nodes both inside and outside of the subtree of the moved
+        node can change, so only these triples are classified, before and after the move. The triplet distance between
+        the tree and the moved tree is (len(added) + len(removed)) / (number of triplets of the tree + len(added)).
+        :param node: The root of the subtree to move.
+        :param new_parent_node: [Optional] The new parent of the node, as in perform_spr_move.
+        :param insert_edge: [Optional] The edge to attach the subtree to, as in perform_spr_move.
+        :return: A tuple (added, removed) of TripletArrays sharing a LabelIndex, with the triplets of the moved tree
+            that are not triplets of the tree and the triplets of the tree that are not triplets of the moved tree.
+        """
+        moved_index = TreeIndex(self._spr_moved_graph(node, new_parent_node, insert_edge, False)[0])
+        nodes = self._labelled_nodes()
+        label_index = LabelIndex()
+        label_ids = np.array([label_index.intern(labelled_node) for labelled_node in nodes], dtype=np.int64)
+        positions = self.index.positions(nodes)
+        moved_positions = moved_index.positions(nodes)
+        in_subtree = self.index.in_subtree(positions, self.index.positions((node,))[0])
+        added, removed = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for triples in _mixed_triples(np.flatnonzero(in_subtree), np.flatnonzero(~in_subtree)):
+            _, keys = self.__triple_keys(self.index, positions[triples], label_ids[triples], label_index)
+            _, moved_keys = self.__triple_keys(moved_index, moved_positions[triples], label_ids[triples], label_index)
+            added.append(np.setdiff1d(moved_keys, keys, assume_unique=True))
+            removed.append(np.setdiff1d(keys, moved_keys, assume_unique=True))
+        return (
+            TripletArray.from_keys(np.concatenate(added), label_index),
+            TripletArray.from_keys(np.concatenate(removed), label_index),
+        )
+
+    @abstractmethod
+    def triplet_type_counts(self) -> dict[str, int]:
+        """
+        Counts the triplets of every type in the tree, without enumerating them.
+        :return: A dictionary with the number of triplets of every type.
+        """
+        ...
+
+    @staticmethod
+    @abstractmethod
+    def _classify_triples(index: TreeIndex, nodes: list) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Classifies all triples of nodes, in batches of all triples that share their first node and in the order of
+        combinations(nodes, 3).
+        :param index: The TreeIndex of the tree.
+        :param nodes: The labelled nodes of the tree.
+        :return: An iterator of (types, orders) batches, where types holds the index in _classification_types of every
+            triplet and orders the positions in nodes of its nodes, in the order in which they appear in the triplet.
+        """
+        ...
+
+    @staticmethod
+    @abstractmethod
+    def _classify_sampled_triples(index: TreeIndex, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Classifies triples of nodes with ancestor and lowest common ancestor queries per triple.
+        :param index: The TreeIndex of the tree.
+        :param positions: An array of shape (k, 3) with the positions in the index of the nodes of every triple.
+        :return: A tuple (types, orders), where types holds the index in _classification_types of every triplet and
+            orders the flat positions in positions of the nodes of every triplet, in the order in which they appear in
+            the triplet.
+        """
+        ...
+
+
 class AbstractGraphReconstruction(ABC):
     def __init__(self, labels: list[str]):
         self._labels = list(set(labels))
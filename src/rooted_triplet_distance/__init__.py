@@ -9,3 +9,7 @@ from rooted_triplet_distance.general_tree import TreeReconstruction as GeneralTr
 from rooted_triplet_distance.general_tree import Triplet as GeneralTriplet
 from rooted_triplet_distance.level_one_network import Network as LevelOneNetwork
 from rooted_triplet_distance.level_one_network import NetworkReconstruction as LevelOneNetworkReconstruction
+from rooted_triplet_distance.__triplet_array import LabelIndex, TripletArray, parse_triplets
+from rooted_triplet_distance.__triplet_cache import TripletCache, triplet_cache
+from rooted_triplet_distance.__pairwise import pairwise_distances
+from rooted_triplet_distance.__triplet_sampling import TripletDistanceEstimate
@@ -0,0 +1,125 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+import os
+from typing import Sequence
+
+import numpy as np
+
+from .__abstract import AbstractGraph
+from .__triplet_array import LabelIndex, TripletArray
+
+# The distance methods of AbstractGraph by metric name. The triplet distance is computed from the triplet keys of the
+# graphs instead of with AbstractGraph.__sub__, so that the triplets of every graph are encoded once.
+_metrics = {
+    "triplet": None,
+    "robinson_foulds": "robinson_foulds_distance",
+    "tripartition": "tripartition_distance",
+    "mu": "mu_distance",
+    "average_sign": "average_sign_distance",
+}
+
+# The state of a worker process, set once per process by _init_worker.
+_worker_state = {}
+
+
+def pairwise_distances(graphs: Sequence[AbstractGraph], metric: str = "triplet", n_jobs: int = 1) -> np.ndarray:
+    """
+    Calculates the distances between all pairs of graphs. Only the pairs (i, j) with i < j are calculated, the matrix is
+    symmetric with zeros on its diagonal. For the triplet distance, the triplets of every graph are encoded once with a
+    shared LabelIndex and the keys of all graphs are shared with the worker processes through shared memory.
+    :param graphs: The graphs to compare.
+    :param metric: [Optional] The distance to calculate, i.e. "triplet", "robinson_foulds", "tripartition", "mu" or
+        "average_sign", optionally followed by "_distance". Default is "triplet".
+    :param n_jobs: [Optional] The number of worker processes, or -1 to use all processors. With 1 the distances are
+        calculated in the current process. Default is 1.
+    :return: A matrix where entry [i, j] is the distance between graph i and graph j.
+    """
+    metric = metric.removesuffix("_distance")
+    if metric not in _metrics:
+        raise ValueError(f"Unknown metric {metric!r}, expected one of {', '.join(map(repr, _metrics))}.")
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs < 1:
+        raise ValueError(f"n_jobs must be positive or -1, got {n_jobs}.")
+    graphs = list(graphs)
+    distances = np.zeros((len(graphs), len(graphs)))
+    if len(graphs) < 2:
+        return distances
+
+    shared_memory = None
+    if metric == "triplet":
+        label_index = LabelIndex()
+        keys = [TripletArray.empty(label_index).union(graph.triplet_array).keys for graph in graphs]
+        offsets = np.cumsum([0] + [len(graph_keys) for graph_keys in keys])
+        shared_memory = SharedMemory(create=True, size=max(1, int(offsets[-1]) * np.dtype(np.int64).itemsize))
+        np.ndarray(int(offsets[-1]), dtype=np.int64, buffer=shared_memory.buf)[:] = np.concatenate(keys)
+        del keys
+        state = (metric, shared_memory.name, offsets)
+    else:
+        state = (metric, graphs, None)
+
+    try:
+        if n_jobs == 1:
+            _init_worker(*state)
+            rows = map(_distance_row, range(len(graphs) - 1))
+            for row, row_distances in enumerate(rows):
+                distances[row, row + 1 :] = row_distances
+        else:
+            with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=state) as executor:
+                rows = executor.map(_distance_row, range(len(graphs) - 1))
+                for row, row_distances in enumerate(rows):
+                    distances[row, row + 1 :] = row_distances
+    finally:
+        _release_worker()
+        if shared_memory is not None:
+            shared_memory.close()
+            shared_memory.unlink()
+    return distances + distances.T
+
+
+def _init_worker(metric: str, graphs_or_name, offsets: np.ndarray | None):
+    """
+    Sets the state of a worker process: the graphs, or the triplet keys of the graphs in shared memory.
+    :param metric: The name of the metric.
+    :param graphs_or_name: The graphs, or the name of the shared memory block with the triplet keys.
+    :param offsets: The offsets of the keys of every graph in the shared memory block, or None for other metrics.
+    """
+    _worker_state["metric"] = metric
+    if offsets is None:
+        _worker_state["graphs"] = graphs_or_name
+        return
+    shared_memory = SharedMemory(name=graphs_or_name)
+    _worker_state["shared_memory"] = shared_memory
+    keys = np.ndarray(int(offsets[-1]), dtype=np.int64, buffer=shared_memory.buf)
+    _worker_state["keys"] = [keys[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+def _release_worker():
+    """
+    Clears the state of the current process, closing its view of the shared memory block.
+    """
+    _worker_state.pop("keys", None)
+    shared_memory = _worker_state.pop("shared_memory", None)
+    if shared_memory is not None:
+        shared_memory.close()
+    _worker_state.clear()
+
+
+def _distance_row(row: int) -> np.ndarray:
+    """
+    Calculates the distances between a graph and all graphs after it.
+    :param row: The position of the graph.
+    :return: An array with the distance to every graph after the graph.
+    """
+    if _worker_state["metric"] != "triplet":
+        graphs = _worker_state["graphs"]
+        method = _metrics[_worker_state["metric"]]
+        return np.array([getattr(graphs[row], method)(other) for other in graphs[row + 1 :]], dtype=float)
+    keys = _worker_state["keys"]
+    distances = np.empty(len(keys) - row - 1)
+    for column, other_keys in enumerate(keys[row + 1 :]):
+        numb_shared = len(np.intersect1d(keys[row], other_keys, assume_unique=True))
+        numb_triplets = len(keys[row]) + len(other_keys)
+        distances[column] = (numb_triplets - 2 * numb_shared) / (numb_triplets - numb_shared)
+    return distances
@@ -0,0 +1,234 @@
+from __future__ import annotations
+from typing import Iterable
+
+import numpy as np
+from networkx import DiGraph
+
+
+class TreeIndex:
+    """
+    An ancestor and lowest common ancestor index of a rooted tree, computed with a single depth-first traversal. Ancestry
+    is answered with the pre- and post-order numbers of the nodes and lowest common ancestors with a sparse table over
+    the Euler tour of the tree, both in constant time. A forest is indexed as if its roots share a virtual root.
+    """
+
+    def __init__(self, tree: DiGraph):
+        """
+        Initializes a TreeIndex instance.
+        :param tree: An instance of DiGraph representing the tree structure.
+        """
+        self.__nodes = list(tree.nodes)
+        self.__positions = {node: position for position, node in enumerate(self.__nodes)}
+        numb_nodes = len(self.__nodes)
+        children = [[self.__positions[child] for child in tree.successors(node)] for node in self.__nodes]
+        children.append([position for position, node in enumerate(self.__nodes) if tree.in_degree(node) == 0])
+
+        pre_order = [0] * (numb_nodes + 1)
+        post_order = [0] * (numb_nodes + 1)
+        depth = [-1] * (numb_nodes + 1)
+        parents = [-1] * (numb_nodes + 1)
+        first_visit = [0] * (numb_nodes + 1)
+        euler_tour = [numb_nodes]
+        counter = 1
+        stack = [numb_nodes]
+        child_iterators = [iter(children[numb_nodes])]
+        while stack:
+            child = next(child_iterators[-1], None)
+            if child is None:
+                post_order[stack.pop()] = counter
+                counter += 1
+                child_iterators.pop()
+                if stack:
+                    euler_tour.append(stack[-1])
+                continue
+            depth[child] = depth[stack[-1]] + 1
+            parents[child] = stack[-1]
+            pre_order[child] = counter
+            counter += 1
+            first_visit[child] = len(euler_tour)
+            euler_tour.append(child)
+            stack.append(child)
+            child_iterators.append(iter(children[child]))
+        if len(euler_tour) != 2 * numb_nodes + 1:
+            raise ValueError("The graph is not a tree.")
+
+        self.__pre_order = np.array(pre_order, dtype=np.int64)
+        self.__post_order = np.array(post_order, dtype=np.int64)
+        self.__depth = np.array(depth, dtype=np.int64)
+        self.__parents = np.array(parents, dtype=np.int64)
+        self.__first_visit = np.array(first_visit, dtype=np.int64)
+        self.__euler_tour = np.array(euler_tour, dtype=np.int64)
+        self.__pre_order_positions = np.argsort(self.__pre_order[:numb_nodes])
+        self.__pre_order_ranks = np.empty(numb_nodes, dtype=np.int64)
+        self.__pre_order_ranks[self.__pre_order_positions] = np.arange(numb_nodes)
+        self.__sparse_table = self.__build_sparse_table(self.__depth[self.__euler_tour])
+        self.__log2 = np.zeros(len(euler_tour) + 1, dtype=np.int64)
+        self.__log2[2:] = np.floor(np.log2(np.arange(2, len(euler_tour) + 1))).astype(np.int64)
+        self.__child_keys = None
+
+    @staticmethod
+    def __build_sparse_table(depths: np.ndarray) -> np.ndarray:
+        """
+        Builds a sparse table of the positions of the minimal depths in all ranges of a length that is a power of two.
+        :param depths: The depths of the nodes in the Euler tour.
+        :return: An array where entry [k, i] is the position of the minimal depth in depths[i:i + 2**k].
+        """
+        numb_levels = max(1, int(np.log2(len(depths))) + 1)
+        table = np.zeros((numb_levels, len(depths)), dtype=np.int64)
+        table[0] = np.arange(len(depths))
+        for level in range(1, numb_levels):
+            half = 1 << (level - 1)
+            left = table[level - 1, : len(depths) - half]
+            right = table[level - 1, half:]
+            table[level, : len(depths) - half] = np.where(depths[left] <= depths[right], left, right)
+        return table
+
+    def __len__(self):
+        return len(self.__nodes)
+
+    def __contains__(self, node):
+        return node in self.__positions
+
+    def positions(self, nodes: Iterable) -> np.ndarray:
+        """
+        Returns the positions of nodes in the index, which are used by the vectorized queries.
+        :param nodes: The nodes of the tree.
+        :return: An array with the position of every node.
+        """
+        return np.fromiter((self.__positions[node] for node in nodes), dtype=np.int64)
+
+    def depth(self, node) -> int:
+        """
+        Returns the depth of a node, where the root has depth 0.
+        :param node: A node of the tree.
+        :return: The number of edges between the root and the node.
+        """
+        return int(self.__depth[self.__positions[node]])
+
+    def is_ancestor(self, ancestor, node) -> bool:
+        """
+        Checks whether a node is a proper ancestor of another node.
+        :param ancestor: The possible ancestor.
+        :param node: The possible descendant.
+        :return: True if ancestor lies on the path from the root to node and differs from node, False otherwise.
+        """
+        ancestor = self.__positions[ancestor]
+        node = self.__positions[node]
+        return bool(
+            self.__pre_order[ancestor] < self.__pre_order[node]
+            and self.__post_order[node] < self.__post_order[ancestor]
+        )
+
+    def descendants(self, node) -> set:
+        """
+        Returns the descendants of a node, which follow the node in the pre-order of the tree.
+        :param node: A node of the tree.
+        :return: A set of the proper descendants of the node.
+        """
+        position = self.__positions[node]
+        rank = self.__pre_order_ranks[position]
+        size = (self.__post_order[position] - self.__pre_order[position] + 1) // 2
+        return {self.__nodes[descendant] for descendant in self.__pre_order_positions[rank + 1 : rank + size].tolist()}
+
+    def lca(self, node1, node2):
+        """
+        Returns the lowest common ancestor of two nodes, where a node counts as an ancestor of itself.
+        :param node1: A node of the tree.
+        :param node2: A node of the tree.
+        :return: The lowest common ancestor, or None if the nodes are in different trees of a forest.
+        """
+        position = int(self.lca_positions(self.positions((node1,)), self.positions((node2,)))[0])
+        return self.__nodes[position] if position < len(self.__nodes) else None
+
+    def lca_positions(self, positions1: np.ndarray, positions2: np.ndarray) -> np.ndarray:
+        """
+        Returns the positions of the lowest common ancestors of pairs of nodes.
+        :param positions1: The positions of the first nodes of the pairs.
+        :param positions2: The positions of the second nodes of the pairs.
+        :return: An array with the position of the lowest common ancestor of every pair.
+        """
+        first_visit1 = self.__first_visit[positions1]
+        first_visit2 = self.__first_visit[positions2]
+        left = np.minimum(first_visit1, first_visit2)
+        right = np.maximum(first_visit1, first_visit2) + 1
+        level = self.__log2[right - left]
+        candidate1 = self.__sparse_table[level, left]
+        candidate2 = self.__sparse_table[level, right - (1 << level)]
+        depths = self.__depth[self.__euler_tour]
+        minimum = np.where(depths[candidate1] <= depths[candidate2], candidate1, candidate2)
+        return self.__euler_tour[minimum]
+
+    def ancestor_matrix(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the ancestry relation between nodes.
+        :param positions: The positions of the nodes.
+        :return: A boolean matrix where entry [i, j] is True if node i is a proper ancestor of node j.
+        """
+        pre_order = self.__pre_order[positions]
+        post_order = self.__post_order[positions]
+        return (pre_order[:, None] < pre_order[None, :]) & (post_order[None, :] < post_order[:, None])
+
+    def lca_depth_matrix(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the depths of the lowest common ancestors of all pairs of nodes.
+        :param positions: The positions of the nodes.
+        :return: A matrix where entry [i, j] is the depth of the lowest common ancestor of node i and node j, which is -1
+            for nodes in different trees of a forest.
+        """
+        positions1, positions2 = np.meshgrid(positions, positions, indexing="ij")
+        lca = self.lca_positions(positions1.ravel(), positions2.ravel())
+        return self.__depth[lca].reshape(len(positions), len(positions))
+
+    def depths(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the depths of nodes.
+        :param positions: The positions of the nodes.
+        :return: An array with the depth of every node.
+        """
+        return self.__depth[positions]
+
+    def parents(self) -> np.ndarray:
+        """
+        Returns the parents of all nodes, including the virtual root at position len(self) that the roots are children
+        of.
+        :return: An array with the position of the parent of every node, which is -1 for the virtual root.
+        """
+        return self.__parents
+
+    def pre_order(self) -> np.ndarray:
+        """
+        Returns the nodes in pre-order, starting with the virtual root at position len(self).
+        :return: An array with the positions of the nodes in pre-order.
+        """
+        return np.concatenate(([len(self.__nodes)], self.__pre_order_positions))
+
+    def in_subtree(self, positions: np.ndarray, root_positions: np.ndarray) -> np.ndarray:
+        """
+        Checks whether nodes lie in the subtrees of other nodes, where a node lies in its own subtree. The arrays are
+        broadcast against each other.
+        :param positions: The positions of the nodes.
+        :param root_positions: The positions of the roots of the subtrees.
+        :return: A boolean array that is True where the node lies in the subtree of the root.
+        """
+        return (self.__pre_order[root_positions] <= self.__pre_order[positions]) & (
+            self.__post_order[positions] <= self.__post_order[root_positions]
+        )
+
+    def child_towards(self, ancestor_positions: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """
+        Returns the children of nodes on the paths to their proper descendants. The children of a node are found by a
+        binary search of the pre-order number of the descendant among the pre-order numbers of the children.
+        :param ancestor_positions: The positions of the ancestors.
+        :param positions: The positions of proper descendants of the ancestors.
+        :return: An array with the position of the child of every ancestor that is an ancestor of, or equal to, the
+            descendant.
+        """
+        numb_numbers = 2 * len(self.__nodes) + 3
+        if self.__child_keys is None:
+            children = np.flatnonzero(self.__parents >= 0)
+            keys = self.__pre_order[self.__parents[children]] * numb_numbers + self.__pre_order[children]
+            order = np.argsort(keys)
+            self.__child_keys = (keys[order], children[order])
+        keys, children = self.__child_keys
+        queries = self.__pre_order[ancestor_positions] * numb_numbers + self.__pre_order[positions]
+        return children[np.searchsorted(keys, queries, side="right") - 1]
@@ -0,0 +1,442 @@
+from __future__ import annotations
+from functools import lru_cache
+import re
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+
+_canonical_triplet_types = (r"1|2|3", r"1,2|3", r"1/2|3", r"1/2/3", r"1/2\3")
+
+_canonical_triplet_templates = ("{}|{}|{}", "{},{}|{}", "{}/{}|{}", "{}/{}/{}", "{}/{}\\{}")
+
+# Maps every triplet type onto the type code of its canonical form and the order in which the nodes of the triplet
+# appear in that canonical form.
+_triplet_type_encodings = {
+    r"1|2,3": (1, (1, 2, 0)),
+    r"1|2|3": (0, (0, 1, 2)),
+    r"1/2|3": (2, (0, 1, 2)),
+    r"1/2/3": (3, (0, 1, 2)),
+    r"1/2\3": (4, (0, 1, 2)),
+    r"1|2\3": (2, (2, 1, 0)),
+    r"1,2|3": (1, (0, 1, 2)),
+    r"1\2\3": (3, (2, 1, 0)),
+}
+
+_separators_to_triplet_types = {
+    (triplet_type[1], triplet_type[3]): triplet_type for triplet_type in _triplet_type_encodings
+}
+
+_triplet_type_templates = {
+    triplet_type: re.sub(r"[123]", "{}", triplet_type) for triplet_type in _triplet_type_encodings
+}
+
+_separator_pattern = re.compile(r"([|,/\\])")
+
+_LABEL_BITS = 20
+_LABEL_MASK = (1 << _LABEL_BITS) - 1
+
+
+def _split_triplet(triplet: str) -> tuple[str, tuple[str, str, str]]:
+    """
+    Splits a triplet string into its type and its three nodes.
+    :param triplet: A string representation of a triplet.
+    :return: A tuple containing the type of the triplet and the nodes in the order in which they appear in the string.
+    """
+    parts = _separator_pattern.split(triplet)
+    if len(parts) == 5:
+        triplet_type = _separators_to_triplet_types.get((parts[1], parts[3]))
+        if triplet_type is not None:
+            return triplet_type, (parts[0], parts[2], parts[4])
+    raise ValueError(f"Invalid triplet: {triplet}")
+
+
+def _format_triplet(triplet_type: str, nodes: tuple) -> str:
+    """
+    Creates the string representation of a triplet from its type and nodes, the inverse of _split_triplet.
+    :param triplet_type: The type of the triplet, e.g. "1|2,3".
+    :param nodes: The nodes of the triplet in the order in which they appear in the triplet string.
+    :return: The string representation of the triplet.
+    """
+    return _triplet_type_templates[triplet_type].format(*nodes)
+
+
+class LabelIndex:
+    """
+    A registry that interns labels to consecutive integers. Triplet arrays sharing a LabelIndex can be compared directly
+    on their keys; arrays with different indices are re-encoded when they are combined.
+    """
+
+    def __init__(self):
+        self.__ids: dict[str, int] = {}
+        self.__labels: list[str] = []
+
+    def __len__(self):
+        return len(self.__labels)
+
+    def __contains__(self, label):
+        return str(label) in self.__ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__labels)
+
+    def get(self, label) -> int | None:
+        """
+        Returns the integer of a label without registering it.
+        :param label: The label to look up.
+        :return: The integer representing the label, or None if the label is not in the index.
+        """
+        return self.__ids.get(str(label))
+
+    def intern(self, label) -> int:
+        """
+        Returns the integer of a label, registering the label if it was not seen before.
+        :param label: The label to intern.
+        :return: The integer representing the label.
+        """
+        label = str(label)
+        label_id = self.__ids.get(label)
+        if label_id is None:
+            label_id = len(self.__labels)
+            if label_id > _LABEL_MASK:
+                raise OverflowError(f"Cannot intern more than {_LABEL_MASK + 1} labels.")
+            self.__ids[label] = label_id
+            self.__labels.append(label)
+        return label_id
+
+    def label(self, label_id: int) -> str:
+        """
+        Returns the label belonging to an integer.
+        :param label_id: The integer of the label.
+        :return: The label.
+        """
+        return self.__labels[label_id]
+
+
+def _canonical_row(triplet_type: str, label_ids: tuple) -> tuple:
+    """
+    Orders the label integers, or the labels themselves, of a triplet into its canonical form.
+    :param triplet_type: The type of the triplet, e.g. "1|2,3".
+    :param label_ids: The integers or labels of the nodes in the order in which they appear in the triplet string.
+    :return: A tuple (type_code, a, b, c) describing the canonical form of the triplet.
+    """
+    type_code, order = _triplet_type_encodings[triplet_type]
+    a, b, c = (label_ids[i] for i in order)
+    if type_code == 0:
+        a, b, c = sorted((a, b, c))
+    elif type_code == 1 and b < a:
+        a, b = b, a
+    elif type_code == 4 and c < a:
+        a, c = c, a
+    return type_code, a, b, c
+
+
+@lru_cache(maxsize=4096)
+def _triplet_key(triplet: str) -> tuple:
+    """
+    Returns the canonical key of a triplet string. Equal triplets have equal keys, regardless of how they are written.
+    The keys of recently used strings are cached.
+    :param triplet: A string representation of a triplet.
+    :return: A tuple (type_code, a, b, c) describing the canonical form of the triplet in terms of its labels.
+    """
+    return _canonical_row(*_split_triplet(triplet))
+
+
+def _canonicalize(type_code: np.ndarray, a: np.ndarray, b: np.ndarray, c: np.ndarray):
+    """
+    Vectorized version of _canonical_row for rows that are already in the canonical node order, but whose label integers
+    changed, e.g. after re-encoding them with another LabelIndex.
+    """
+    a, b, c = a.copy(), b.copy(), c.copy()
+    fanned = type_code == 0
+    a[fanned], b[fanned], c[fanned] = np.sort(np.stack((a[fanned], b[fanned], c[fanned])), axis=0)
+    swap = (type_code == 1) & (b < a)
+    a[swap], b[swap] = b[swap], a[swap]
+    swap = (type_code == 4) & (c < a)
+    a[swap], c[swap] = c[swap], a[swap]
+    return a, b, c
+
+
+def _rechunk(batches: Iterable[tuple[np.ndarray, ...]], chunk_size: int) -> Iterator[tuple[np.ndarray, ...]]:
+    """
+    Regroups batches of row-aligned arrays into batches of exactly chunk_size rows, except for the last batch.
+    :param batches: An iterable of tuples of arrays, where the arrays of a tuple have the same number of rows.
+    :param chunk_size: The number of rows of every returned batch.
+    :return: An iterator of tuples of arrays with chunk_size rows.
+    """
+    buffer, numb_rows = [], 0
+    for batch in batches:
+        buffer.append(batch)
+        numb_rows += len(batch[0])
+        if numb_rows < chunk_size:
+            continue
+        columns = [np.concatenate(column) for column in zip(*buffer)]
+        start = 0
+        while numb_rows - start >= chunk_size:
+            yield tuple(column[start : start + chunk_size] for column in columns)
+            start += chunk_size
+        buffer = [tuple(column[start:] for column in columns)]
+        numb_rows -= start
+    if numb_rows > 0:
+        yield tuple(np.concatenate(column) for column in zip(*buffer))
+
+
+def _unique_keys(keys: np.ndarray) -> np.ndarray:
+    """
+    Returns the distinct keys in ascending order. Equivalent to np.unique, which is much slower on large int64 arrays
+    since NumPy 2 because it deduplicates through a hash table before sorting.
+    :param keys: An array of packed triplet keys.
+    :return: A sorted array of the distinct keys.
+    """
+    keys = np.sort(keys)
+    if len(keys) > 1:
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+    return keys
+
+
+def _pack_keys(type_code, a, b, c):
+    """
+    Packs (arrays of) encoded triplets into single 64-bit integers.
+    """
+    return (((type_code << _LABEL_BITS | a) << _LABEL_BITS | b) << _LABEL_BITS) | c
+
+
+class TripletArray:
+    """
+    A columnar store of triplets. The labels of the triplets are interned to integers in a LabelIndex and every triplet
+    is stored as a row in the NumPy columns (a, b, c, type_code) describing its canonical form. Triplets are only
+    converted to GeneralTriplet instances when they are requested.
+    """
+
+    def __init__(
+        self, a: np.ndarray, b: np.ndarray, c: np.ndarray, type_code: np.ndarray, label_index: LabelIndex = None
+    ):
+        """
+        Initializes a TripletArray instance.
+        :param a: The integer of the first label of every canonical triplet.
+        :param b: The integer of the second label of every canonical triplet.
+        :param c: The integer of the third label of every canonical triplet.
+        :param type_code: The index of the canonical type of every triplet in _canonical_triplet_types.
+        :param label_index: [Optional] The LabelIndex the label integers refer to. If None, a new LabelIndex is used.
+        """
+        self.a = np.asarray(a, dtype=np.int32)
+        self.b = np.asarray(b, dtype=np.int32)
+        self.c = np.asarray(c, dtype=np.int32)
+        self.type_code = np.asarray(type_code, dtype=np.int8)
+        self.label_index = LabelIndex() if label_index is None else label_index
+        self._keys = None
+
+    @classmethod
+    def from_tuples(cls, triplets: Iterable[tuple[str, tuple]], label_index: LabelIndex = None) -> "TripletArray":
+        """
+        Creates a TripletArray from triplets given as (type, nodes) tuples, as returned by _split_triplet.
+        :param triplets: An iterable of (type, nodes) tuples.
+        :param label_index: [Optional] The LabelIndex to intern the labels in. If None, a new LabelIndex is used.
+        :return: A TripletArray containing the given triplets.
+        """
+        if label_index is None:
+            label_index = LabelIndex()
+        intern = label_index.intern
+        rows = [
+            _canonical_row(triplet_type, (intern(nodes[0]), intern(nodes[1]), intern(nodes[2])))
+            for triplet_type, nodes in triplets
+        ]
+        if not rows:
+            return cls.empty(label_index)
+        type_code, a, b, c = zip(*rows)
+        return cls(a, b, c, type_code, label_index)
+
+    @classmethod
+    def from_label_ids(
+        cls, triplet_types: Sequence[str], type_index: np.ndarray, label_ids: np.ndarray, label_index: LabelIndex
+    ) -> "TripletArray":
+        """
+        Creates a TripletArray from triplets of which the labels are already interned, without creating a tuple or
+        string per triplet.
+        :param triplet_types: The triplet types that type_index refers to, e.g. ("1,2|3", "1|2|3").
+        :param type_index: The index in triplet_types of the type of every triplet.
+        :param label_ids: An array of shape (n, 3) with the label integers of every triplet, in the order in which they
+            appear in the triplet string.
+        :param label_index: The LabelIndex the label integers refer to.
+        :return: A TripletArray containing the given triplets.
+        """
+        encodings = [_triplet_type_encodings[triplet_type] for triplet_type in triplet_types]
+        type_code = np.array([encoding[0] for encoding in encodings], dtype=np.int64)[type_index]
+        orders = np.array([encoding[1] for encoding in encodings], dtype=np.int64).reshape(-1, 3)[type_index]
+        label_ids = np.take_along_axis(np.asarray(label_ids, dtype=np.int64).reshape(-1, 3), orders, axis=1)
+        a, b, c = _canonicalize(type_code, label_ids[:, 0], label_ids[:, 1], label_ids[:, 2])
+        return cls(a, b, c, type_code, label_index)
+
+    @classmethod
+    def from_triplets(cls, triplets: Iterable, label_index: LabelIndex = None) -> "TripletArray":
+        """
+        Creates a TripletArray from triplets, e.g. the triplets of a GeneralTree or MultifurcatingTree.
+        :param triplets: An iterable of triplet strings or instances of AbstractTriplet.
+        :param label_index: [Optional] The LabelIndex to intern the labels in. If None, a new LabelIndex is used.
+        :return: A TripletArray containing the given triplets.
+        """
+        return cls.from_tuples(
+            (
+                _split_triplet(triplet) if isinstance(triplet, str) else (triplet.type, triplet._nodes)
+                for triplet in triplets
+            ),
+            label_index,
+        )
+
+    @classmethod
+    def from_keys(cls, keys: np.ndarray, label_index: LabelIndex = None) -> "TripletArray":
+        """
+        Creates a TripletArray from packed 64-bit triplet keys.
+        :param keys: An array of packed triplet keys.
+        :param label_index: [Optional] The LabelIndex the keys were encoded with. If None, a new LabelIndex is used.
+        :return: A TripletArray containing the triplets of the keys.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        triplet_array = cls(
+            (keys >> 2 * _LABEL_BITS) & _LABEL_MASK,
+            (keys >> _LABEL_BITS) & _LABEL_MASK,
+            keys & _LABEL_MASK,
+            keys >> 3 * _LABEL_BITS,
+            label_index,
+        )
+        triplet_array._keys = keys
+        return triplet_array
+
+    @classmethod
+    def empty(cls, label_index: LabelIndex = None) -> "TripletArray":
+        """
+        Creates an empty TripletArray.
+        :param label_index: [Optional] The LabelIndex of the array. If None, a new LabelIndex is used.
+        :return: A TripletArray without triplets.
+        """
+        return cls.from_keys(np.empty(0, dtype=np.int64), label_index)
+
+    @property
+    def keys(self) -> np.ndarray:
+        """
+        Returns every triplet packed into a single 64-bit integer. Equal triplets of arrays sharing a LabelIndex have
+        equal keys.
+        :return: An array with the key of every triplet.
+        """
+        if self._keys is None:
+            self._keys = _pack_keys(
+                self.type_code.astype(np.int64), self.a.astype(np.int64), self.b.astype(np.int64), self.c
+            )
+        return self._keys
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes used by the columns of the array.
+        :return: The number of bytes of the columns.
+        """
+        return self.a.nbytes + self.b.nbytes + self.c.nbytes + self.type_code.nbytes
+
+    def __aligned_keys(self, other: "TripletArray") -> np.ndarray:
+        """
+        Returns the keys of another TripletArray encoded with the LabelIndex of this array.
+        :param other: The other TripletArray.
+        :return: The keys of the other array in terms of the label integers of this array.
+        """
+        if other.label_index is self.label_index:
+            return other.keys
+        label_ids = np.fromiter(
+            (self.label_index.intern(label) for label in other.label_index),
+            dtype=np.int64,
+            count=len(other.label_index),
+        )
+        type_code = other.type_code.astype(np.int64)
+        a, b, c = _canonicalize(type_code, label_ids[other.a], label_ids[other.b], label_ids[other.c])
+        return _pack_keys(type_code, a, b, c)
+
+    def to_strings(self) -> list[str]:
+        """
+        Returns the canonical string representation of every triplet.
+        :return: A list of triplet strings.
+        """
+        label = self.label_index.label
+        return [
+            _canonical_triplet_templates[type_code].format(label(a), label(b), label(c))
+            for type_code, a, b, c in zip(self.type_code.tolist(), self.a.tolist(), self.b.tolist(), self.c.tolist())
+        ]
+
+    def to_triplets(self) -> list:
+        """
+        Converts every triplet to a GeneralTriplet instance.
+        :return: A list of GeneralTriplet instances.
+        """
+        from .general_tree import Triplet as GeneralTriplet
+
+        return [GeneralTriplet(triplet) for triplet in self.to_strings()]
+
+    def unique(self) -> "TripletArray":
+        """
+        Returns the distinct triplets of the array, sorted by key.
+        :return: A TripletArray without duplicate triplets.
+        """
+        return TripletArray.from_keys(_unique_keys(self.keys), self.label_index)
+
+    def union(self, other: "TripletArray") -> "TripletArray":
+        keys = _unique_keys(np.concatenate((self.keys, self.__aligned_keys(other))))
+        return TripletArray.from_keys(keys, self.label_index)
+
+    def intersection(self, other: "TripletArray") -> "TripletArray":
+        keys = np.intersect1d(_unique_keys(self.keys), _unique_keys(self.__aligned_keys(other)), assume_unique=True)
+        return TripletArray.from_keys(keys, self.label_index)
+
+    def difference(self, other: "TripletArray") -> "TripletArray":
+        keys = np.setdiff1d(_unique_keys(self.keys), _unique_keys(self.__aligned_keys(other)), assume_unique=True)
+        return TripletArray.from_keys(keys, self.label_index)
+
+    def symmetric_difference(self, other: "TripletArray") -> "TripletArray":
+        keys = np.setxor1d(_unique_keys(self.keys), _unique_keys(self.__aligned_keys(other)), assume_unique=True)
+        return TripletArray.from_keys(keys, self.label_index)
+
+    def __len__(self):
+        return len(self.type_code)
+
+    def __getitem__(self, index: int):
+        from .general_tree import Triplet as GeneralTriplet
+
+        type_code = int(self.type_code[index])
+        labels = (self.label_index.label(int(column[index])) for column in (self.a, self.b, self.c))
+        return GeneralTriplet(_canonical_triplet_templates[type_code].format(*labels))
+
+    def __iter__(self) -> Iterator:
+        return iter(self.to_triplets())
+
+    def __contains__(self, item) -> bool:
+        triplet_type, nodes = _split_triplet(str(item))
+        label_ids = tuple(self.label_index.get(node) for node in nodes)
+        if None in label_ids:
+            return False
+        return bool(np.any(self.keys == _pack_keys(*_canonical_row(triplet_type, label_ids))))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({len(self)} triplets)"
+
+
+def parse_triplets(
+    triplets: Iterable[str], encoded: bool = True, label_index: LabelIndex = None
+) -> TripletArray | list:
+    """
+    Parses triplet strings in bulk. Every string is split a single time on its separator characters and the type of
+    the triplet is derived from the sequence of separators.
+    :param triplets: An iterable of triplet strings, e.g. the lines of a file. Surrounding whitespace is removed and
+        empty strings are skipped.
+    :param encoded: If True, the triplets are returned as a TripletArray. Otherwise, a list of GeneralTriplet instances
+        is returned, in which equal strings share a single instance.
+    :param label_index: [Optional] The LabelIndex to intern the labels in when encoded is True. If None, a new
+        LabelIndex is used.
+    :return: A TripletArray or a list of GeneralTriplet instances containing the parsed triplets.
+    """
+    strings = (triplet.strip() for triplet in triplets)
+    if not encoded:
+        from .general_tree import Triplet as GeneralTriplet
+
+        parsed = {}
+        return [
+            parsed[string] if string in parsed else parsed.setdefault(string, GeneralTriplet(string))
+            for string in strings
+            if string
+        ]
+    return TripletArray.from_tuples((_split_triplet(string) for string in strings if string), label_index)
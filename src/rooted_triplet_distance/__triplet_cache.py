@@ -0,0 +1,67 @@
+from __future__ import annotations
+from collections import OrderedDict, namedtuple
+
+from .__triplet_array import _triplet_key
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class TripletCache:
+    """
+    A bounded registry of shared triplet instances. Equal triplets of the same class resolve to a single instance, no
+    matter how they are written. When the registry is full, the least recently used instance is evicted.
+    """
+
+    def __init__(self, maxsize: int = 2**16):
+        """
+        Initializes a TripletCache instance.
+        :param maxsize: [Optional] The maximum number of instances kept in the cache. Default is 65536.
+        """
+        self.maxsize = maxsize
+        self.__instances: OrderedDict[tuple, object] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    def __len__(self):
+        return len(self.__instances)
+
+    def get(self, triplet_class: type, triplet):
+        """
+        Returns the shared instance of a triplet, creating it if the triplet is not in the cache.
+        :param triplet_class: The triplet class of the instance, e.g. GeneralTriplet.
+        :param triplet: A string representation of the triplet or an instance of AbstractTriplet.
+        :return: The shared instance of triplet_class that is equal to the triplet.
+        """
+        if type(triplet) is triplet_class:
+            key = (triplet_class, triplet._key)
+        else:
+            key = (triplet_class, _triplet_key(str(triplet)))
+        instance = self.__instances.get(key)
+        if instance is not None:
+            self.__hits += 1
+            self.__instances.move_to_end(key)
+            return instance
+        self.__misses += 1
+        instance = triplet if type(triplet) is triplet_class else triplet_class(triplet)
+        self.__instances[key] = instance
+        while len(self.__instances) > self.maxsize:
+            self.__instances.popitem(last=False)
+        return instance
+
+    def info(self) -> CacheInfo:
+        """
+        Returns the statistics of the cache, in the same form as functools.lru_cache.
+        :return: A CacheInfo tuple with the number of hits and misses, the maximum size and the current size.
+        """
+        return CacheInfo(self.__hits, self.__misses, self.maxsize, len(self.__instances))
+
+    def clear(self):
+        """
+        Removes all instances from the cache and resets its statistics.
+        """
+        self.__instances.clear()
+        self.__hits = 0
+        self.__misses = 0
+
+
+triplet_cache = TripletCache()
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+from networkx import DiGraph
+
+from .__tree_index import TreeIndex
+
+
+def _count_triplet_types(tree: DiGraph, labels) -> dict[str, int]:
+    """
+    Counts the triplets of every type of a tree from the subtree sizes and the numbers of labelled ancestors of its
+    nodes, without enumerating the triplets. The tree is traversed once and every node is processed in time linear in
+    its number of children.
+
+    With L the number of labelled nodes, sub(v) the number of labelled nodes in the subtree of v, anc(v) the number of
+    labelled proper ancestors of v, s_1, ..., s_k the values of sub for the children of v and e_2, e_3 the elementary
+    symmetric polynomials of these values, every node v contributes:
+        - "1\\2\\3": anc(v) * (sub(v) - 1) chains through v, if v is labelled;
+        - "1/2\\3": e_2 pairs below v in different subtrees, if v is labelled;
+        - "1/2|3": (sub(v) - 1) * (L - sub(v) - anc(v)) descendants of v with a node unrelated to v, if v is labelled;
+        - "1,2|3": e_2 * (L - sub(v) - anc(v)) pairs with their lowest common ancestor at v and a node outside;
+        - "1|2|3": e_3 triples with their lowest common ancestor at v.
+    :param tree: An instance of DiGraph representing the tree structure.
+    :param labels: The labels of the nodes of the tree.
+    :return: A dictionary with the number of triplets of every type, as they are enumerated for a GeneralTree.
+    """
+    labels = set(labels)
+    roots = [node for node in tree.nodes if tree.in_degree(node) == 0]
+    order = []
+    numb_labelled_ancestors = {root: 0 for root in roots}
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        numb_labelled = numb_labelled_ancestors[node] + (node in labels)
+        for child in tree.successors(node):
+            numb_labelled_ancestors[child] = numb_labelled
+            stack.append(child)
+
+    subtree_sizes = {}
+    for node in reversed(order):
+        subtree_sizes[node] = (node in labels) + sum(subtree_sizes[child] for child in tree.successors(node))
+    numb_labels = sum(subtree_sizes[root] for root in roots)
+
+    counts = {r"1\2\3": 0, r"1/2\3": 0, r"1/2|3": 0, r"1,2|3": 0, r"1|2|3": 0}
+    for node, children in [(node, list(tree.successors(node))) for node in order] + [(None, roots)]:
+        sizes = [subtree_sizes[child] for child in children]
+        sum_1 = sum(sizes)
+        sum_2 = sum(size * size for size in sizes)
+        sum_3 = sum(size * size * size for size in sizes)
+        pairs = (sum_1 * sum_1 - sum_2) // 2
+        triples = (sum_1**3 - 3 * sum_1 * sum_2 + 2 * sum_3) // 6
+        counts[r"1|2|3"] += triples
+        if node is None:
+            continue
+        outside = numb_labels - subtree_sizes[node] - numb_labelled_ancestors[node]
+        counts[r"1,2|3"] += pairs * outside
+        if node in labels:
+            counts[r"1\2\3"] += numb_labelled_ancestors[node] * sum_1
+            counts[r"1/2\3"] += pairs
+            counts[r"1/2|3"] += sum_1 * outside
+    return counts
+
+
+def _count_shared_multifurcating_triplets(index1: TreeIndex, index2: TreeIndex, labels: list) -> dict[str, int]:
+    """
+    Counts the fanned and resolved triplets that two trees have in common, without enumerating the triplets. A triplet
+    is formed by three labelled nodes of which none is an ancestor of another.
+    :param index1: The TreeIndex of the first tree.
+    :param index2: The TreeIndex of the second tree.
+    :param labels: The nodes that are labelled in both trees.
+    :return: A dictionary with the number of common triplets of the types "1,2|3" and "1|2|3".
+    """
+    counts = _SharedTripletCounter(index1, index2, labels).unrelated_counts()
+    return {r"1,2|3": counts[r"1,2|3"], r"1|2|3": counts[r"1|2|3"]}
+
+
+def _count_shared_general_triplets(index1: TreeIndex, index2: TreeIndex, labels: list) -> dict[str, int]:
+    """
+    Counts the triplets of every type that two general trees have in common, without enumerating the triplets.
+    :param index1: The TreeIndex of the first tree.
+    :param index2: The TreeIndex of the second tree.
+    :param labels: The nodes that are labelled in both trees.
+    :return: A dictionary with the number of common triplets of every type, i.e. "1\\2\\3", "1/2\\3", "1/2|3",
+        "1,2|3" and "1|2|3".
+    """
+    counter = _SharedTripletCounter(index1, index2, labels)
+    counts = {**counter.ancestor_counts(), **counter.unrelated_counts()}
+    return {triplet_type: counts[triplet_type] for triplet_type in (r"1\2\3", r"1/2\3", r"1/2|3", r"1,2|3", r"1|2|3")}
+
+
+class _SharedTripletCounter:
+    """
+    Counts the triplets that two trees have in common from the ancestry of their common labelled nodes, without
+    enumerating the triplets.
+
+    The fanned, resolved and "1/2\\3" triplets are counted from the pairs (a, b) of labelled nodes that are unrelated in
+    both trees, with u and w their lowest common ancestors in the first and second tree:
+        - a common resolved triplet "a,b|c" has a node c outside of the subtrees and ancestors of u and w;
+        - a common fanned triplet "a|b|c" has a node c in the subtrees of u and w, outside of the subtrees of the
+          children of u and w towards a and b, and is counted once for each of its three pairs;
+        - a common triplet "a/c\\b" has its node c as both u and w.
+    The sizes of the intersections of these sets are read from matrices over the internal nodes of both trees, which are
+    filled with one traversal per tree. The chains and "1/2|3" triplets are counted per labelled node b from the
+    nodes above, below and unrelated to b in both trees. Counting takes time and memory quadratic in the number of nodes.
+    """
+
+    def __init__(self, index1: TreeIndex, index2: TreeIndex, labels: list):
+        """
+        Initializes a _SharedTripletCounter instance.
+        :param index1: The TreeIndex of the first tree.
+        :param index2: The TreeIndex of the second tree.
+        :param labels: The nodes that are labelled in both trees.
+        """
+        self.__index1, self.__index2 = index1, index2
+        self.__numb_labels = len(labels)
+        self.__positions1, self.__positions2 = index1.positions(labels), index2.positions(labels)
+        # The position in the other tree of every labelled node of a tree, or -1 for other nodes. The last position of
+        # a tree is its virtual root, which is never labelled.
+        self.__other1 = np.full(len(index1) + 1, -1, dtype=np.int64)
+        self.__other1[self.__positions1] = self.__positions2
+        self.__other2 = np.full(len(index2) + 1, -1, dtype=np.int64)
+        self.__other2[self.__positions2] = self.__positions1
+        self.__internal1, self.__rows = self.__internal_nodes(index1)
+        self.__internal2, self.__columns = self.__internal_nodes(index2)
+        self.__dtype = np.min_scalar_type(len(labels))
+
+    @staticmethod
+    def __internal_nodes(index: TreeIndex) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the nodes of a tree that have children, including its virtual root.
+        :param index: The TreeIndex of the tree.
+        :return: A tuple (internal, rows) of the positions of the internal nodes and the row of every node in a matrix
+            over the internal nodes, which is -1 for the leaves.
+        """
+        parents = index.parents()
+        internal = np.flatnonzero(np.bincount(parents[parents >= 0], minlength=len(index) + 1))
+        rows = np.full(len(index) + 1, -1, dtype=np.int64)
+        rows[internal] = np.arange(len(internal))
+        return internal, rows
+
+    def __unrelated_pairs(self) -> Iterator[tuple[np.ndarray, ...]]:
+        """
+        Enumerates the pairs of labelled nodes that are unrelated in both trees, in batches of all pairs that share
+        their first node.
+        :return: An iterator of (a1, b1, a2, b2, u, w) batches of the positions of the nodes of the pairs in the first and
+            second tree and of their lowest common ancestors in the first and second tree.
+        """
+        index1, index2 = self.__index1, self.__index2
+        positions1, positions2 = self.__positions1, self.__positions2
+        for first in range(self.__numb_labels - 1):
+            a1, b1 = np.full(self.__numb_labels - first - 1, positions1[first]), positions1[first + 1 :]
+            a2, b2 = np.full(self.__numb_labels - first - 1, positions2[first]), positions2[first + 1 :]
+            unrelated = ~(index1.in_subtree(a1, b1) | index1.in_subtree(b1, a1))
+            unrelated &= ~(index2.in_subtree(a2, b2) | index2.in_subtree(b2, a2))
+            a1, b1, a2, b2 = a1[unrelated], b1[unrelated], a2[unrelated], b2[unrelated]
+            yield a1, b1, a2, b2, index1.lca_positions(a1, b1), index2.lca_positions(a2, b2)
+
+    def __subtree_matrix(self) -> np.ndarray:
+        """
+        Computes the number of common labelled nodes in the subtrees of every pair of internal nodes.
+        :return: A matrix where entry [i, j] is the number of labelled nodes in the subtrees of both the i-th internal
+            node of the first tree and the j-th internal node of the second tree.
+        """
+        index1, index2 = self.__index1, self.__index2
+        rows, other1, internal2 = self.__rows, self.__other1, self.__internal2
+        subtree = np.zeros((len(self.__internal1), len(internal2)), dtype=self.__dtype)
+        children = {}
+        for node in index1.pre_order()[1:].tolist():
+            children.setdefault(int(index1.parents()[node]), []).append(node)
+        for node in index1.pre_order()[::-1].tolist():
+            if rows[node] < 0:
+                continue
+            node_children = np.array(children[node], dtype=np.int64)
+            leaves = node_children[rows[node_children] < 0]
+            members = other1[np.concatenate(([node], leaves))]
+            members = members[members >= 0]
+            row = index2.in_subtree(members[:, None], internal2[None, :]).sum(axis=0, dtype=self.__dtype)
+            for child in rows[node_children[rows[node_children] >= 0]].tolist():
+                row += subtree[child]
+            subtree[rows[node]] = row
+        return subtree
+
+    def __ancestor_matrix(
+        self, index: TreeIndex, rows: np.ndarray, other: np.ndarray, relation, numb_columns: int
+    ) -> np.ndarray:
+        """
+        Accumulates a relation of the labelled ancestors of the internal nodes of a tree along the paths from the root.
+        :param index: The TreeIndex of the tree with the ancestors.
+        :param rows: The row of every node of the tree in the matrix, which is -1 for the leaves.
+        :param other: The position in the other tree of every labelled node of the tree, or -1 for other nodes.
+        :param relation: A function that maps the position in the other tree of a labelled ancestor onto its
+            contribution to the row of a node.
+        :param numb_columns: The number of columns of the matrix.
+        :return: A matrix where row i is the sum of the contributions of the ancestors of the i-th internal node.
+        """
+        parents = index.parents()
+        matrix = np.zeros((np.count_nonzero(rows >= 0), numb_columns), dtype=self.__dtype)
+        for node in index.pre_order()[1:].tolist():
+            if rows[node] < 0:
+                continue
+            parent = parents[node]
+            matrix[rows[node]] = matrix[rows[parent]]
+            if other[parent] >= 0:
+                matrix[rows[node]] += relation(other[parent])
+        return matrix
+
+    def __intersection(self, node1: np.ndarray, node2: np.ndarray, subtree: np.ndarray) -> np.ndarray:
+        """
+        Counts the common labelled nodes in the subtrees of pairs of nodes, of which either may be a leaf.
+        :param node1: The positions of the nodes in the first tree.
+        :param node2: The positions of the nodes in the second tree.
+        :param subtree: The matrix of __subtree_matrix.
+        :return: An array with the number of labelled nodes in the subtrees of both nodes of every pair.
+        """
+        other1, other2 = self.__other1, self.__other2
+        row, column = self.__rows[node1], self.__columns[node2]
+        counts = np.zeros(len(node1), dtype=np.int64)
+        internal = (row >= 0) & (column >= 0)
+        counts[internal] = subtree[row[internal], column[internal]]
+        leaf1 = row < 0
+        counts[leaf1] = (other1[node1[leaf1]] >= 0) & self.__index2.in_subtree(other1[node1[leaf1]], node2[leaf1])
+        leaf2 = (row >= 0) & (column < 0)
+        counts[leaf2] = (other2[node2[leaf2]] >= 0) & self.__index1.in_subtree(other2[node2[leaf2]], node1[leaf2])
+        return counts
+
+    def __contains1(self, node1: np.ndarray, node2: np.ndarray) -> np.ndarray:
+        # Whether node2 is labelled and lies in the subtree of node1 in the first tree.
+        labelled = self.__other2[node2]
+        return (labelled >= 0) & self.__index1.in_subtree(labelled, node1)
+
+    def __contains2(self, node1: np.ndarray, node2: np.ndarray) -> np.ndarray:
+        # Whether node1 is labelled and lies in the subtree of node2 in the second tree.
+        labelled = self.__other1[node1]
+        return (labelled >= 0) & self.__index2.in_subtree(labelled, node2)
+
+    def __related_sizes(self, index: TreeIndex, labelled: np.ndarray) -> np.ndarray:
+        """
+        Counts the labelled nodes that lie in the subtree of, or are an ancestor of, every node of a tree.
+        :param index: The TreeIndex of the tree.
+        :param labelled: Whether every node of the tree is a common labelled node.
+        :return: An array with the number of labelled nodes related to, or equal to, every node.
+        """
+        parents, order = index.parents(), index.pre_order()
+        subtree_sizes = labelled.astype(np.int64)
+        for node in order[:0:-1].tolist():
+            subtree_sizes[parents[node]] += subtree_sizes[node]
+        ancestor_sizes = np.zeros(len(index) + 1, dtype=np.int64)
+        for node in order[1:].tolist():
+            ancestor_sizes[node] = ancestor_sizes[parents[node]] + labelled[parents[node]]
+        return subtree_sizes + ancestor_sizes
+
+    def unrelated_counts(self) -> dict[str, int]:
+        """
+        Counts the common triplets with a pair of nodes that are unrelated in both trees.
+        :return: A dictionary with the number of common triplets of the types "1/2\\3", "1,2|3" and "1|2|3".
+        """
+        index1, index2 = self.__index1, self.__index2
+        rows, columns = self.__rows, self.__columns
+        other1, other2 = self.__other1, self.__other2
+        internal1, internal2 = self.__internal1, self.__internal2
+        subtree = self.__subtree_matrix()
+        # related[u, w]: the number of labelled nodes that lie in the subtree of, or are an ancestor of, both u and w.
+        related = subtree.copy()
+        related += self.__ancestor_matrix(
+            index2, columns, other2, lambda node: index1.in_subtree(node, internal1), len(internal1)
+        ).T
+        related += self.__ancestor_matrix(
+            index1,
+            rows,
+            other1,
+            lambda node: index2.in_subtree(node, internal2) | index2.in_subtree(internal2, node),
+            len(internal2),
+        )
+        related_sizes1 = self.__related_sizes(index1, other1 >= 0)
+        related_sizes2 = self.__related_sizes(index2, other2 >= 0)
+
+        numb_parents = numb_resolved = numb_fanned = 0
+        for a1, b1, a2, b2, u, w in self.__unrelated_pairs():
+            numb_parents += int(np.count_nonzero((other1[u] >= 0) & (other1[u] == w)))
+            numb_resolved += int(
+                (self.__numb_labels - related_sizes1[u] - related_sizes2[w] + related[rows[u], columns[w]]).sum()
+            )
+            # The labelled nodes strictly below u and w, minus those below the children towards a and b.
+            child_a1, child_b1 = index1.child_towards(u, a1), index1.child_towards(u, b1)
+            child_a2, child_b2 = index2.child_towards(w, a2), index2.child_towards(w, b2)
+            fanned = self.__intersection(u, w, subtree) - self.__contains2(u, w) - self.__contains1(u, w)
+            fanned += (other1[u] >= 0) & (other1[u] == w)
+            for child2 in (child_a2, child_b2):
+                fanned -= self.__intersection(u, child2, subtree) - self.__contains2(u, child2)
+            for child1 in (child_a1, child_b1):
+                fanned -= self.__intersection(child1, w, subtree) - self.__contains1(child1, w)
+                fanned += self.__intersection(child1, child_a2, subtree) + self.__intersection(
+                    child1, child_b2, subtree
+                )
+            numb_fanned += int(fanned.sum())
+        return {r"1/2\3": numb_parents, r"1,2|3": numb_resolved, r"1|2|3": numb_fanned // 3}
+
+    def ancestor_counts(self) -> dict[str, int]:
+        """
+        Counts the common chains and triplets of a node, its descendant and a node unrelated to both.
+        :return: A dictionary with the number of common triplets of the types "1\\2\\3" and "1/2|3".
+        """
+        index1, index2 = self.__index1, self.__index2
+        positions1, positions2 = self.__positions1, self.__positions2
+        numb_chains = numb_partial = 0
+        for label in range(self.__numb_labels):
+            below1 = index1.in_subtree(positions1, positions1[label])
+            below2 = index2.in_subtree(positions2, positions2[label])
+            above1 = index1.in_subtree(positions1[label], positions1)
+            above2 = index2.in_subtree(positions2[label], positions2)
+            # The node itself is counted as below and above the node in both trees.
+            numb_below = np.count_nonzero(below1 & below2) - 1
+            numb_above = np.count_nonzero(above1 & above2) - 1
+            numb_unrelated = np.count_nonzero(~(below1 | above1 | below2 | above2))
+            numb_chains += numb_below * numb_above
+            numb_partial += numb_below * numb_unrelated
+        return {r"1\2\3": int(numb_chains), r"1/2|3": int(numb_partial)}
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from statistics import NormalDist
+
+import numpy as np
+
+from .__triplet_array import LabelIndex
+
+
+@dataclass(frozen=True)
+class TripletDistanceEstimate:
+    """
+    An estimate of the triplet distance between two graphs from a random sample of triples of labels, with a confidence
+    interval for the exact distance.
+    """
+
+    distance: float
+    lower: float
+    upper: float
+    confidence: float
+    samples: int
+
+    @property
+    def half_width(self) -> float:
+        """
+        Returns half of the width of the confidence interval.
+        :return: The half width of the interval.
+        """
+        return (self.upper - self.lower) / 2
+
+
+def _sample_triples(numb_labels: int, numb_samples: int, generator: np.random.Generator) -> np.ndarray:
+    """
+    Draws triples of distinct labels uniformly at random and with replacement.
+    :param numb_labels: The number of labels to draw from, at least three.
+    :param numb_samples: The number of triples to draw.
+    :param generator: The random number generator.
+    :return: An array of shape (numb_samples, 3) with the positions of the labels of every triple.
+    """
+    first = generator.integers(numb_labels, size=numb_samples)
+    second = generator.integers(numb_labels - 1, size=numb_samples)
+    second += second >= first
+    low, high = np.minimum(first, second), np.maximum(first, second)
+    third = generator.integers(numb_labels - 2, size=numb_samples)
+    third += third >= low
+    third += third >= high
+    return np.stack((first, second, third), axis=1)
+
+
+def _estimate_triplet_distance(
+    graph1,
+    graph2,
+    samples: int,
+    seed: int | None,
+    confidence: float,
+    tolerance: float | None,
+    max_samples: int,
+    common_labels: bool = False,
+) -> TripletDistanceEstimate:
+    """
+    Estimates the triplet distance between two graphs. Every sampled triple of labels contributes the number of
+    triplets on it that are in only one of the graphs and in either graph, and the distance is estimated by the ratio
+    of both sums. The confidence interval follows from the normal approximation of this ratio estimator.
+    :param graph1: The first graph.
+    :param graph2: The second graph.
+    :param samples: The number of triples to sample, or the number of triples per round if tolerance is given.
+    :param seed: The seed of the random number generator, or None for a random seed.
+    :param confidence: The confidence level of the interval.
+    :param tolerance: The half width of the interval at which sampling stops, or None to sample once.
+    :param max_samples: The maximum number of triples to sample if tolerance is given.
+    :param common_labels: [Optional] Whether to sample triples of the labels of both graphs only, instead of triples of
+        the labels of either graph. Default is False.
+    :return: The TripletDistanceEstimate.
+    """
+    if samples < 2:
+        raise ValueError(f"samples must be at least 2, got {samples}.")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must lie between 0 and 1, got {confidence}.")
+    if tolerance is not None and tolerance <= 0:
+        raise ValueError(f"tolerance must be positive, got {tolerance}.")
+    labels1, labels2 = graph1._labelled_nodes(), graph2._labelled_nodes()
+    if common_labels:
+        labels2 = set(labels2)
+        labels = [label for label in labels1 if label in labels2]
+    else:
+        labels = list(dict.fromkeys(labels1 + labels2))
+    if len(labels) < 3:
+        raise ValueError("The graphs need at least three labels to have triplets.")
+    label_index = LabelIndex()
+    for label in labels:
+        label_index.intern(label)
+    generator = np.random.default_rng(seed)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    # The sums of the differing (a) and total (b) triplet counts per triple, of their squares and of their products.
+    sums = np.zeros(5)
+    numb_samples = 0
+    while True:
+        triples = _sample_triples(len(labels), samples, generator)
+        rows1, keys1 = graph1._sample_triplet_keys(labels, triples, label_index)
+        rows2, keys2 = graph2._sample_triplet_keys(labels, triples, label_index)
+        pairs, counts = np.unique(
+            np.concatenate((np.stack((rows1, keys1), axis=1), np.stack((rows2, keys2), axis=1))),
+            axis=0,
+            return_counts=True,
+        )
+        total = np.bincount(pairs[:, 0], minlength=samples)
+        shared = np.bincount(pairs[counts == 2, 0], minlength=samples)
+        differing = total - shared
+        sums += [differing.sum(), total.sum(), differing @ differing, total @ total, differing @ total]
+        numb_samples += samples
+        estimate = _ratio_estimate(sums, numb_samples, z, confidence)
+        if tolerance is None or estimate.half_width <= tolerance or numb_samples + samples > max_samples:
+            return estimate
+
+
+def _ratio_estimate(sums: np.ndarray, numb_samples: int, z: float, confidence: float) -> TripletDistanceEstimate:
+    """
+    Computes the estimate of the distance and its confidence interval from the sums over the sampled triples.
+    :param sums: The sums of a, b, a^2, b^2 and a*b, where a and b are the numbers of differing and total triplets per
+        triple.
+    :param numb_samples: The number of sampled triples.
+    :param z: The quantile of the standard normal distribution of the confidence level.
+    :param confidence: The confidence level.
+    :return: The TripletDistanceEstimate.
+    """
+    differing, total, differing_squares, total_squares, products = sums
+    if total == 0:
+        return TripletDistanceEstimate(float("nan"), 0.0, 1.0, confidence, numb_samples)
+    distance = differing / total
+    residuals = differing_squares - 2 * distance * products + distance**2 * total_squares
+    variance = max(residuals, 0.0) / (numb_samples - 1) / numb_samples / (total / numb_samples) ** 2
+    half_width = z * variance**0.5
+    return TripletDistanceEstimate(
+        float(distance),
+        float(max(distance - half_width, 0.0)),
+        float(min(distance + half_width, 1.0)),
+        confidence,
+        numb_samples,
+    )
@@ -1,9 +1,54 @@
 from __future__ import annotations
-from dataclasses import dataclass
-import re
 
 
-from ..__abstract import AbstractTriplet, _triplet_types_to_re_pattern
+from ..__abstract import AbstractTriplet
+
+# The relations below are shared by all triplets of a type. They refer to the nodes of a triplet by their position in
+# the triplet string, e.g. (1, (0, 2)) in _descendant_positions[r"1/2\3"] means that the second node is the parent of
+# the first and third node.
+_descendant_positions = {
+    r"1|2,3": (),
+    r"1|2|3": (),
+    r"1/2|3": ((1, (0,)),),
+    r"1/2/3": ((2, (0, 1)), (1, (0,))),
+    r"1/2\3": ((1, (0, 2)),),
+    r"1|2\3": ((1, (2,)),),
+    r"1,2|3": (),
+    r"1\2\3": ((0, (1, 2)), (1, (2,))),
+}
+
+_separation_positions = {
+    r"1|2,3": ((0, (1, 2)), (1, (0, 2)), (2, (0, 1))),
+    r"1|2|3": ((0, (1, 2)), (1, (0, 2)), (2, (0, 1))),
+    r"1/2|3": ((0, (2,)), (1, (2,)), (2, (0, 1))),
+    r"1/2/3": (),
+    r"1/2\3": ((0, (2,)), (2, (0,))),
+    r"1|2\3": ((0, (1, 2)), (1, (0,)), (2, (0,))),
+    r"1,2|3": ((0, (1, 2)), (1, (0, 2)), (2, (0, 1))),
+    r"1\2\3": (),
+}
+
+_root_positions = {
+    r"1|2,3": (),
+    r"1|2|3": (),
+    r"1/2|3": (),
+    r"1/2/3": (2,),
+    r"1/2\3": (1,),
+    r"1|2\3": (),
+    r"1,2|3": (),
+    r"1\2\3": (0,),
+}
+
+_branch_positions = {
+    r"1|2,3": ((1, 2), (0,)),
+    r"1|2|3": ((0,), (1,), (2,)),
+    r"1/2|3": ((0, 1), (2,)),
+    r"1/2/3": ((0, 1, 2),),
+    r"1/2\3": ((0,), (2,)),
+    r"1|2\3": ((1, 2), (0,)),
+    r"1,2|3": ((0, 1), (2,)),
+    r"1\2\3": ((0, 1, 2),),
+}
 
 
 class GeneralTriplet(AbstractTriplet):
@@ -12,38 +57,33 @@ class GeneralTriplet(AbstractTriplet):
     tree structure. It can also represent more complex triplets than just the fanned and resolved triplets.
     """
 
+    __slots__ = ()
+
     def __init__(self, triplet: str | "GeneralTriplet"):
         """
         Initializes a GeneralTriplet instance.
         :param triplet: A string representation of the triplet or an instance of AbstractTriplet.
         """
-        if isinstance(triplet, GeneralTriplet):
-            super().__init__(triplet)
-            self.parts = triplet.parts
-            self.labels = triplet.labels
-            self._branches = triplet._branches
-            self._possible_root = triplet._possible_root
-            self._descendants = triplet._descendants
-            self._separations = triplet._separations
-            self.type = triplet.type
-            self.__nodes = triplet.__nodes
-        else:
-            super().__init__(triplet)
-            self.parts = {tuple(part.split(",")) if "," in part else part for part in re.split(r"[/\\|]", self._string)}
-            self.labels = set()
-            for label in self.parts:
-                self.labels = self.labels.union({label} if isinstance(label, str) else set(label))
-            self._branches = self.__get_branches()
-            self._possible_root = self.__get_possible_root()
-            self.__nodes = _triplet_types_to_re_pattern[self.type].fullmatch(self._string).groups()
-            self._descendants = self.__get_descendants()
-            self._separations = self.__get_separations()
+        super().__init__(triplet)
 
     @property
-    def root(self) -> set[str]:
+    def parts(self) -> set:
+        """
+        Returns the parts of the triplet, where nodes separated by a comma are grouped together in a tuple.
+        :return: A set containing the labels and tuples of labels of the triplet.
+        """
+        node_1, node_2, node_3 = self._nodes
+        if self.type == "1|2,3":
+            return {node_1, (node_2, node_3)}
+        elif self.type == "1,2|3":
+            return {(node_1, node_2), node_3}
+        return {node_1, node_2, node_3}
+
+    @property
+    def root(self) -> frozenset[str]:
         """
         Returns the possible root of the triplet.
-        :return: A set containing the possible root node(s) of the triplet.
+        :return: A frozenset containing the possible root node(s) of the triplet.
         """
         return self._possible_root
 
@@ -53,94 +93,34 @@ class GeneralTriplet(AbstractTriplet):
         Returns the branches of the triplet.
         :return: A list of sets, where each set contains the labels of the nodes in that branch.
         """
-        return [branch.copy() for branch in self._branches]
+        return self._branches
+
+    @property
+    def _possible_root(self) -> frozenset[str]:
+        return frozenset(self._nodes[i] for i in _root_positions[self.type])
+
+    @property
+    def _branches(self) -> list[set]:
+        nodes = self._nodes
+        branches = [{nodes[i] for i in branch} for branch in _branch_positions[self.type]]
+        if self.type == r"1/2\3":
+            branches.sort(key=min)
+        return branches
 
-    def __get_descendants(self) -> dict[str, set]:
+    @property
+    def _descendants(self) -> dict[str, set]:
         """
         Returns a dictionary where keys are nodes and values are sets of their descendants in that triplet.
         :return: A dictionary mapping each node to its descendants in that triplet.
         """
-        nodes = self.__nodes
-        if self.type == "1|2,3":
-            return {}
-        elif self.type == "1|2|3":
-            return {}
-        elif self.type == "1/2|3":
-            return {nodes[1]: {nodes[0]}}
-        elif self.type == "1/2/3":
-            return {nodes[2]: {nodes[0], nodes[1]}, nodes[1]: {nodes[0]}}
-        elif self.type == r"1/2\3":
-            return {nodes[1]: {nodes[0], nodes[2]}}
-        elif self.type == r"1|2\3":
-            return {nodes[1]: {nodes[2]}}
-        elif self.type == r"1,2|3":
-            return {}
-        elif self.type == r"1\2\3":
-            return {nodes[0]: {nodes[1], nodes[2]}, nodes[1]: {nodes[2]}}
-
-    def __get_separations(self) -> dict[str, set]:
+        nodes = self._nodes
+        return {nodes[i]: {nodes[j] for j in others} for i, others in _descendant_positions[self.type]}
+
+    @property
+    def _separations(self) -> dict[str, set]:
         """
         Returns a dictionary where keys are nodes and values are sets of nodes that are separated from that node in the triplet.
         :return: A dictionary mapping each node to the set of nodes that are separated from it in the triplet.
         """
-        nodes = self.__nodes
-        if self.type == "1|2,3":
-            return {nodes[0]: {nodes[1], nodes[2]}, nodes[1]: {nodes[0], nodes[2]}, nodes[2]: {nodes[0], nodes[1]}}
-        elif self.type == "1|2|3":
-            return {nodes[0]: {nodes[1], nodes[2]}, nodes[1]: {nodes[0], nodes[2]}, nodes[2]: {nodes[0], nodes[1]}}
-        elif self.type == "1/2|3":
-            return {nodes[0]: {nodes[2]}, nodes[1]: {nodes[2]}, nodes[2]: {nodes[0], nodes[1]}}
-        elif self.type == "1/2/3":
-            return {}
-        elif self.type == r"1/2\3":
-            return {nodes[0]: {nodes[2]}, nodes[2]: {nodes[0]}}
-        elif self.type == r"1|2\3":
-            return {nodes[0]: {nodes[1], nodes[2]}, nodes[1]: {nodes[0]}, nodes[2]: {nodes[0]}}
-        elif self.type == r"1,2|3":
-            return {nodes[0]: {nodes[1], nodes[2]}, nodes[1]: {nodes[0], nodes[2]}, nodes[2]: {nodes[0], nodes[1]}}
-        elif self.type == r"1\2\3":
-            return {}
-
-    def __get_possible_root(self) -> set:
-        """
-        Returns the possible root of the triplet based on its type.
-        :return:  A set containing the possible root node(s) of the triplet.
-        """
-        if self.type == "1|2,3":
-            return set()
-        elif self.type == "1|2|3":
-            return set()
-        elif self.type == "1/2|3":
-            return set()
-        elif self.type == "1/2/3":
-            return {self._tree_relation[0]}
-        elif self.type == r"1/2\3":
-            return {self._tree_relation[0]}
-        elif self.type == r"1|2\3":
-            return set()
-        elif self.type == r"1,2|3":
-            return set()
-        elif self.type == r"1\2\3":
-            return {self._tree_relation[0]}
-
-    def __get_branches(self) -> list[set]:
-        """
-        Returns the branches of the triplet based on its type.
-        :return: A list of sets, where each set contains the labels of the nodes in that branch.
-        """
-        if self.type == "1|2,3":
-            return [set(self._tree_relation[1][1][1]), {self._tree_relation[1][0]}]
-        elif self.type == "1|2|3":
-            return [{label} for label in self.labels]
-        elif self.type == "1/2|3":
-            return [{self._tree_relation[1][1][0], self._tree_relation[1][1][1][0]}, {self._tree_relation[1][0]}]
-        elif self.type == "1/2/3":
-            return [self.labels]
-        elif self.type == r"1/2\3":
-            return [{self._tree_relation[1][0]}, {self._tree_relation[1][1]}]
-        elif self.type == r"1|2\3":
-            return [{self._tree_relation[1][1][0], self._tree_relation[1][1][1][0]}, {self._tree_relation[1][0]}]
-        elif self.type == r"1,2|3":
-            return [set(self._tree_relation[1][1][1]), {self._tree_relation[1][0]}]
-        elif self.type == r"1\2\3":
-            return [self.labels]
+        nodes = self._nodes
+        return {nodes[i]: {nodes[j] for j in others} for i, others in _separation_positions[self.type]}
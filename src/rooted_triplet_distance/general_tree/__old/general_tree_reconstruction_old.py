@@ -1,10 +1,21 @@
 from random import choice
+import re
 
 from rooted_triplet_distance.__abstract import AbstractTreeReconstruction
-from rooted_triplet_distance.general_tree.__general_triplet import (
-    GeneralTriplet,
-    _triplet_types_to_re_pattern as _triplet_types,
-)
+from rooted_triplet_distance.general_tree.__general_triplet import GeneralTriplet
+
+_re_patern_to_triplet_types = {
+    re.compile(r"(.*)\|(.*),(.*)"): r"1|2,3",
+    re.compile(r"(.*)\|(.*)\|(.*)"): r"1|2|3",
+    re.compile(r"(.*)/(.*)\|(.*)"): r"1/2|3",
+    re.compile(r"(.*)/(.*)/(.*)"): r"1/2/3",
+    re.compile(r"(.*)/(.*)\\(.*)"): r"1/2\3",
+    re.compile(r"(.*)\|(.*)\\(.*)"): r"1|2\3",
+    re.compile(r"(.*),(.*)\|(.*)"): r"1,2|3",
+    re.compile(r"(.*)\\(.*)\\(.*)"): r"1\2\3",
+}
+
+_triplet_types = {triplet_type: re_pattern for re_pattern, triplet_type in _re_patern_to_triplet_types.items()}
 
 
 class GeneralTreeReconstruction(AbstractTreeReconstruction):
@@ -1,19 +1,163 @@
-import functools
-from itertools import combinations
+from typing import Callable, Iterator
 
-from networkx import ancestors, descendants
-from networkx.classes import DiGraph
+import numpy as np
 
-from ..__abstract import AbstractGraph
+from ..__abstract import AbstractTree
+from ..__tree_index import TreeIndex
+from ..__triplet_counting import _count_shared_general_triplets, _count_triplet_types
 from .__general_triplet import GeneralTriplet
 
+_classification_types = (r"1\2\3", r"1/2\3", r"1/2|3", r"1,2|3", r"1|2|3")
 
-class GeneralTree(AbstractGraph):
+# The cases of the classification of a triple of labelled nodes (node1, node2, node3), in the order in which they are
+# tested. Every case holds the index of its type in _classification_types, or -1 if the triple does not form a triplet,
+# and the order in which the nodes of the triple appear in the triplet string.
+_classification_cases = (
+    (0, (0, 2, 1)),
+    (0, (0, 1, 2)),
+    (1, (1, 0, 2)),
+    (-1, (0, 1, 2)),
+    (0, (1, 2, 0)),
+    (0, (1, 0, 2)),
+    (1, (0, 1, 2)),
+    (-1, (0, 1, 2)),
+    (0, (2, 1, 0)),
+    (0, (2, 0, 1)),
+    (1, (0, 2, 1)),
+    (-1, (0, 1, 2)),
+    (2, (0, 1, 2)),
+    (2, (1, 0, 2)),
+    (2, (0, 2, 1)),
+    (2, (2, 0, 1)),
+    (2, (1, 2, 0)),
+    (2, (2, 1, 0)),
+    (3, (0, 1, 2)),
+    (3, (1, 2, 0)),
+    (3, (0, 2, 1)),
+    (4, (0, 1, 2)),
+)
+_case_types = np.array([case[0] for case in _classification_cases], dtype=np.int64)
+_case_orders = np.array([case[1] for case in _classification_cases], dtype=np.int64)
+
+
+def _classify_general_triples(
+    is_ancestor: np.ndarray,
+    lca_depth: np.ndarray,
+    depth: np.ndarray,
+    node1: np.ndarray,
+    node2: np.ndarray,
+    node3: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Classifies triples of nodes of a tree into general triplets.
+    :param is_ancestor: A boolean matrix where entry [i, j] is True if node i is a proper ancestor of node j.
+    :param lca_depth: A matrix where entry [i, j] is the depth of the lowest common ancestor of node i and node j.
+    :param depth: The depth of every node.
+    :param node1: The first node of every triple.
+    :param node2: The second node of every triple.
+    :param node3: The third node of every triple.
+    :return: A tuple (types, orders), where types holds the index in _classification_types of every triplet and orders
+        the nodes of every triplet in the order in which they appear in the triplet string. Triples that do not form a
+        triplet are left out.
+    """
+    nodes = (node1, node2, node3)
+    return _classify_general_relations(
+        lambda i, j: is_ancestor[nodes[i], nodes[j]],
+        lambda i, j: lca_depth[nodes[i], nodes[j]],
+        [depth[node] for node in nodes],
+        np.stack(nodes, axis=1),
+    )
+
+
+def _classify_sampled_general_triples(index: TreeIndex, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Classifies triples of nodes of a tree into general triplets with ancestor and lowest common ancestor queries per
+    triple, without computing the relations between all pairs of nodes.
+    :param index: The TreeIndex of the tree.
+    :param positions: An array of shape (k, 3) with the positions in the index of the nodes of every triple.
+    :return: A tuple (types, orders), where types holds the index in _classification_types of every triplet and orders
+        the flat positions in positions of the nodes of every triplet, in the order in which they appear in the triplet
+        string. Triples that do not form a triplet are left out.
+    """
+    columns = positions.T
+    return _classify_general_relations(
+        lambda i, j: index.in_subtree(columns[j], columns[i]) & (columns[i] != columns[j]),
+        lambda i, j: index.depths(index.lca_positions(columns[i], columns[j])),
+        [index.depths(column) for column in columns],
+        np.arange(positions.size).reshape(-1, 3),
+    )
+
+
+def _classify_general_relations(
+    is_ancestor: Callable[[int, int], np.ndarray],
+    lca_depth: Callable[[int, int], np.ndarray],
+    depth: list[np.ndarray],
+    triples: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Classifies triples of nodes into general triplets from the relations between the nodes of every triple.
+    :param is_ancestor: A function mapping the positions i and j in the triples onto a boolean array that is True for
+        the triples in which node i is a proper ancestor of node j.
+    :param lca_depth: A function mapping the positions i and j in the triples onto the depth of the lowest common
+        ancestor of node i and node j in every triple.
+    :param depth: The depth of the first, second and third node of every triple.
+    :param triples: An array of shape (k, 3) with the nodes of every triple.
+    :return: A tuple (types, orders) as returned by _classify_general_triples.
+    """
+    ancestor_1_2 = is_ancestor(0, 1)
+    ancestor_2_1 = is_ancestor(1, 0)
+    ancestor_1_3 = is_ancestor(0, 2)
+    ancestor_3_1 = is_ancestor(2, 0)
+    ancestor_2_3 = is_ancestor(1, 2)
+    ancestor_3_2 = is_ancestor(2, 1)
+    lca_depth_1_2 = lca_depth(0, 1)
+    lca_depth_2_3 = lca_depth(1, 2)
+    lca_depth_1_3 = lca_depth(0, 2)
+    lca_depth_1_2_3 = np.minimum(np.minimum(lca_depth_1_2, lca_depth_2_3), lca_depth_1_3)
+    parent_1 = ancestor_1_2 & ancestor_1_3
+    parent_2 = ancestor_2_1 & ancestor_2_3
+    parent_3 = ancestor_3_1 & ancestor_3_2
+    conditions = [
+        parent_1 & ancestor_3_2,
+        parent_1 & ancestor_2_3,
+        parent_1 & (lca_depth_2_3 == depth[0]),
+        parent_1,
+        parent_2 & ancestor_3_1,
+        parent_2 & ancestor_1_3,
+        parent_2 & (lca_depth_1_3 == depth[1]),
+        parent_2,
+        parent_3 & ancestor_2_1,
+        parent_3 & ancestor_1_2,
+        parent_3 & (lca_depth_1_2 == depth[2]),
+        parent_3,
+        ancestor_2_1,
+        ancestor_1_2,
+        ancestor_3_1,
+        ancestor_1_3,
+        ancestor_3_2,
+        ancestor_2_3,
+        lca_depth_1_2 > lca_depth_1_2_3,
+        lca_depth_2_3 > lca_depth_1_2_3,
+        lca_depth_1_3 > lca_depth_1_2_3,
+    ]
+    cases = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    types = _case_types[cases]
+    orders = np.take_along_axis(triples, _case_orders[cases], axis=1)
+    triplets = types >= 0
+    return types[triplets], orders[triplets]
+
+
+class GeneralTree(AbstractTree):
     """
     A class representing a general tree structure, which can be used to find triplets among nodes in the tree and compare
     with other trees.
     """
 
+    _triplet_class = GeneralTriplet
+    _classification_types = _classification_types
+    _count_shared_triplets = staticmethod(_count_shared_general_triplets)
+    _classify_sampled_triples = staticmethod(_classify_sampled_general_triples)
+
     def __init__(self, tree: dict, labels: list[str] = None):
         """
         Initializes a GeneralTree instance.
@@ -22,87 +166,30 @@ class GeneralTree(AbstractGraph):
         """
         super().__init__(tree, labels)
 
-    @staticmethod
-    @functools.lru_cache(maxsize=None)
-    def __get_descendants(tree: DiGraph, node) -> set:
+    def triplet_type_counts(self) -> dict[str, int]:
         """
-        Returns the descendants of a given node in the tree.
-        :param tree: An instance of DiGraph representing the tree structure.
-        :param node: The node for which to find descendants.
-        :return: A set of descendants of the specified node.
+        Counts the triplets of every type in the tree in a single traversal, without enumerating them.
+        :return: A dictionary with the number of triplets of every type, i.e. "1\\2\\3", "1/2\\3", "1/2|3", "1,2|3"
+            and "1|2|3".
         """
-        return descendants(tree, node)
+        return _count_triplet_types(self._tree, self.labels)
 
     @staticmethod
-    @functools.lru_cache(maxsize=None)
-    def __get_ancestors(tree: DiGraph, node) -> set:
-        """
-        Returns the ancestors of a given node in the tree.
-        :param tree: An instance of DiGraph representing the tree structure.
-        :param node: The node for which to find ancestors.
-        :return: A set of ancestors of the specified node.
-        """
-        return ancestors(tree, node)
-
-    def _find_triplets(self) -> list[GeneralTriplet]:
+    def _classify_triples(index: TreeIndex, nodes: list) -> Iterator[tuple[np.ndarray, np.ndarray]]:
         """
-        Finds all triplets in the tree by examining combinations of three nodes and their relationships.
-        :return: A list of GeneralTriplet instances representing the triplets found in the tree.
+        Classifies all triples of nodes with the ancestor and lowest common ancestor queries of the index. The triples
+        are classified in batches of all triples that share their first node, in the order of combinations(nodes, 3).
+        :param index: The TreeIndex of the tree.
+        :param nodes: The labelled nodes of the tree.
+        :return: An iterator of (types, orders) batches, where types holds the index in _classification_types of every
+            triplet and orders the positions in nodes of its nodes, in the order in which they appear in the triplet.
         """
-        triplets = []
-        for node1, node2, node3 in combinations(self._tree.nodes, 3):
-            if node1 not in self.labels or node2 not in self.labels or node3 not in self.labels:
-                continue
-            descendants1 = self.__get_descendants(self._tree, node1)
-            descendants2 = self.__get_descendants(self._tree, node2)
-            descendants3 = self.__get_descendants(self._tree, node3)
-            ancestors1 = self.__get_ancestors(self._tree, node1)
-            ancestors2 = self.__get_ancestors(self._tree, node2)
-            ancestors3 = self.__get_ancestors(self._tree, node3)
-            common_ancestors = ancestors1.intersection(ancestors2).intersection(ancestors3)
-            if node2 in descendants1 and node3 in descendants1:
-                parent = node1
-                if node2 in descendants3:
-                    triplets.append(GeneralTriplet(rf"{parent}\{node3}\{node2}"))
-                elif node3 in descendants2:
-                    triplets.append(GeneralTriplet(rf"{parent}\{node2}\{node3}"))
-                elif ancestors2.intersection(ancestors3) - common_ancestors == {parent}:
-                    triplets.append(GeneralTriplet(rf"{node2}/{parent}\{node3}"))
-            elif node1 in descendants2 and node3 in descendants2:
-                parent = node2
-                if node1 in descendants3:
-                    triplets.append(GeneralTriplet(rf"{parent}\{node3}\{node1}"))
-                elif node3 in descendants1:
-                    triplets.append(GeneralTriplet(rf"{parent}\{node1}\{node3}"))
-                elif ancestors1.intersection(ancestors3) - common_ancestors == {parent}:
-                    triplets.append(GeneralTriplet(rf"{node1}/{parent}\{node3}"))
-            elif node1 in descendants3 and node2 in descendants3:
-                parent = node3
-                if node1 in descendants2:
-                    triplets.append(GeneralTriplet(rf"{parent}\{node2}\{node1}"))
-                elif node2 in descendants1:
-                    triplets.append(GeneralTriplet(rf"{parent}\{node1}\{node2}"))
-                elif ancestors1.intersection(ancestors2) - common_ancestors == {parent}:
-                    triplets.append(GeneralTriplet(rf"{node1}/{parent}\{node2}"))
-            elif node1 in descendants2:
-                triplets.append(GeneralTriplet(rf"{node1}/{node2}|{node3}"))
-            elif node2 in descendants1:
-                triplets.append(GeneralTriplet(rf"{node2}/{node1}|{node3}"))
-            elif node1 in descendants3:
-                triplets.append(GeneralTriplet(rf"{node1}/{node3}|{node2}"))
-            elif node3 in descendants1:
-                triplets.append(GeneralTriplet(rf"{node3}/{node1}|{node2}"))
-            elif node2 in descendants3:
-                triplets.append(GeneralTriplet(rf"{node2}/{node3}|{node1}"))
-            elif node3 in descendants2:
-                triplets.append(GeneralTriplet(rf"{node3}/{node2}|{node1}"))
-            else:
-                if len((ancestors1.intersection(ancestors2) - common_ancestors)) > 0:
-                    triplets.append(GeneralTriplet(f"{node1},{node2}|{node3}"))
-                elif len((ancestors2.intersection(ancestors3) - common_ancestors)) > 0:
-                    triplets.append(GeneralTriplet(f"{node2},{node3}|{node1}"))
-                elif len((ancestors1.intersection(ancestors3) - common_ancestors)) > 0:
-                    triplets.append(GeneralTriplet(f"{node1},{node3}|{node2}"))
-                else:
-                    triplets.append(GeneralTriplet(f"{node1}|{node2}|{node3}"))
-        return triplets
+        positions = index.positions(nodes)
+        is_ancestor = index.ancestor_matrix(positions)
+        lca_depth = index.lca_depth_matrix(positions)
+        depth = index.depths(positions)
+        for node1 in range(len(nodes) - 2):
+            node2, node3 = np.triu_indices(len(nodes) - node1 - 1, 1)
+            node2 += node1 + 1
+            node3 += node1 + 1
+            yield _classify_general_triples(is_ancestor, lca_depth, depth, np.full(len(node2), node1), node2, node3)
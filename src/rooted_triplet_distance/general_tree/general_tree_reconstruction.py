@@ -1,6 +1,7 @@
 from random import choice
 
 from ..__abstract import AbstractGraphReconstruction
+from ..__triplet_array import TripletArray
 from .__general_triplet import GeneralTriplet
 
 
@@ -12,7 +13,7 @@ class GeneralTreeReconstruction(AbstractGraphReconstruction):
     def __init__(
         self,
         labels: list[str],
-        triplets: list[str | GeneralTriplet],
+        triplets: list[str | GeneralTriplet] | TripletArray,
         numb_unlabelled_nodes: int = 0,
         descendants: dict[str, set] = None,
         separations: dict[str, set] = None,
@@ -20,13 +21,15 @@ class GeneralTreeReconstruction(AbstractGraphReconstruction):
         """
         Initializes a GeneralTreeReconstruction instance.
         :param labels: A list of labels for the nodes in the tree.
-        :param triplets: A list of triplets, either as strings or as instances of GeneralTriplet.
+        :param triplets: A list of triplets, either as strings or as instances of GeneralTriplet, or a TripletArray.
         :param numb_unlabelled_nodes: [Optional] An integer representing the number of unlabelled nodes in the reconstructed tree so far. This variable is only used in the recursion.
         :param descendants: [Optional] A dictionary where keys are labels and values are sets of their descendants in the triplets. This variable is only used in the recursion.
         :param separations: [Optional] A dictionary where keys are labels and values are sets of labels that are separated from the given label by some other node. This variable is only used in the recursion.
         """
         super().__init__(labels)
-        self.__triplets = [GeneralTriplet(triplet) for triplet in triplets]
+        if isinstance(triplets, TripletArray):
+            triplets = triplets.to_strings()
+        self.__triplets = [GeneralTriplet.intern(triplet) for triplet in triplets]
         self.__numb_unlabelled_nodes = numb_unlabelled_nodes
         if descendants is not None and separations is not None:
             self.__descendants = {label: descendants[label] for label in self._labels}
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import numpy as np
+from networkx import subgraph_view
+
+from ..general_tree.general_tree import GeneralTree
+
+
+class SpanningTreeView(GeneralTree):
+    """
+    A spanning tree of a level one network that is stored as the choice of a parent for every contamination node. The
+    tree is a read-only view of the graph of the network, which is shared by all spanning trees instead of copied, and
+    its index and triplets are only computed when they are queried.
+    """
+
+    def __init__(self, network, choices: np.ndarray):
+        """
+        Initializes a SpanningTreeView instance.
+        :param network: The LevelOneNetwork the spanning tree belongs to.
+        :param choices: The position of the chosen parent of every contamination node in the parents of that node, in
+            the order of the contamination nodes of the network.
+        """
+        self._network = network
+        self._choices = np.asarray(choices, dtype=np.uint8)
+        self._labels = network.labels
+        self._version = 0
+        self._cache = {}
+        self._tree = subgraph_view(network._tree, filter_edge=self.__has_edge)
+
+    @property
+    def _cache_version(self) -> tuple:
+        """
+        Returns the version the cached properties of the spanning tree are valid for, which changes when either the
+        spanning tree or the network it is a view of is invalidated.
+        :return: A tuple with the version of the spanning tree and the version of the network.
+        """
+        return self._version, self._network._cache_version
+
+    def __has_edge(self, parent, child) -> bool:
+        """
+        Checks whether an edge of the network is part of the spanning tree, which is the case for all edges except the
+        edges from the parents of the contamination nodes that were not chosen.
+        :param parent: The parent node of the edge.
+        :param child: The child node of the edge.
+        :return: True if the edge is part of the spanning tree, False otherwise.
+        """
+        reticulation = self._network._reticulations.get(child)
+        return reticulation is None or reticulation[1][self._choices[reticulation[0]]] == parent
+
+    @property
+    def switching(self) -> dict:
+        """
+        Returns the chosen parent of every contamination node.
+        :return: A dictionary mapping every contamination node onto its chosen parent.
+        """
+        return {
+            reticulation: parents[self._choices[position]]
+            for reticulation, (position, parents) in self._network._reticulations.items()
+        }
+
+    @property
+    def _tree_dict(self) -> dict:
+        return self._network._switching_tree_dict(self.switching)
@@ -1,9 +1,19 @@
-from networkx.algorithms.tree import SpanningTreeIterator
-from networkx.classes import DiGraph
+from itertools import product
+from typing import Iterator
 
-from .. import GeneralTree
-from ..__abstract import AbstractGraph
+import numpy as np
+from networkx import biconnected_components
+
+from ..__abstract import AbstractGraph, _cached_property
+from ..__tree_index import TreeIndex
+from ..__triplet_array import LabelIndex, TripletArray, _canonical_row, _rechunk, _unique_keys
+from ..general_tree.general_tree import (
+    _classification_types,
+    _classify_general_triples,
+    _classify_sampled_general_triples,
+)
 from .__network_triplet import NetworkTriplet
+from .__spanning_tree_view import SpanningTreeView
 
 
 class LevelOneNetwork(AbstractGraph):
@@ -12,6 +22,8 @@ class LevelOneNetwork(AbstractGraph):
     the network and compare with other networks.
     """
 
+    _triplet_class = NetworkTriplet
+
     def __init__(self, tree: dict, labels: list[str] = None):
         """
         Initializes a LevelOneNetwork instance.
@@ -19,50 +31,271 @@ class LevelOneNetwork(AbstractGraph):
         :param labels: A list of labels for the nodes in the network. If None, all nodes are considered labeled.
         """
         super().__init__(tree, labels)
-        self.__spanning_trees = None
 
-    @property
-    def spanning_trees(self) -> list[GeneralTree]:
+    @_cached_property
+    def spanning_trees(self) -> list[SpanningTreeView]:
         """
         Returns a list of spanning trees derived from the network obtained by removing one of the incoming edges of
-        each contamination node.
-        :return: A list of GeneralTree instances representing the spanning trees of the network.
+        each contamination node. The spanning trees are views of the network that only store their choice of parents.
+        :return: A list of SpanningTreeView instances representing the spanning trees of the network.
         """
-        if self.__spanning_trees is None:
-            self.__spanning_trees = self.__get_spanning_trees()
-        return self.__spanning_trees
+        parents = [range(len(node_parents)) for _, node_parents in self._reticulations.values()]
+        return [SpanningTreeView(self, choices) for choices in product(*parents)]
 
-    def __get_spanning_trees(self) -> list[GeneralTree]:
+    @_cached_property
+    def _reticulations(self) -> dict:
         """
-        Generates all spanning trees of the network by removing one of the incoming edges of each contamination node.
-        :return: A list of GeneralTree instances representing the spanning trees of the network.
+        Returns the contamination nodes of the network, which are the nodes with more than one parent.
+        :return: A dictionary mapping every contamination node onto a tuple (position, parents) of its position in the
+            choices of a spanning tree and the tuple of its parents.
         """
-        spanning_trees = []
-        network_edges = self._tree.edges()
-        root = [v for v in self._tree.nodes if self._tree.in_degree(v) == 0][0]
+        reticulations = [node for node in self._tree.nodes if self._tree.in_degree(node) >= 2]
+        return {node: (position, tuple(self._tree.predecessors(node))) for position, node in enumerate(reticulations)}
 
-        def __create_tree_dictionary(adjacency, root):
-            tree_dict = {root: dict(adjacency[root])}
-            for v in tree_dict[root]:
-                tree_dict[root][v] = __create_tree_dictionary(adjacency, v)[v]
-            return tree_dict
+    def _switchings(self) -> Iterator[dict]:
+        """
+        Enumerates the switchings of the network, the choices of one parent for every contamination node. Every
+        switching corresponds to exactly one spanning tree of the network.
+        :return: An iterator of dictionaries mapping every contamination node onto its chosen parent.
+        """
+        reticulations = self._reticulations
+        for parents in product(*(node_parents for _, node_parents in reticulations.values())):
+            yield dict(zip(reticulations, parents))
 
-        for t in SpanningTreeIterator(self._tree.to_undirected()):
-            undirected_edges = set(t.edges())
-            actual_edges = [e for e in network_edges if e in undirected_edges or tuple(reversed(e)) in undirected_edges]
-            tree = DiGraph(actual_edges)
-            if len(tree.nodes) == len(self._tree.nodes) and len([v for v in tree.nodes if tree.in_degree(v) == 0]) == 1:
-                tree_dict = __create_tree_dictionary(dict(tree.adj), root)
-                spanning_trees.append(GeneralTree(tree_dict, self.labels))
-        return spanning_trees
+    def _switching_tree_dict(self, switching: dict) -> dict:
+        """
+        Creates the tree dictionary of the spanning tree of a switching in a single traversal of the network.
+        :param switching: A dictionary mapping every contamination node onto its chosen parent.
+        :return: A nested dictionary representing the spanning tree.
+        """
+        root = [node for node in self._tree.nodes if self._tree.in_degree(node) == 0][0]
+        tree_dict = {root: {}}
+        stack = [(root, tree_dict[root])]
+        while stack:
+            node, children = stack.pop()
+            for child in self._tree.successors(node):
+                if switching.get(child, node) == node:
+                    children[child] = {}
+                    stack.append((child, children[child]))
+        return tree_dict
 
     def _find_triplets(self) -> list[NetworkTriplet]:
         """
-        Finds all triplets in the level one network by examining the triplets in each spanning tree.
+        Finds all triplets in the level one network, which are the triplets of any of its spanning trees.
         :return: A list of NetworkTriplet instances representing the triplets found in the network.
         """
-        triplets = set()
-        for spanning_tree in self.spanning_trees:
-            for triplet in spanning_tree.triplets:
-                triplets.add(triplet)
-        return list(triplets)
+        return list(self.iter_triplets())
+
+    def _enumerate_triplets(self) -> Iterator[tuple[str, tuple]]:
+        """
+        Enumerates the triplets of the spanning trees of the network. Triplets shared by several spanning trees are
+        only enumerated the first time they are found.
+        :return: An iterator of (type, nodes) tuples, e.g. ("1,2|3", ("A", "B", "C")) for the triplet "A,B|C".
+        """
+        nodes = self._labelled_nodes()
+        node_array = np.empty(len(nodes), dtype=object)
+        node_array[:] = nodes
+        seen = set()
+        for types, orders in self.__classify_triples(nodes):
+            for triplet_type, triplet_nodes in zip(types.tolist(), node_array[orders].tolist()):
+                triplet_type = _classification_types[triplet_type]
+                key = _canonical_row(triplet_type, triplet_nodes)
+                if key not in seen:
+                    seen.add(key)
+                    yield triplet_type, tuple(triplet_nodes)
+
+    def _iter_triplet_batches(self, chunk_size: int, label_index: LabelIndex) -> Iterator[TripletArray]:
+        """
+        Yields the triplets of the network as TripletArrays of chunk_size triplets, except for the last batch. The
+        classified triples are encoded with the same LabelIndex, so that the triplets found before can be filtered out
+        on their keys.
+        :param chunk_size: The number of triplets per batch.
+        :param label_index: The LabelIndex the batches are encoded with.
+        :return: An iterator of TripletArray batches.
+        """
+        nodes = self._labelled_nodes()
+        label_ids = np.array([label_index.intern(node) for node in nodes], dtype=np.int64)
+        seen = np.empty(0, dtype=np.int64)
+
+        def __new_keys():
+            nonlocal seen
+            for types, orders in _rechunk(self.__classify_triples(nodes), chunk_size):
+                batch = TripletArray.from_label_ids(_classification_types, types, label_ids[orders], label_index)
+                keys = np.setdiff1d(_unique_keys(batch.keys), seen, assume_unique=True)
+                seen = _unique_keys(np.concatenate((seen, keys)))
+                yield (keys,)
+
+        for (keys,) in _rechunk(__new_keys(), chunk_size):
+            yield TripletArray.from_keys(keys, label_index)
+
+    @_cached_property
+    def __cycles(self) -> list[tuple]:
+        """
+        Finds the cycle of every contamination node, which consists of the two paths from the top of the cycle to the
+        contamination node.
+        :return: A list of (contamination node, side nodes) tuples, in the order of the switchings, where the side
+            nodes are the nodes of the cycle other than its top and the contamination node. The side nodes are None if
+            the cycle shares its block with another contamination node, so that the network is not level one.
+        """
+        blocks = [block for block in biconnected_components(self._tree.to_undirected()) if len(block) > 2]
+        cycles = []
+        for reticulation, (_, parents) in self._reticulations.items():
+            block = next(block for block in blocks if reticulation in block and set(parents) <= block)
+            in_block = [node for node in block if sum(parent in block for parent in self._tree.predecessors(node)) >= 2]
+            top = [node for node in block if not any(parent in block for parent in self._tree.predecessors(node))]
+            cycles.append((reticulation, block - {reticulation, *top} if len(in_block) == 1 else None))
+        return cycles
+
+    def __cycle_masks(self, nodes: list, cycles: list[tuple]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Encodes for every labelled node the cycles it lies below and the cycles it lies inside of as bit vectors. A node
+        lies below a cycle if it is the contamination node or one of its descendants, and inside of a cycle if it is a
+        side node of the cycle or one of their descendants, without lying below it.
+        :param nodes: The labelled nodes of the network.
+        :param cycles: The cycles of the network, as returned by __cycles.
+        :return: A tuple (below, inside) of arrays of shape (len(nodes), words) with one bit per cycle.
+        """
+        positions = {node: position for position, node in enumerate(nodes)}
+        numb_words = max(1, -(-len(cycles) // 64))
+        below = np.zeros((len(nodes), numb_words), dtype=np.uint64)
+        inside = np.zeros((len(nodes), numb_words), dtype=np.uint64)
+        for cycle, (reticulation, side_nodes) in enumerate(cycles):
+            word, bit = divmod(cycle, 64)
+            bit = np.uint64(1 << bit)
+            if side_nodes is None:
+                below[:, word] |= bit
+                inside[:, word] |= bit
+                continue
+            below_nodes = {reticulation} | self._descendants(reticulation)
+            inside_nodes = set(side_nodes).union(*(self._descendants(node) for node in side_nodes)) - below_nodes
+            for node in below_nodes & positions.keys():
+                below[positions[node], word] |= bit
+            for node in inside_nodes & positions.keys():
+                inside[positions[node], word] |= bit
+        return below, inside
+
+    def __classify_triples(self, nodes: list) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Classifies all triples of labelled nodes in the spanning trees of the network, without going over every
+        switching for every triple. Changing the parent of a contamination node only changes the triplet of a triple if
+        one of its nodes lies below the cycle and another inside of it, so every triple is classified in the spanning
+        trees that differ in the parents of these relevant cycles only, with every other contamination node kept at
+        its first parent.
+        :param nodes: The labelled nodes of the network.
+        :return: An iterator of (types, orders) batches, where types holds the index in _classification_types of every
+            triplet and orders the positions in nodes of its nodes, in the order in which they appear in the triplet.
+            A triplet is returned once for every spanning tree it is found in.
+        """
+        cycles = self.__cycles
+        parents = [len(node_parents) for _, node_parents in self._reticulations.values()]
+        below, inside = self.__cycle_masks(nodes, cycles)
+        bits = np.uint64(1) << np.arange(64, dtype=np.uint64)
+        switching_matrices = {}
+        for node1 in range(len(nodes) - 2):
+            node2, node3 = np.triu_indices(len(nodes) - node1 - 1, k=1)
+            node2 += node1 + 1
+            node3 += node1 + 1
+            relevant = self.__relevant_cycles(below, inside, node1, node2, node3)
+            groups, group_index = np.unique(relevant, axis=0, return_inverse=True)
+            group_index = group_index.ravel()
+            for group, words in enumerate(groups):
+                members = group_index == group
+                group_node2 = node2[members]
+                group_node3 = node3[members]
+                group_node1 = np.full(len(group_node2), node1)
+                relevant_cycles = np.flatnonzero(((words[:, None] & bits) != 0).ravel()).tolist()
+                for choice in product(*(range(parents[cycle]) for cycle in relevant_cycles)):
+                    switching = tuple((cycle, parent) for cycle, parent in zip(relevant_cycles, choice) if parent)
+                    if switching not in switching_matrices:
+                        switching_matrices[switching] = self.__switching_matrices(nodes, switching)
+                    yield _classify_general_triples(
+                        *switching_matrices[switching], group_node1, group_node2, group_node3
+                    )
+
+    def __switching_matrices(self, nodes: list, switching: tuple) -> tuple:
+        """
+        Computes the ancestry, lowest common ancestor depths and depths of the labelled nodes in a spanning tree.
+        :param nodes: The labelled nodes of the network.
+        :param switching: The (cycle, parent) pairs of the contamination nodes that are not kept at their first parent,
+            where parent is the position of the chosen parent in the parents of the contamination node.
+        :return: A tuple (is_ancestor, lca_depth, depth) as used by _classify_general_triples.
+        """
+        index = self.__switching_index(switching)
+        positions = index.positions(nodes)
+        return index.ancestor_matrix(positions), index.lca_depth_matrix(positions), index.depths(positions)
+
+    def __switching_index(self, switching: tuple) -> TreeIndex:
+        """
+        Returns the index of the spanning tree with the given parents of the contamination nodes.
+        :param switching: The (cycle, parent) pairs of the contamination nodes that are not kept at their first parent.
+        :return: The TreeIndex of the spanning tree.
+        """
+        choices = np.zeros(len(self._reticulations), dtype=np.uint8)
+        for cycle, parent in switching:
+            choices[cycle] = parent
+        return SpanningTreeView(self, choices).index
+
+    @staticmethod
+    def __relevant_cycles(below: np.ndarray, inside: np.ndarray, node1, node2, node3) -> np.ndarray:
+        """
+        Finds the cycles in which a node of a triple lies below the cycle and another node inside of it, which are the
+        cycles of which the chosen parent can change the triplet of the triple.
+        :param below: The bit vectors of the cycles every labelled node lies below, as returned by __cycle_masks.
+        :param inside: The bit vectors of the cycles every labelled node lies inside of, as returned by __cycle_masks.
+        :param node1: The first node of every triple.
+        :param node2: The second node of every triple.
+        :param node3: The third node of every triple.
+        :return: The bit vectors of the relevant cycles of every triple.
+        """
+        return (
+            (below[node1] & (inside[node2] | inside[node3]))
+            | (below[node2] & (inside[node1] | inside[node3]))
+            | (below[node3] & (inside[node1] | inside[node2]))
+        )
+
+    def _sample_triplet_keys(
+        self, labels: list, triples: np.ndarray, label_index: LabelIndex
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the triplets of the network on sampled triples of labels. Every triple is classified with constant time
+        queries in the spanning trees that differ in the parents of its relevant cycles only, as in __classify_triples.
+        :param labels: The labels the triples refer to.
+        :param triples: An array of shape (k, 3) with the positions in labels of the labels of every triple.
+        :param label_index: The LabelIndex the triplets are encoded with, in which all labels are interned.
+        :return: A tuple (rows, keys) with the key of every distinct triplet on every triple and the row in triples of
+            the triple it lies on.
+        """
+        nodes = self._labelled_nodes()
+        node_positions = {node: position for position, node in enumerate(nodes)}
+        positions = np.array([node_positions.get(label, -1) for label in labels], dtype=np.int64)
+        label_ids = np.array([label_index.intern(label) for label in labels], dtype=np.int64)
+        rows = np.flatnonzero((positions[triples] >= 0).all(axis=1))
+        triples = triples[rows]
+        parents = [len(node_parents) for _, node_parents in self._reticulations.values()]
+        below, inside = self.__cycle_masks(nodes, self.__cycles)
+        bits = np.uint64(1) << np.arange(64, dtype=np.uint64)
+        node_triples = positions[triples]
+        relevant = self.__relevant_cycles(below, inside, *node_triples.T)
+        groups, group_index = np.unique(relevant, axis=0, return_inverse=True)
+        group_index = group_index.ravel()
+        tree_positions = {}
+        triplet_rows, triplet_keys = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        for group, words in enumerate(groups):
+            members = np.flatnonzero(group_index == group)
+            relevant_cycles = np.flatnonzero(((words[:, None] & bits) != 0).ravel()).tolist()
+            for choice in product(*(range(parents[cycle]) for cycle in relevant_cycles)):
+                switching = tuple((cycle, parent) for cycle, parent in zip(relevant_cycles, choice) if parent)
+                if switching not in tree_positions:
+                    index = self.__switching_index(switching)
+                    tree_positions[switching] = (index, index.positions(nodes))
+                index, index_positions = tree_positions[switching]
+                types, orders = _classify_sampled_general_triples(index, index_positions[node_triples[members]])
+                member_triples = triples[members].ravel()[orders]
+                triplet_rows.append(rows[members[orders[:, 0] // 3]])
+                triplet_keys.append(
+                    TripletArray.from_label_ids(
+                        _classification_types, types, label_ids[member_triples], label_index
+                    ).keys
+                )
+        pairs = np.unique(np.stack((np.concatenate(triplet_rows), np.concatenate(triplet_keys)), axis=1), axis=0)
+        return pairs[:, 0], pairs[:, 1]
@@ -3,6 +3,7 @@ from itertools import combinations, product
 from random import choice
 
 from ..__abstract import AbstractGraphReconstruction
+from ..__triplet_array import TripletArray
 from .level_one_network import NetworkTriplet
 
 
@@ -14,7 +15,7 @@ class LevelOneNetworkReconstruction(AbstractGraphReconstruction):
     def __init__(
         self,
         labels: list[str],
-        triplets: list[str | NetworkTriplet],
+        triplets: list[str | NetworkTriplet] | TripletArray,
         numb_unlabelled_nodes: int = 0,
         descendants: dict[str, set] = None,
         separations: dict[str, set] = None,
@@ -23,7 +24,7 @@ class LevelOneNetworkReconstruction(AbstractGraphReconstruction):
         """
         Initializes a LevelOneNetworkReconstruction instance.
         :param labels: A list of labels for the nodes in the network.
-        :param triplets: A list of triplets, either as strings or as instances of NetworkTriplet.
+        :param triplets: A list of triplets, either as strings or as instances of NetworkTriplet, or a TripletArray.
         :param numb_unlabelled_nodes: [Optional] The number of unlabelled nodes in the network. This is used to generate unique names for unlabelled nodes during reconstruction. This value is only used in the recursion.
         :param descendants: [Optional] A dictionary where keys are labels and values are sets of labels that are descendants of the key label. This value is only used in the recursion.
         :param separations: [Optional] A dictionary where keys are labels and values are sets of labels that are separated from the key label. This value is only used in the recursion.
@@ -31,7 +32,9 @@ class LevelOneNetworkReconstruction(AbstractGraphReconstruction):
         """
         super().__init__(labels)
         self.__is_cycle: bool = None
-        self.__triplets = [NetworkTriplet(triplet) for triplet in triplets]
+        if isinstance(triplets, TripletArray):
+            triplets = triplets.to_strings()
+        self.__triplets = [NetworkTriplet.intern(triplet) for triplet in triplets]
         self.__numb_unlabelled_nodes = numb_unlabelled_nodes
         self._three_labels_to_triplets = {frozenset({i, j, k}): [] for i, j, k in combinations(self._labels, 3)}
         self._two_labels_to_triplets = {frozenset({i, j}): [] for i, j in combinations(self._labels, 2)}
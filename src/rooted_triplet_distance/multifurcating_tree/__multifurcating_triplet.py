@@ -1,5 +1,4 @@
 from __future__ import annotations
-from dataclasses import dataclass
 
 from ..__abstract import AbstractTriplet
 
@@ -10,24 +9,26 @@ class MultifurcatingTriplet(AbstractTriplet):
     It can only represent fanned and resolved triplets, not general triplets.
     """
 
+    __slots__ = ()
+
     def __init__(self, triplet: str | "MultifurcatingTriplet"):
         """
         Initializes a MultifurcatingTriplet instance.
         :param triplet: A string representation of the triplet or an instance of MultifurcatingTriplet.
         """
-        if isinstance(triplet, MultifurcatingTriplet):
-            super().__init__(triplet)
-            self.parts = triplet.parts
-            self.labels = triplet.labels
-            self._type = triplet._type
-        else:
-            super().__init__(triplet)
-            self.parts = {tuple(part.split(",")) if "," in part else part for part in self._string.split("|")}
-            if len(self.parts) == 3:
-                self._type = r"1|2|3"
-            else:
-                self._type = r"1|2,3"
-            self.labels = set(self._string.replace("|", ",").split(","))
+        super().__init__(triplet)
+
+    @property
+    def parts(self) -> set:
+        """
+        Returns the parts of the triplet, where nodes separated by a comma are grouped together in a tuple.
+        :return: A set containing the labels and tuples of labels of the triplet.
+        """
+        return {tuple(part.split(",")) if "," in part else part for part in self._string.split("|")}
+
+    @property
+    def _type(self) -> str:
+        return r"1|2|3" if self.type == r"1|2|3" else r"1|2,3"
 
     def apart(self, label: str):
         """
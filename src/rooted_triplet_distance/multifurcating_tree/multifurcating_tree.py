@@ -1,16 +1,85 @@
-from networkx import ancestors
-from itertools import combinations
+from typing import Callable, Iterator
+
+import numpy as np
 
 from .__multifurcating_triplet import MultifurcatingTriplet
-from ..__abstract import AbstractGraph
+from ..__abstract import AbstractTree
+from ..__tree_index import TreeIndex
+from ..__triplet_counting import _count_shared_multifurcating_triplets, _count_triplet_types
+
+_classification_types = (r"1,2|3", r"1|2|3")
+
+# The cases of the classification of a triple of unrelated labelled nodes (node1, node2, node3), in the order in which
+# they are tested. Every case holds the index of its type in _classification_types and the order in which the nodes of
+# the triple appear in the triplet string.
+_classification_cases = (
+    (0, (0, 1, 2)),
+    (0, (1, 2, 0)),
+    (0, (0, 2, 1)),
+    (1, (0, 1, 2)),
+)
+_case_types = np.array([case[0] for case in _classification_cases], dtype=np.int64)
+_case_orders = np.array([case[1] for case in _classification_cases], dtype=np.int64)
+
 
+def _classify_sampled_multifurcating_triples(index: TreeIndex, positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Classifies triples of nodes of a tree into fanned and resolved triplets with ancestor and lowest common ancestor
+    queries per triple, without computing the relations between all pairs of nodes. Triples in which a node is an
+    ancestor of another node do not form a multifurcating triplet.
+    :param index: The TreeIndex of the tree.
+    :param positions: An array of shape (k, 3) with the positions in the index of the nodes of every triple.
+    :return: A tuple (types, orders), where types holds the index in _classification_types of every triplet and orders
+        the flat positions in positions of the nodes of every triplet, in the order in which they appear in the triplet
+        string.
+    """
+    triples = np.arange(positions.size).reshape(-1, 3)
+    unrelated = np.ones(len(positions), dtype=bool)
+    for i, j in ((0, 1), (0, 2), (1, 2)):
+        unrelated &= ~index.in_subtree(positions[:, i], positions[:, j])
+        unrelated &= ~index.in_subtree(positions[:, j], positions[:, i])
+    columns = positions[unrelated].T
+    return _classify_multifurcating_relations(
+        lambda i, j: index.depths(index.lca_positions(columns[i], columns[j])), triples[unrelated]
+    )
 
-class MultifurcatingTree(AbstractGraph):
+
+def _classify_multifurcating_relations(
+    lca_depth: Callable[[int, int], np.ndarray], triples: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Classifies triples of pairwise unrelated nodes into fanned and resolved triplets from the depths of the lowest common
+    ancestors of the nodes of every triple.
+    :param lca_depth: A function mapping the positions i and j in the triples onto the depth of the lowest common
+        ancestor of node i and node j in every triple.
+    :param triples: An array of shape (k, 3) with the nodes of every triple.
+    :return: A tuple (types, orders), where types holds the index in _classification_types of every triplet and orders
+        the nodes of every triplet in the order in which they appear in the triplet string.
+    """
+    lca_depth_1_2 = lca_depth(0, 1)
+    lca_depth_2_3 = lca_depth(1, 2)
+    lca_depth_1_3 = lca_depth(0, 2)
+    lca_depth_1_2_3 = np.minimum(np.minimum(lca_depth_1_2, lca_depth_2_3), lca_depth_1_3)
+    conditions = [
+        lca_depth_1_2 > lca_depth_1_2_3,
+        lca_depth_2_3 > lca_depth_1_2_3,
+        lca_depth_1_3 > lca_depth_1_2_3,
+    ]
+    cases = np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+    return _case_types[cases], np.take_along_axis(triples, _case_orders[cases], axis=1)
+
+
+class MultifurcatingTree(AbstractTree):
     """
     A class representing a multifurcating tree structure, which can be used to find triplets among nodes in the tree and
     compare with other trees .
     """
 
+    _triplet_class = MultifurcatingTriplet
+    _classification_types = _classification_types
+    _count_shared_triplets = staticmethod(_count_shared_multifurcating_triplets)
+    _classify_sampled_triples = staticmethod(_classify_sampled_multifurcating_triples)
+
     def __init__(self, tree: dict, labels: list[str] = None):
         """
         Initializes a MultifurcatingTree instance.
@@ -19,36 +88,35 @@ class MultifurcatingTree(AbstractGraph):
         """
         super().__init__(tree, labels)
 
-    def _find_triplets(self) -> list[MultifurcatingTriplet]:
+    def triplet_type_counts(self) -> dict[str, int]:
+        """
+        Counts the triplets of every type in the tree in a single traversal, without enumerating them.
+        :return: A dictionary with the number of triplets of the types "1,2|3" and "1|2|3".
+        """
+        counts = _count_triplet_types(self._tree, self.labels)
+        return {r"1,2|3": counts[r"1,2|3"], r"1|2|3": counts[r"1|2|3"]}
+
+    @staticmethod
+    def _classify_triples(index: TreeIndex, nodes: list) -> Iterator[tuple[np.ndarray, np.ndarray]]:
         """
-        Finds all multifurcating triplets in the tree by examining combinations of three nodes and their relationships.
-        :return: A list of MultifurcatingTriplet instances representing the triplets found in the tree.
+        Classifies all triples of nodes into fanned and resolved triplets with the ancestor and lowest common ancestor
+        queries of the index. Triples in which a node is an ancestor of another node do not form a multifurcating
+        triplet. The triples are classified in batches of all triples that share their first node, in the order of
+        combinations(nodes, 3).
+        :param index: The TreeIndex of the tree.
+        :param nodes: The labelled nodes of the tree.
+        :return: An iterator of (types, orders) batches, where types holds the index in _classification_types of every
+            triplet and orders the positions in nodes of its nodes, in the order in which they appear in the triplet.
         """
-        triplets = []
-        for node1, node2, node3 in combinations(self._tree.nodes, 3):
-            if node1 not in self.labels or node2 not in self.labels or node3 not in self.labels:
-                continue
-            ancestors1: set = ancestors(self._tree, node1)
-            ancestors2 = ancestors(self._tree, node2)
-            ancestors3 = ancestors(self._tree, node3)
-            if (
-                node1 in ancestors2.union(ancestors3)
-                or node2 in ancestors1.union(ancestors3)
-                or node3 in ancestors1.union(ancestors2)
-            ):
-                continue
-            else:
-                common_ancestors = ancestors1.intersection(ancestors2).intersection(ancestors3)
-                if len((ancestors1.intersection(ancestors2) - common_ancestors)) > 0:
-                    triplets.append(MultifurcatingTriplet(f"{node1},{node2}|{node3}"))
-                    continue
-                elif len((ancestors2.intersection(ancestors3) - common_ancestors)) > 0:
-                    triplets.append(MultifurcatingTriplet(f"{node2},{node3}|{node1}"))
-                    continue
-                elif len((ancestors1.intersection(ancestors3) - common_ancestors)) > 0:
-                    triplets.append(MultifurcatingTriplet(f"{node1},{node3}|{node2}"))
-                    continue
-                else:
-                    triplets.append(MultifurcatingTriplet(f"{node1}|{node2}|{node3}"))
-                    continue
-        return triplets
+        positions = index.positions(nodes)
+        is_related = index.ancestor_matrix(positions)
+        is_related |= is_related.T
+        lca_depth = index.lca_depth_matrix(positions)
+        for node1 in range(len(nodes) - 2):
+            node2, node3 = np.triu_indices(len(nodes) - node1 - 1, 1)
+            node2 += node1 + 1
+            node3 += node1 + 1
+            unrelated = ~(is_related[node1, node2] | is_related[node1, node3] | is_related[node2, node3])
+            node2, node3 = node2[unrelated], node3[unrelated]
+            triples = np.stack((np.full(len(node2), node1), node2, node3), axis=1)
+            yield _classify_multifurcating_relations(lambda i, j: lca_depth[triples[:, i], triples[:, j]], triples)
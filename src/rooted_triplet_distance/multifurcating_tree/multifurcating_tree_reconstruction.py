@@ -1,5 +1,6 @@
 from .__multifurcating_triplet import MultifurcatingTriplet
 from ..__abstract import AbstractGraphReconstruction
+from ..__triplet_array import TripletArray
 
 
 class MultifurcatingTreeReconstruction(AbstractGraphReconstruction):
@@ -10,7 +11,7 @@ class MultifurcatingTreeReconstruction(AbstractGraphReconstruction):
     def __init__(
         self,
         labels: list[str],
-        triplets: list[str | MultifurcatingTriplet],
+        triplets: list[str | MultifurcatingTriplet] | TripletArray,
         D_set: dict[str, set[str]] = None,
         numb_unlabelled_nodes: int = 0,
         root_name="root",
@@ -18,13 +19,15 @@ class MultifurcatingTreeReconstruction(AbstractGraphReconstruction):
         """
         Initializes a MultifurcatingTreeReconstruction instance.
         :param labels: A list of labels for the nodes in the tree.
-        :param triplets: A list of triplets, either as strings or as instances of MultifurcatingTriplet.
+        :param triplets: A list of triplets, either as strings or as instances of MultifurcatingTriplet, or a TripletArray.
         :param D_set: [Optional] A dictionary where keys are labels and values are sets of labels that are not in the triplet with the key label. This value is only used in the recursion.
         :param numb_unlabelled_nodes: [Optional] The number of unlabelled nodes in the tree. This is used to generate unique names for unlabelled nodes during reconstruction. This value is only used in the recursion.
         :param root_name: [Optional] The name of the root node in the reconstructed tree. Default is "root".
         """
         super().__init__(labels)
-        self.__triplets = [MultifurcatingTriplet(triplet) for triplet in triplets]
+        if isinstance(triplets, TripletArray):
+            triplets = triplets.to_strings()
+        self.__triplets = [MultifurcatingTriplet.intern(triplet) for triplet in triplets]
         if D_set is None:
             self.__D_sets = {label: self.__create_D_set(label) for label in self._labels}
         else:
@@ -1,6 +1,17 @@
+import gc
+import weakref
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
 import pytest
+from networkx import ancestors, descendants
 
+from rooted_triplet_distance import LabelIndex, MultifurcatingTree, TripletArray
 from rooted_triplet_distance.general_tree import Tree
+from results.network_generators import create_random_general_tree
+
+_types = (r"1\2\3", r"1/2\3", r"1/2|3", r"1,2|3", r"1|2|3")
 
 
 def test_graph_creation():
@@ -188,3 +199,321 @@ def test_graph_creation():
 def test_find_triplets(tree, labels, triplets):
     t = Tree(tree, labels)
     assert all(triplet in triplets for triplet in t.triplets)
+
+
+def _reference_triplets(tree: Tree) -> list[tuple[str, tuple]]:
+    """
+    The enumeration of the triplets of a tree by intersecting the ancestor and descendant sets of every combination of
+    three nodes, which the index based enumeration has to reproduce.
+    """
+    result = []
+    for node1, node2, node3 in combinations(tree._tree.nodes, 3):
+        if node1 not in tree.labels or node2 not in tree.labels or node3 not in tree.labels:
+            continue
+        descendants1, descendants2, descendants3 = (descendants(tree._tree, node) for node in (node1, node2, node3))
+        ancestors1, ancestors2, ancestors3 = (ancestors(tree._tree, node) for node in (node1, node2, node3))
+        common_ancestors = ancestors1 & ancestors2 & ancestors3
+        if node2 in descendants1 and node3 in descendants1:
+            if node2 in descendants3:
+                result.append((r"1\2\3", (node1, node3, node2)))
+            elif node3 in descendants2:
+                result.append((r"1\2\3", (node1, node2, node3)))
+            elif (ancestors2 & ancestors3) - common_ancestors == {node1}:
+                result.append((r"1/2\3", (node2, node1, node3)))
+        elif node1 in descendants2 and node3 in descendants2:
+            if node1 in descendants3:
+                result.append((r"1\2\3", (node2, node3, node1)))
+            elif node3 in descendants1:
+                result.append((r"1\2\3", (node2, node1, node3)))
+            elif (ancestors1 & ancestors3) - common_ancestors == {node2}:
+                result.append((r"1/2\3", (node1, node2, node3)))
+        elif node1 in descendants3 and node2 in descendants3:
+            if node1 in descendants2:
+                result.append((r"1\2\3", (node3, node2, node1)))
+            elif node2 in descendants1:
+                result.append((r"1\2\3", (node3, node1, node2)))
+            elif (ancestors1 & ancestors2) - common_ancestors == {node3}:
+                result.append((r"1/2\3", (node1, node3, node2)))
+        elif node1 in descendants2:
+            result.append((r"1/2|3", (node1, node2, node3)))
+        elif node2 in descendants1:
+            result.append((r"1/2|3", (node2, node1, node3)))
+        elif node1 in descendants3:
+            result.append((r"1/2|3", (node1, node3, node2)))
+        elif node3 in descendants1:
+            result.append((r"1/2|3", (node3, node1, node2)))
+        elif node2 in descendants3:
+            result.append((r"1/2|3", (node2, node3, node1)))
+        elif node3 in descendants2:
+            result.append((r"1/2|3", (node3, node2, node1)))
+        elif (ancestors1 & ancestors2) - common_ancestors:
+            result.append((r"1,2|3", (node1, node2, node3)))
+        elif (ancestors2 & ancestors3) - common_ancestors:
+            result.append((r"1,2|3", (node2, node3, node1)))
+        elif (ancestors1 & ancestors3) - common_ancestors:
+            result.append((r"1,2|3", (node1, node3, node2)))
+        else:
+            result.append((r"1|2|3", (node1, node2, node3)))
+    return result
+
+
+@pytest.mark.parametrize("numb_labels", [3, 5, 10, 20, 30])
+def test_enumerate_triplets_random(numb_labels):
+    for _ in range(5):
+        tree_dict, labels = create_random_general_tree(numb_labels)
+        for tree_labels in (list(labels), list(labels)[1:] + ["unknown"], None):
+            tree = Tree(tree_dict, tree_labels)
+            assert list(tree._enumerate_triplets()) == _reference_triplets(tree)
+
+
+def test_enumerate_triplets_forest():
+    tree = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}, "X": {"Y": {}, "Z": {"W": {}}}})
+    assert list(tree._enumerate_triplets()) == _reference_triplets(tree)
+
+
+def test_is_ancestor():
+    tree = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}})
+    assert tree.is_ancestor("A", "C")
+    assert tree.is_ancestor("B", "D")
+    assert not tree.is_ancestor("C", "B")
+    assert not tree.is_ancestor("B", "E")
+    assert not tree.is_ancestor("B", "B")
+
+
+def test_index_is_freed_with_tree():
+    tree = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}})
+    list(tree._enumerate_triplets())
+    index = weakref.ref(tree.index)
+    del tree
+    gc.collect()
+    assert index() is None
+
+
+@pytest.mark.parametrize("numb_labels", [5, 20])
+def test_robinson_foulds_distance(numb_labels):
+    def clusters(tree: Tree) -> set[frozenset]:
+        return {
+            frozenset(descendants(tree._tree, node).union({node}).intersection(tree.labels))
+            for node in tree._tree.nodes
+        }
+
+    tree1 = Tree(*create_random_general_tree(numb_labels))
+    tree2 = Tree(*create_random_general_tree(numb_labels))
+    cluster_set1, cluster_set2 = clusters(tree1), clusters(tree2)
+    expected = len(cluster_set1 ^ cluster_set2) / len(cluster_set1 | cluster_set2)
+    assert tree1.robinson_foulds_distance(tree2) == expected
+    assert tree1.robinson_foulds_distance(tree1) == 0
+
+
+@pytest.mark.parametrize("tree_class", [Tree, MultifurcatingTree])
+def test_restrict(tree_class):
+    for _ in range(10):
+        tree_dict, labels = create_random_general_tree(15)
+        tree = tree_class(tree_dict, list(labels))
+        for numb_labels in (0, 3, 8, len(labels)):
+            subset = set(sorted(labels)[:numb_labels])
+            restricted = tree.restrict(subset)
+            assert set(restricted.labels) == subset
+            assert set(restricted.triplets) == {triplet for triplet in tree.triplets if triplet.labels <= subset}
+            assert all(
+                node in subset or restricted._tree.in_degree(node) + restricted._tree.out_degree(node) > 2
+                for node in restricted._tree.nodes
+                if restricted._tree.in_degree(node)
+            )
+
+
+def test_restrict_suppresses_unlabelled_nodes():
+    tree = Tree({"R": {"A": {"B": {"C": {}, "D": {}}, "E": {"F": {}}}, "G": {}}}, ["C", "D", "F", "B"])
+    restricted = tree.restrict(["C", "D", "F", "B", "X"])
+    assert set(restricted._tree.edges) == {("A", "B"), ("B", "C"), ("B", "D"), ("A", "F")}
+    assert restricted.labels == ["B", "C", "D", "F"]
+
+
+def test_common_labels():
+    tree1 = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {"F": {}, "X": {}}}})
+    tree2 = Tree({"A": {"Y": {"B": {"C": {}, "F": {}}, "D": {}}, "E": {}}})
+    labels = ["A", "B", "C", "D", "E", "F"]
+    restricted1, restricted2 = tree1.restrict(labels), tree2.restrict(labels)
+    assert tree1.triplet_distance(tree2, common_labels=True) == pytest.approx(restricted1 - restricted2)
+    assert tree1.triplet_distance(tree2, "enumerate", common_labels=True) == pytest.approx(restricted1 - restricted2)
+    assert MultifurcatingTree.triplet_distance(tree1, tree2, common_labels=True) == pytest.approx(
+        restricted1 - restricted2
+    )
+    for distance in ("robinson_foulds_distance", "tripartition_distance", "mu_distance", "average_sign_distance"):
+        expected = getattr(restricted1, distance)(restricted2)
+        assert getattr(tree1, distance)(tree2, common_labels=True) == expected
+    with pytest.raises(ValueError):
+        tree1.mu_distance(tree2)
+    estimate = tree1.approximate_triplet_distance(tree2, samples=1000, seed=0, common_labels=True)
+    assert estimate.lower <= restricted1 - restricted2 <= estimate.upper
+
+
+def test_label_order():
+    tree1 = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}}, ["A", "B", "C", "D", "E"])
+    tree2 = Tree({"A": {"B": {"C": {}, "E": {}}, "D": {}}}, ["E", "D", "C", "B", "A"])
+    assert tree1.mu_distance(tree2) == tree2.mu_distance(tree1) > 0
+    assert tree1.average_sign_distance(tree2) == tree2.average_sign_distance(tree1) > 0
+
+
+def test_perform_spr_move():
+    tree = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}})
+    tree_dict, distance = tree.perform_spr_move("C", new_parent_node="E")
+    assert set(Tree(tree_dict)._tree.edges) == {("A", "B"), ("A", "E"), ("B", "D"), ("E", "C")}
+    assert distance == 3
+    with pytest.raises(ValueError):
+        tree.perform_spr_move("B", new_parent_node="C")
+    with pytest.raises(ValueError):
+        tree.perform_spr_move("B", insert_edge=("B", "D"))
+
+
+@pytest.mark.parametrize("tree_class", [Tree, MultifurcatingTree])
+def test_spr_triplet_delta(tree_class):
+    for _ in range(10):
+        tree_dict, labels = create_random_general_tree(12)
+        tree = tree_class(tree_dict, sorted(labels)[2:])
+        for node, insert_edge in combinations(tree._tree.edges, 2):
+            node = node[1]
+            try:
+                moved_tree = tree_class(tree.perform_spr_move(node, insert_edge=insert_edge)[0], tree.labels)
+            except ValueError:
+                continue
+            added, removed = tree.spr_triplet_delta(node, insert_edge=insert_edge)
+            triplets = set(tree.triplets)
+            moved_triplets = set(moved_tree.triplets)
+            assert set(added.to_triplets()) == moved_triplets - triplets
+            assert set(removed.to_triplets()) == triplets - moved_triplets
+            if triplets | moved_triplets:
+                distance = (len(added) + len(removed)) / (len(triplets) + len(added))
+                assert distance == pytest.approx(moved_tree - tree)
+
+
+def test_cache():
+    tree = Tree({"A": {"B": {}}})
+    assert tree.triplets == [] and tree._is_cached("triplets")
+    triplets = tree.triplets
+    assert tree.triplets is triplets
+    index = tree.index
+    assert tree.index is index
+
+
+def test_invalidate():
+    tree = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}})
+    triplets, index = set(tree.triplets), tree.index
+    assert tree.robinson_foulds_distance(tree) == 0
+    tree._tree.remove_edge("B", "D")
+    tree._tree.add_edge("E", "D")
+    assert tree.index is index
+    tree.invalidate()
+    assert tree.version == 1
+    assert not tree._is_cached("triplets")
+    assert tree.index is not index
+    assert tree.is_ancestor("E", "D") and not tree.is_ancestor("B", "D")
+    assert set(tree.triplets) != triplets
+    assert len(tree.triplet_array) == len(tree.triplets)
+    assert tree - Tree({"A": {"B": {"C": {}}, "E": {"D": {}}}}) == 0
+    assert tree.robinson_foulds_distance(Tree({"A": {"B": {"C": {}}, "E": {"D": {}}}})) == 0
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000])
+def test_iter_triplets(chunk_size):
+    tree_dict, labels = create_random_general_tree(15)
+    tree = Tree(tree_dict, list(labels))
+    triplets = list(tree.iter_triplets())
+    assert [str(triplet) for triplet in triplets] == [
+        str(triplet) for triplet in Tree(tree_dict, list(labels)).triplets
+    ]
+    assert not tree._is_cached("triplets")
+    label_index = LabelIndex()
+    batches = list(tree.iter_triplets(chunk_size=chunk_size, label_index=label_index))
+    assert all(len(batch) == chunk_size for batch in batches[:-1])
+    assert 0 < len(batches[-1]) <= chunk_size
+    assert all(batch.label_index is label_index for batch in batches)
+    assert sum(len(batch) for batch in batches) == len(triplets)
+    assert [triplet for batch in batches for triplet in batch] == triplets
+    assert set(tree.triplet_array) == set(triplets)
+
+
+def test_iter_triplets_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        Tree({"A": {"B": {}, "C": {}, "D": {}}}).iter_triplets(chunk_size=0)
+
+
+@pytest.mark.parametrize("numb_labels", [1, 3, 10, 25])
+def test_triplet_type_counts(numb_labels):
+    for _ in range(5):
+        tree_dict, labels = create_random_general_tree(numb_labels)
+        for tree_labels in (list(labels), list(labels)[1:], None):
+            tree = Tree(tree_dict, tree_labels)
+            counts = Counter(triplet.type for triplet in tree.iter_triplets())
+            assert tree.triplet_type_counts() == {triplet_type: counts[triplet_type] for triplet_type in _types}
+
+
+@pytest.mark.parametrize("numb_labels", [3, 10, 30])
+def test_triplet_distance(numb_labels):
+    for _ in range(5):
+        tree_dict1, labels1 = create_random_general_tree(numb_labels)
+        tree_dict2, labels2 = create_random_general_tree(numb_labels)
+        tree1 = Tree(tree_dict1, sorted(labels1)[1:])
+        tree2 = Tree(tree_dict2, list(labels2))
+        shared = Counter(triplet.type for triplet in set(tree1.triplets) & set(tree2.triplets))
+        labels = [node for node in tree1._labelled_nodes() if node in tree2._labelled_nodes()]
+        assert Tree._count_shared_triplets(tree1.index, tree2.index, labels) == {
+            triplet_type: shared[triplet_type] for triplet_type in _types
+        }
+        assert tree1.triplet_distance(tree2) == pytest.approx(tree1 - tree2)
+        assert tree2.triplet_distance(tree2) == 0
+
+
+def test_triplet_distance_forest():
+    tree1 = Tree({"A": {"B": {"C": {}, "D": {}}, "E": {}}, "X": {"Y": {}, "Z": {"W": {}}}})
+    tree2 = Tree({"A": {"B": {"C": {}, "Y": {}}, "E": {"D": {}, "X": {"Z": {}, "W": {}}}}})
+    assert tree1.triplet_distance(tree2) == pytest.approx(tree1 - tree2)
+    assert tree2.triplet_distance(tree1) == pytest.approx(tree2 - tree1)
+
+
+def test_triplet_distance_invalid_arguments():
+    tree = Tree({"A": {"B": {}, "C": {}, "D": {}}})
+    with pytest.raises(ValueError):
+        tree.triplet_distance(tree, method="unknown")
+    with pytest.raises(TypeError):
+        tree.triplet_distance(MultifurcatingTree({"A": {"B": {}, "C": {}, "D": {}}}))
+
+
+@pytest.mark.parametrize("tree_class", [Tree, MultifurcatingTree])
+def test_sample_triplet_keys(tree_class):
+    for _ in range(5):
+        tree_dict, labels = create_random_general_tree(12)
+        tree = tree_class(tree_dict, sorted(labels)[1:])
+        sample_labels = sorted(labels) + ["X"]
+        label_index = LabelIndex()
+        triples = np.array(list(combinations(range(len(sample_labels)), 3)))
+        rows, keys = tree._sample_triplet_keys(sample_labels, triples, label_index)
+        assert sorted(keys) == sorted(TripletArray.empty(label_index).union(tree.triplet_array).keys)
+        for row, key in zip(rows, keys):
+            triplet = TripletArray.from_keys([key], label_index)[0]
+            assert triplet.labels == {sample_labels[position] for position in triples[row]}
+
+
+def test_approximate_triplet_distance():
+    tree1 = Tree(*create_random_general_tree(30))
+    tree2 = Tree(*create_random_general_tree(30))
+    estimate = tree1.approximate_triplet_distance(tree2, samples=100000, seed=0)
+    assert estimate == tree1.approximate_triplet_distance(tree2, samples=100000, seed=0)
+    assert estimate.samples == 100000
+    assert estimate.lower <= estimate.distance <= estimate.upper
+    assert estimate.distance == pytest.approx(tree1 - tree2, abs=0.02)
+    adaptive = tree1.approximate_triplet_distance(tree2, samples=1000, seed=0, tolerance=0.01)
+    assert adaptive.half_width <= 0.01 and adaptive.samples % 1000 == 0
+    assert tree1.approximate_triplet_distance(tree1, samples=1000).distance == 0
+
+
+def test_approximate_triplet_distance_invalid_arguments():
+    tree = Tree({"A": {"B": {}, "C": {}, "D": {}}})
+    with pytest.raises(ValueError):
+        tree.approximate_triplet_distance(tree, samples=1)
+    with pytest.raises(ValueError):
+        tree.approximate_triplet_distance(tree, confidence=1)
+    with pytest.raises(ValueError):
+        tree.approximate_triplet_distance(tree, tolerance=0)
+    with pytest.raises(ValueError):
+        Tree({"A": {"B": {}}}).approximate_triplet_distance(Tree({"B": {"A": {}}}))
@@ -71,6 +71,13 @@ def test_tree():
         assert triplet in triplets
 
 
+def test_tree_from_triplet_array():
+    tree_dict = {"A": {"B": {"C": {}, "D": {}}, "*_0": {"E": {}, "F": {}}}}
+    tree = GeneralTree(tree_dict, ["A", "B", "C", "D", "E", "F"])
+    reconstructed_tree = GeneralTreeReconstruction(["A", "B", "C", "D", "E", "F"], tree.triplet_array).reconstruct()
+    assert reconstructed_tree == tree_dict
+
+
 def run_test_random_tree():
     tree_dict, labels = create_random_general_tree(randint(3, 20))
 
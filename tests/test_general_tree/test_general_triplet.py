@@ -1,8 +1,9 @@
 from itertools import combinations
+import pickle
 
 import pytest
 
-from rooted_triplet_distance import GeneralTriplet
+from rooted_triplet_distance import GeneralTriplet, TripletCache
 
 
 @pytest.mark.parametrize(
@@ -97,6 +98,8 @@ def test_equal_type_error():
 )
 def test_equal(triplet, other, equal: bool):
     assert (GeneralTriplet(triplet) == GeneralTriplet(other)) is equal
+    assert (GeneralTriplet(triplet) == other) is equal
+    assert (hash(GeneralTriplet(triplet)) == hash(GeneralTriplet(other))) is equal
 
 
 @pytest.mark.parametrize(
@@ -173,3 +176,35 @@ def test_hash():
         assert triplet.__hash__() == triplet.__hash__()
     for triplet_i, triplet_j in combinations(triplets, 2):
         assert triplet_i.__hash__() != triplet_j.__hash__()
+
+
+def test_intern():
+    triplet = GeneralTriplet.intern("A,B|C")
+    assert GeneralTriplet.intern("C|B,A") is triplet
+    assert GeneralTriplet.intern(GeneralTriplet("A,B|C")) is triplet
+    assert GeneralTriplet.intern("A|B|C") is not triplet
+
+
+def test_triplet_cache():
+    cache = TripletCache(maxsize=2)
+    triplet = cache.get(GeneralTriplet, r"A/B\C")
+    assert cache.get(GeneralTriplet, r"C/B\A") is triplet
+    cache.get(GeneralTriplet, "A|B|C")
+    cache.get(GeneralTriplet, "A,B|C")
+    assert cache.info() == (1, 3, 2, 2)
+    assert cache.get(GeneralTriplet, r"A/B\C") is not triplet
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
+
+
+def test_immutable():
+    triplet = GeneralTriplet(r"A/B\C")
+    assert not hasattr(triplet, "__dict__")
+    with pytest.raises(AttributeError):
+        triplet.type = "1|2|3"
+    with pytest.raises(AttributeError):
+        triplet.other = None
+    triplet.labels.add("D")
+    assert triplet.labels == {"A", "B", "C"}
+    assert pickle.loads(pickle.dumps(triplet)) == triplet
+    assert GeneralTriplet(triplet) == triplet
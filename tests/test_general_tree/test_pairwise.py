@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from rooted_triplet_distance import LevelOneNetwork, pairwise_distances
+from rooted_triplet_distance.general_tree import Tree
+from results.network_generators import create_random_general_tree, create_random_level_1_network
+
+_labels = sorted(str(node) for node in range(10))
+
+
+def _expected_distances(graphs, distance) -> np.ndarray:
+    return np.array([[0.0 if graph is other else distance(graph, other) for other in graphs] for graph in graphs])
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_triplet_distances(n_jobs):
+    trees = [Tree(create_random_general_tree(10)[0], _labels) for _ in range(5)]
+    distances = pairwise_distances(trees, n_jobs=n_jobs)
+    assert np.allclose(distances, _expected_distances(trees, lambda tree, other: tree - other))
+
+
+def test_triplet_distances_of_networks():
+    networks = [LevelOneNetwork(*create_random_level_1_network(8, 2)) for _ in range(4)]
+    distances = pairwise_distances(networks, "triplet_distance", n_jobs=2)
+    assert np.allclose(distances, _expected_distances(networks, lambda network, other: network - other))
+
+
+@pytest.mark.parametrize("metric", ["robinson_foulds", "tripartition", "mu_distance", "average_sign"])
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_other_distances(metric, n_jobs):
+    trees = [Tree(create_random_general_tree(10)[0], _labels) for _ in range(4)]
+    distances = pairwise_distances(trees, metric, n_jobs=n_jobs)
+    method = f"{metric.removesuffix('_distance')}_distance"
+    assert np.allclose(distances, _expected_distances(trees, lambda tree, other: getattr(tree, method)(other)))
+
+
+def test_invalid_arguments():
+    trees = [Tree(create_random_general_tree(5)[0]) for _ in range(2)]
+    assert pairwise_distances(trees[:1]).shape == (1, 1)
+    with pytest.raises(ValueError):
+        pairwise_distances(trees, "unknown")
+    with pytest.raises(ValueError):
+        pairwise_distances(trees, n_jobs=0)
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from networkx import DiGraph, ancestors, descendants, lowest_common_ancestor
+
+from rooted_triplet_distance.__tree_index import TreeIndex
+from rooted_triplet_distance.general_tree import Tree
+from results.network_generators import create_random_general_tree
+
+
+@pytest.mark.parametrize("numb_labels", [3, 10, 40])
+def test_queries(numb_labels):
+    tree = Tree(*create_random_general_tree(numb_labels))._tree
+    index = TreeIndex(tree)
+    root = [node for node in tree.nodes if tree.in_degree(node) == 0][0]
+    for node1 in tree.nodes:
+        assert index.depth(node1) == len(ancestors(tree, node1))
+        assert index.depth(root) == 0
+        for node2 in tree.nodes:
+            assert index.is_ancestor(node1, node2) == (node1 in ancestors(tree, node2))
+            assert index.lca(node1, node2) == lowest_common_ancestor(tree, node1, node2)
+
+
+def test_forest():
+    index = TreeIndex(Tree({"A": {"B": {}, "C": {}}, "D": {"E": {}}})._tree)
+    assert index.lca("B", "C") == "A"
+    assert index.lca("B", "E") is None
+    assert not index.is_ancestor("A", "E")
+    assert index.lca_depth_matrix(index.positions(["B", "E"])).tolist() == [[1, -1], [-1, 1]]
+
+
+def test_not_a_tree():
+    graph = DiGraph([("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")])
+    with pytest.raises(ValueError):
+        TreeIndex(graph)
+
+
+def test_descendants():
+    tree = Tree(*create_random_general_tree(30))._tree
+    index = TreeIndex(tree)
+    for node in tree.nodes:
+        assert index.descendants(node) == descendants(tree, node)
+
+
+def test_paths():
+    tree = Tree(*create_random_general_tree(30))._tree
+    index = TreeIndex(tree)
+    nodes = list(tree.nodes)
+    positions = index.positions(nodes)
+    parents = index.parents()
+    assert parents[len(nodes)] == -1
+    assert list(index.pre_order()[:1]) == [len(nodes)]
+    assert sorted(index.pre_order()[1:]) == list(range(len(nodes)))
+    for node, position in zip(nodes, positions):
+        parent = list(tree.predecessors(node))
+        assert parents[position] == (index.positions(parent)[0] if parent else len(nodes))
+    uppers, lowers = np.meshgrid(positions, positions, indexing="ij")
+    in_subtree = index.in_subtree(lowers, uppers)
+    assert (in_subtree == (index.ancestor_matrix(positions) | np.eye(len(nodes), dtype=bool))).all()
+    proper = in_subtree & ~np.eye(len(nodes), dtype=bool)
+    children = index.child_towards(uppers[proper], lowers[proper])
+    assert (parents[children] == uppers[proper]).all()
+    assert index.in_subtree(lowers[proper], children).all()
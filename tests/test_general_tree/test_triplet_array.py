@@ -0,0 +1,110 @@
+from itertools import combinations
+
+import pytest
+
+from rooted_triplet_distance import GeneralTree, GeneralTriplet, LabelIndex, TripletArray, parse_triplets
+
+
+@pytest.mark.parametrize(
+    "triplet, other",
+    [
+        ("A|B|C", "C|A|B"),
+        ("A,B|C", "C|B,A"),
+        (r"1/2|3", r"3|2\1"),
+        (r"1/2/3", r"3\2\1"),
+        (r"1/2\3", r"3/2\1"),
+    ],
+)
+def test_equal_triplets_have_equal_keys(triplet, other):
+    keys = TripletArray.from_triplets([triplet, other]).keys
+    assert keys[0] == keys[1]
+
+
+def test_different_triplets_have_different_keys():
+    triplets = ["A|B|C", "A,B|C", "A|B,C", "A/B|C", "A/B/C", r"A/B\C", r"A|B\C", r"A\B\C"]
+    keys = TripletArray.from_triplets(triplets).keys
+    for key_i, key_j in combinations(keys, 2):
+        assert key_i != key_j
+
+
+def test_invalid_triplet():
+    with pytest.raises(ValueError):
+        TripletArray.from_triplets(["A-B-C"])
+
+
+def test_set_operations():
+    triplets1 = ["A|B|C", "A,B|D", r"A/B\C", "B/C|D"]
+    triplets2 = ["C|A|B", "A,B|E", r"C/B\A", "B/C/D"]
+    array1 = TripletArray.from_triplets(triplets1)
+    array2 = TripletArray.from_triplets(triplets2)
+    set1 = {GeneralTriplet(triplet) for triplet in triplets1}
+    set2 = {GeneralTriplet(triplet) for triplet in triplets2}
+    assert set(array1.union(array2).to_triplets()) == set1.union(set2)
+    assert set(array1.intersection(array2).to_triplets()) == set1.intersection(set2)
+    assert set(array1.difference(array2).to_triplets()) == set1.difference(set2)
+    assert set(array1.symmetric_difference(array2).to_triplets()) == set1.symmetric_difference(set2)
+
+
+def test_lazy_conversion():
+    tree = GeneralTree({"A": {"B": {"C": {}, "D": {}}, "*_0": {"E": {}, "F": {}}}}, ["A", "B", "C", "D", "E", "F"])
+    triplet_array = tree.triplet_array
+    assert not tree._is_cached("triplets")
+    assert len(triplet_array) == len(tree.triplets)
+    assert isinstance(triplet_array[0], GeneralTriplet)
+    assert set(triplet_array) == set(tree.triplets)
+    for triplet in tree.triplets:
+        assert triplet in triplet_array
+
+
+def test_contains_does_not_intern_labels():
+    triplet_array = TripletArray.from_triplets(["A|B|C", "A,B|D"])
+    assert len(triplet_array.label_index) == 4
+    assert "C|B|A" in triplet_array
+    assert "A|B|E" not in triplet_array
+    assert "E" not in triplet_array.label_index
+    assert len(triplet_array.label_index) == 4
+
+
+def test_set_operations_with_different_label_indices():
+    label_index = LabelIndex()
+    for label in ["D", "C", "B", "A"]:
+        label_index.intern(label)
+    array1 = TripletArray.from_triplets(["A|B|C", "A,B|D", r"A/B\C"])
+    array2 = TripletArray.from_triplets(["C|B|A", "B,A|D", r"C/B\A", "A/B/C"], label_index)
+    assert array1.label_index is not array2.label_index
+    assert len(array1.intersection(array2)) == 3
+    assert array1.difference(array2).to_strings() == []
+    assert set(array2.symmetric_difference(array1).to_triplets()) == {GeneralTriplet("A/B/C")}
+    assert set(array1.union(array2).to_triplets()) == set(array2.to_triplets())
+
+
+def test_parse_triplets():
+    triplets = ["A|B|C\n", "A,B|D", "", r"C|B\A", "A/B/D", r"A/B\C", "A|B,C", r"A\B\D", "C,B|A"]
+    triplet_array = parse_triplets(triplets)
+    assert len(triplet_array) == 8
+    assert set(triplet_array.to_triplets()) == {GeneralTriplet(triplet.strip()) for triplet in triplets if triplet}
+    assert len(triplet_array.unique()) == 7
+
+
+def test_parse_triplets_as_objects():
+    triplets = parse_triplets(["A|B,C", r"A/B\C", "A|B,C"], encoded=False)
+    assert all(isinstance(triplet, GeneralTriplet) for triplet in triplets)
+    assert [triplet.type for triplet in triplets] == ["1|2,3", r"1/2\3", "1|2,3"]
+    assert triplets[0] is triplets[2]
+
+
+@pytest.mark.parametrize("triplet", ["A|B", "A|B|C|D", "A,B,C", "ABC"])
+def test_parse_invalid_triplets(triplet):
+    with pytest.raises(ValueError):
+        parse_triplets([triplet])
+    with pytest.raises(ValueError):
+        GeneralTriplet(triplet)
+
+
+def test_labels_containing_separators_are_rejected():
+    # The regular expressions used before the single-pass parser matched greedily, so "A|B|C|D" was accepted as the
+    # fanned triplet of the labels "A|B", "C" and "D". Labels may no longer contain the separators "|,/\".
+    with pytest.raises(ValueError):
+        GeneralTriplet("A|B|C|D")
+    with pytest.raises(ValueError):
+        parse_triplets([r"A/B,C|D"])
@@ -1,3 +1,16 @@
+from itertools import combinations
+
+import numpy as np
+import pytest
+from networkx import DiGraph
+from networkx.algorithms.tree import SpanningTreeIterator
+
+from rooted_triplet_distance import LabelIndex, TripletArray
+from rooted_triplet_distance.general_tree import Tree as GeneralTree
+from rooted_triplet_distance.level_one_network import Network, Triplet as NetworkTriplet
+from results.network_generators import create_random_level_1_network
+
+
 def test_different_triplets(network1, network2):
     assert network1 != network2
     assert len([triplet for triplet in network1.triplets if triplet not in network2.triplets]) > 0
@@ -14,3 +27,124 @@ def test_correctness_spanning_trees(network1, network2):
         assert all(triplet in network1.triplets for triplet in spanning_tree.triplets)
     for spanning_tree in network2.spanning_trees:
         assert all(triplet in network2.triplets for triplet in spanning_tree.triplets)
+
+
+def test_triplet_array(network1, network2):
+    assert set(network1.triplet_array) == set(network1.triplets)
+    triplets1, triplets2 = set(network1.triplets), set(network2.triplets)
+    expected = len(triplets1.symmetric_difference(triplets2)) / len(triplets1.union(triplets2))
+    assert network1 - network2 == expected
+    assert network1 - network1 == 0
+
+
+def test_iter_triplets(network1):
+    network = Network(network1._tree_dict, network1.labels)
+    triplets = list(network.iter_triplets())
+    assert all(isinstance(triplet, NetworkTriplet) for triplet in triplets)
+    assert len(triplets) == len(set(triplets))
+    assert set(triplets) == set(network1.triplets)
+    batches = list(network.iter_triplets(chunk_size=50))
+    assert all(len(batch) == 50 for batch in batches[:-1])
+    assert sum(len(batch) for batch in batches) == len(triplets)
+    assert set(triplet for batch in batches for triplet in batch) == set(triplets)
+
+
+@pytest.mark.parametrize("numb_cycles", [1, 2, 3])
+def test_spanning_trees_are_rooted_spanning_trees(numb_cycles):
+    for _ in range(5):
+        network = Network(*create_random_level_1_network(10, numb_cycles))
+        undirected_spanning_trees = (
+            DiGraph(spanning_tree.edges) for spanning_tree in SpanningTreeIterator(network._tree.to_undirected())
+        )
+        expected = set()
+        for spanning_tree in undirected_spanning_trees:
+            edges = frozenset(
+                edge
+                for edge in network._tree.edges
+                if spanning_tree.has_edge(*edge) or spanning_tree.has_edge(*edge[::-1])
+            )
+            if len({child for _, child in edges}) == len(network._tree.nodes) - 1:
+                expected.add(edges)
+        spanning_trees = [frozenset(spanning_tree._tree.edges) for spanning_tree in network.spanning_trees]
+        assert len(spanning_trees) == len(set(spanning_trees))
+        assert set(spanning_trees) == expected
+
+
+def _spanning_tree_triplets(network) -> set:
+    triplets = set()
+    for spanning_tree in network.spanning_trees:
+        triplets.update(spanning_tree.triplets)
+    return triplets
+
+
+@pytest.mark.parametrize("numb_cycles", [1, 3, 5])
+def test_triplets_are_spanning_tree_triplets(numb_cycles):
+    for _ in range(3):
+        network = Network(*create_random_level_1_network(15, numb_cycles))
+        triplets = network.triplets
+        assert len(triplets) == len(set(triplets))
+        assert set(triplets) == _spanning_tree_triplets(network)
+        assert set(network.triplet_array) == set(triplets)
+
+
+def test_triplets_of_level_two_network():
+    tree_dict = {"R": {"A": {"C": {"D": {"F": {}}}, "E": {}}, "B": {"C": {}, "D": {}, "G": {}}}}
+    network = Network(tree_dict, ["C", "D", "E", "F", "G"])
+    assert set(network.triplets) == _spanning_tree_triplets(network)
+
+
+@pytest.mark.parametrize("numb_cycles", [1, 2, 4])
+def test_spanning_tree_views(numb_cycles):
+    network = Network(*create_random_level_1_network(12, numb_cycles))
+    switchings = list(network._switchings())
+    assert len(network.spanning_trees) == len(switchings)
+    for spanning_tree, switching in zip(network.spanning_trees, switchings):
+        assert spanning_tree.switching == switching
+        assert spanning_tree._tree._graph is network._tree
+        tree = GeneralTree(network._switching_tree_dict(switching), network.labels)
+        assert set(spanning_tree._tree.edges) == set(tree._tree.edges)
+        assert set(spanning_tree.triplets) == set(tree.triplets)
+        assert spanning_tree - tree == 0
+
+
+@pytest.mark.parametrize("numb_cycles", [1, 2, 4])
+def test_sample_triplet_keys(numb_cycles):
+    network = Network(*create_random_level_1_network(10, numb_cycles))
+    labels = network.labels + ["X"]
+    label_index = LabelIndex()
+    triples = np.array(list(combinations(range(len(labels)), 3)))
+    rows, keys = network._sample_triplet_keys(labels, triples, label_index)
+    assert sorted(keys) == sorted(TripletArray.empty(label_index).union(network.triplet_array).keys)
+    assert len({(row, key) for row, key in zip(rows, keys)}) == len(keys)
+
+
+def test_approximate_triplet_distance():
+    network1 = Network(*create_random_level_1_network(15, 3))
+    network2 = Network(*create_random_level_1_network(15, 3))
+    estimate = network1.approximate_triplet_distance(network2, samples=50000, seed=0)
+    assert estimate.distance == pytest.approx(network1 - network2, abs=0.03)
+
+
+def test_invalidate():
+    network = Network({"A": {"B": {"D": {"E": {}}}, "C": {"D": {"E": {}}, "F": {}}}})
+    spanning_trees = network.spanning_trees
+    triplets = set(network.triplets)
+    assert len(spanning_trees) == 2
+    assert all(spanning_tree._is_cached("index") for spanning_tree in spanning_trees if spanning_tree.index)
+    network._tree.remove_edge("B", "D")
+    network.invalidate()
+    assert len(network.spanning_trees) == 1
+    assert not spanning_trees[0]._is_cached("index")
+    assert set(network.triplets) == set(GeneralTree({"A": {"B": {}, "C": {"D": {"E": {}}, "F": {}}}}).triplets)
+    assert set(network.triplets) != triplets
+
+
+@pytest.mark.parametrize("numb_cycles", [1, 2, 4])
+def test_restrict(numb_cycles):
+    for _ in range(5):
+        network = Network(*create_random_level_1_network(12, numb_cycles))
+        for numb_labels in (3, 6, 9):
+            labels = set(network.labels[:numb_labels])
+            restricted = network.restrict(labels)
+            assert isinstance(restricted, Network)
+            assert set(restricted.triplets) == {triplet for triplet in network.triplets if triplet.labels <= labels}
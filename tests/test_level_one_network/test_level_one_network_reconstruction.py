@@ -32,7 +32,7 @@ def test_find_sink_of_cycle_with_labelled_source(network1, network2):
     assert reconstruction._LevelOneNetworkReconstruction__find_sink_of_cycle("p") == [{"b", "e"}]
 
 
-def test_resolve_cycle(network1, network2):
+def test_resolve_cycle(network1, network2, tmp_path):
     labels, triplets = network1.labels, network1.triplets
     reconstruction = NetworkReconstruction(labels, triplets)
     (
@@ -43,8 +43,8 @@ def test_resolve_cycle(network1, network2):
     assert all(cycle_branch in [{"f"}, {"1", "a"}, {"g", "h"}, {"e", "b"}] for cycle_branch in cycle_branches)
     assert sink_and_descendants == {"c", "d"}
     assert internal_cycle_vertices == {"d", "1"}
-    network1.visualize(show=False, save=True, save_name="network1.png")
-    network2.visualize(show=False, save=True, save_name="network2.png")
+    network1.visualize(show=False, save=True, save_name=tmp_path / "network1")
+    network2.visualize(show=False, save=True, save_name=tmp_path / "network2")
     labels, triplets = network2.labels, network2.triplets
     reconstruction = NetworkReconstruction(labels, triplets)
     (
@@ -66,6 +66,12 @@ def test_reconstruct(network1, network2):
     assert Network(reconstruction.reconstruct(), labels) == network2
 
 
+def test_reconstruct_from_triplet_array(network1, network2):
+    for network in (network1, network2):
+        reconstruction = NetworkReconstruction(network.labels, network.triplet_array)
+        assert Network(reconstruction.reconstruct(), network.labels) == network
+
+
 def test_find_possible_roots_no_labelled_root(network1_no_root, network2_no_root):
     labels, triplets = network1_no_root.labels, network1_no_root.triplets
     reconstruction = NetworkReconstruction(labels, triplets)
@@ -1,6 +1,11 @@
+from collections import Counter
+from itertools import combinations
+
 import pytest
+from networkx import ancestors
 
-from rooted_triplet_distance import MultifurcatingTree
+from rooted_triplet_distance import MultifurcatingTree, MultifurcatingTriplet
+from results.network_generators import create_random_multifurcating_tree
 
 
 def test_graph_creation():
@@ -127,3 +132,77 @@ def test_graph_creation():
 def test_find_triplets(tree, labels, triplets):
     t = MultifurcatingTree(tree, labels)
     assert all(triplet in triplets for triplet in t.triplets)
+
+
+def test_iter_triplets():
+    tree_dict, labels = create_random_multifurcating_tree(15, 4)
+    tree = MultifurcatingTree(tree_dict, list(labels))
+    triplets = list(tree.iter_triplets())
+    assert all(isinstance(triplet, MultifurcatingTriplet) for triplet in triplets)
+    assert triplets == MultifurcatingTree(tree_dict, list(labels)).triplets
+    batches = list(tree.iter_triplets(chunk_size=10))
+    assert all(len(batch) == 10 for batch in batches[:-1])
+    assert sum(len(batch) for batch in batches) == len(triplets)
+    assert set(triplet for batch in batches for triplet in batch) == set(triplets)
+
+
+@pytest.mark.parametrize("numb_labels", [3, 10, 25])
+def test_triplet_type_counts(numb_labels):
+    for _ in range(5):
+        tree = MultifurcatingTree(*create_random_multifurcating_tree(numb_labels, 4))
+        counts = Counter(triplet.type for triplet in tree.iter_triplets())
+        assert tree.triplet_type_counts() == {r"1,2|3": counts[r"1,2|3"], r"1|2|3": counts[r"1|2|3"]}
+
+
+def _reference_triplets(tree: MultifurcatingTree) -> list[tuple[str, tuple]]:
+    """
+    The enumeration of the triplets of a tree by intersecting the ancestor sets of every combination of three nodes,
+    which the index based enumeration has to reproduce.
+    """
+    result = []
+    for node1, node2, node3 in combinations(tree._tree.nodes, 3):
+        if node1 not in tree.labels or node2 not in tree.labels or node3 not in tree.labels:
+            continue
+        ancestors1, ancestors2, ancestors3 = (ancestors(tree._tree, node) for node in (node1, node2, node3))
+        if node1 in ancestors2 | ancestors3 or node2 in ancestors1 | ancestors3 or node3 in ancestors1 | ancestors2:
+            continue
+        common_ancestors = ancestors1 & ancestors2 & ancestors3
+        if (ancestors1 & ancestors2) - common_ancestors:
+            result.append((r"1,2|3", (node1, node2, node3)))
+        elif (ancestors2 & ancestors3) - common_ancestors:
+            result.append((r"1,2|3", (node2, node3, node1)))
+        elif (ancestors1 & ancestors3) - common_ancestors:
+            result.append((r"1,2|3", (node1, node3, node2)))
+        else:
+            result.append((r"1|2|3", (node1, node2, node3)))
+    return result
+
+
+@pytest.mark.parametrize("numb_labels", [3, 10, 20])
+def test_enumerate_triplets_random(numb_labels):
+    for _ in range(5):
+        tree_dict, labels = create_random_multifurcating_tree(numb_labels, 4)
+        for tree_labels in (list(labels), list(labels)[1:] + ["unknown"], None):
+            tree = MultifurcatingTree(tree_dict, tree_labels)
+            assert list(tree._enumerate_triplets()) == _reference_triplets(tree)
+
+
+@pytest.mark.parametrize("numb_labels", [3, 10, 40])
+def test_triplet_distance(numb_labels):
+    for _ in range(5):
+        tree1 = MultifurcatingTree(*create_random_multifurcating_tree(numb_labels, 3))
+        tree2 = MultifurcatingTree(*create_random_multifurcating_tree(numb_labels, 3))
+        if not tree1.triplets and not tree2.triplets:
+            continue
+        assert tree1.triplet_distance(tree2) == pytest.approx(tree1 - tree2)
+        assert tree1.triplet_distance(tree2, method="enumerate") == tree1 - tree2
+        if tree1.triplets:
+            assert tree1.triplet_distance(tree1) == 0
+
+
+def test_triplet_distance_invalid_arguments():
+    tree = MultifurcatingTree({"root": {"A": {}, "B": {}, "C": {}}})
+    with pytest.raises(ValueError):
+        tree.triplet_distance(tree, method="unknown")
+    with pytest.raises(TypeError):
+        tree.triplet_distance("A|B|C")
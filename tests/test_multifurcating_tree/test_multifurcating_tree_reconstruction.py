@@ -44,6 +44,12 @@ def test_find_children_of_root():
     assert children == {"E"}
 
 
+def test_tree_from_triplet_array():
+    tree = MultifurcatingTree({"root": {"*_1": {"A": {}, "B": {}}, "C": {}, "D": {}}}, ["A", "B", "C", "D"])
+    reconstructed_dict = MultifurcatingTreeReconstruction(tree.labels, tree.triplet_array).reconstruct()
+    assert MultifurcatingTree(reconstructed_dict, tree.labels) == tree
+
+
 def run_test_incomplete_triplet_set():
     labels = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J", "Z"]
     triplets = [
@@ -103,3 +103,17 @@ def test_hash():
     assert triplet.__hash__() != triplet2.__hash__()
     assert triplet.__hash__() != triplet3.__hash__()
     assert triplet2.__hash__() != triplet3.__hash__()
+
+
+def test_intern():
+    triplet = MultifurcatingTriplet.intern("A,B|C")
+    assert MultifurcatingTriplet.intern("C|B,A") is triplet
+    assert isinstance(triplet, MultifurcatingTriplet)
+
+
+def test_immutable():
+    triplet = MultifurcatingTriplet("A,B|C")
+    assert not hasattr(triplet, "__dict__")
+    with pytest.raises(AttributeError):
+        triplet.parts = None
+    assert MultifurcatingTriplet(triplet).parts == {("A", "B"), "C"}